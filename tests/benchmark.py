@@ -0,0 +1,145 @@
+import json
+import platform
+import time
+
+import django
+import wagtail
+from django.template import Context, Template
+from django.test import Client
+from wagtail.models import Page
+
+from tests.testapp.models import FormField, FormPage
+
+PATHS = ("disabled", "passed", "blocked_field", "blocked_time", "render")
+
+
+def create_form_page(slug, honeypot=True):
+    """
+    Add a published FormPage with a single required field below the home page
+    """
+    home_page = Page.objects.get(id=1).get_children().first()
+    form_page = FormPage(
+        title=slug,
+        slug=slug,
+        honeypot=honeypot,
+        thank_you_text="Thank you for your message",
+    )
+    home_page.add_child(instance=form_page)
+    FormField.objects.create(
+        page=form_page, label="Name", field_type="singleline", required=True
+    )
+    form_page.save_revision().publish()
+    return form_page
+
+
+def get_requests(pages):
+    """
+    Return a function making one request for each benchmarked path
+    """
+    client = Client()
+    template = Template("{% load honeypot_tags %}{% honeypot_fields True page %}")
+    context = Context({"page": pages["enabled"]})
+
+    def post(page, whf_name="", age=10):
+        return client.post(
+            page.url,
+            {"name": "foo", "whf_name": whf_name, "whf_time": int(time.time()) - age},
+        )
+
+    return {
+        "disabled": lambda: post(pages["disabled"]),
+        "passed": lambda: post(pages["enabled"]),
+        "blocked_field": lambda: post(pages["enabled"], whf_name="foo"),
+        "blocked_time": lambda: post(pages["enabled"], age=0),
+        "render": lambda: template.render(context),
+    }
+
+
+def percentile(latencies, q):
+    """
+    Return the q percentile of the sorted latencies using the nearest rank
+    """
+    index = max(0, int(round(q / 100 * len(latencies))) - 1)
+    return latencies[min(index, len(latencies) - 1)]
+
+
+def measure(request, requests, warmup=0):
+    for _ in range(warmup):
+        request()
+
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(requests):
+        request_start = time.perf_counter()
+        request()
+        latencies.append(time.perf_counter() - request_start)
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests_per_second": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def run_benchmarks(requests=500, warmup=50, paths=PATHS):
+    """
+    Measure each path and return the results with the versions they were run on
+
+    Must run against a test database, the posted submissions are saved
+    """
+    pages = {
+        "disabled": create_form_page("benchmark-disabled", honeypot=False),
+        "enabled": create_form_page("benchmark-enabled"),
+    }
+    path_requests = get_requests(pages)
+    return {
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "wagtail": wagtail.__version__,
+        "requests": requests,
+        "results": {
+            path: measure(path_requests[path], requests, warmup) for path in paths
+        },
+    }
+
+
+def compare(results, baseline, threshold=0.2, p99_threshold=0.5):
+    """
+    Return a message for each result that has regressed from the baseline
+
+    Requests per second and p50 latency may be threshold worse than the
+    baseline, the noisier p99 latency may be p99_threshold worse
+    """
+    regressions = []
+    for path, result in results["results"].items():
+        base = baseline["results"].get(path)
+        if base is None:
+            continue
+        checks = (
+            (
+                "requests_per_second",
+                result["requests_per_second"]
+                < base["requests_per_second"] * (1 - threshold),
+            ),
+            ("p50_ms", result["p50_ms"] > base["p50_ms"] * (1 + threshold)),
+            ("p99_ms", result["p99_ms"] > base["p99_ms"] * (1 + p99_threshold)),
+        )
+        for metric, regressed in checks:
+            if regressed:
+                regressions.append(
+                    f"{path} {metric} {result[metric]} (baseline {base[metric]})"
+                )
+    return regressions
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save(results, path):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
@@ -0,0 +1,105 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+from tests import benchmark
+
+BASELINE = os.path.join(os.path.dirname(benchmark.__file__), "benchmark_baseline.json")
+
+
+class Command(BaseCommand):
+    help = "Benchmark the honeypot request paths and compare them to a baseline"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=500,
+            help="The number of timed requests for each path",
+        )
+        parser.add_argument(
+            "--warmup",
+            type=int,
+            default=50,
+            help="The number of untimed requests made first for each path",
+        )
+        parser.add_argument(
+            "--path",
+            action="append",
+            choices=benchmark.PATHS,
+            help="Only benchmark this path, can be given more than once",
+        )
+        parser.add_argument(
+            "--output",
+            help="Save the results as JSON to this file",
+        )
+        parser.add_argument(
+            "--baseline",
+            default=BASELINE,
+            help="The JSON baseline the results are compared to",
+        )
+        parser.add_argument(
+            "--save-baseline",
+            action="store_true",
+            help="Replace the baseline with the results instead of comparing",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.2,
+            help="The fraction requests per second and p50 latency may regress by",
+        )
+        parser.add_argument(
+            "--p99-threshold",
+            type=float,
+            default=0.5,
+            help="The fraction p99 latency may regress by",
+        )
+
+    def handle(self, *args, **options):
+        # run against a throwaway test database like the test runner does
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            results = benchmark.run_benchmarks(
+                options["requests"],
+                options["warmup"],
+                options["path"] or benchmark.PATHS,
+            )
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        for path, result in results["results"].items():
+            self.stdout.write(
+                f"{path:<14} {result['requests_per_second']:>9.1f} req/s  "
+                f"p50 {result['p50_ms']:>7.3f} ms  p99 {result['p99_ms']:>7.3f} ms"
+            )
+
+        if options["output"]:
+            benchmark.save(results, options["output"])
+
+        if options["save_baseline"]:
+            benchmark.save(results, options["baseline"])
+            self.stdout.write(f"Saved baseline to {options['baseline']}")
+            return
+
+        if not os.path.exists(options["baseline"]):
+            self.stdout.write("No baseline to compare to")
+            return
+
+        regressions = benchmark.compare(
+            results,
+            benchmark.load(options["baseline"]),
+            options["threshold"],
+            options["p99_threshold"],
+        )
+        if regressions:
+            raise CommandError("Regressed from baseline:\n" + "\n".join(regressions))
+        self.stdout.write("No regressions from baseline")
@@ -0,0 +1,131 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+from tests import benchmark, simulator
+
+
+class Command(BaseCommand):
+    help = "Simulate human and bot submissions to compare honeypot configurations"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--submissions",
+            type=int,
+            default=1000,
+            help="The number of submissions posted for each configuration",
+        )
+        parser.add_argument(
+            "--mix",
+            default="human=40,fast=30,filling=20,replay=10",
+            help="The weight of each client type, human, fast, filling and replay",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            action="append",
+            help="A HONEYPOT_TIME_INTERVAL to simulate, can be given more than once",
+        )
+        parser.add_argument(
+            "--signed-tokens",
+            action="store_true",
+            help="Simulate with HONEYPOT_SIGNED_TOKENS enabled",
+        )
+        parser.add_argument(
+            "--single-use-tokens",
+            action="store_true",
+            help="Simulate with HONEYPOT_SINGLE_USE_TOKENS enabled",
+        )
+        parser.add_argument(
+            "--rate-limit",
+            type=int,
+            help="Simulate with this HONEYPOT_RATE_LIMIT",
+        )
+        parser.add_argument(
+            "--human-median",
+            type=float,
+            default=25,
+            help="The median seconds a human takes to fill out the form",
+        )
+        parser.add_argument(
+            "--rate",
+            type=float,
+            default=10,
+            help="The submissions per second used to estimate worker occupancy",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            help="Seed the random client mix and timings",
+        )
+        parser.add_argument(
+            "--output",
+            help="Save the results as JSON to this file",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            mix = simulator.parse_mix(options["mix"])
+        except ValueError as e:
+            raise CommandError(e)
+        configurations = simulator.get_configurations(
+            options["interval"] or [3],
+            options["signed_tokens"],
+            options["single_use_tokens"],
+            options["rate_limit"],
+        )
+
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            results = simulator.simulate(
+                configurations,
+                options["submissions"],
+                mix,
+                options["human_median"],
+                options["rate"],
+                options["seed"],
+            )
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        for result in results:
+            self.write_report(result["settings"], result["report"], options["rate"])
+
+        if options["output"]:
+            benchmark.save(results, options["output"])
+
+    def write_report(self, settings, report, rate):
+        self.stdout.write(
+            ", ".join(f"{name}={value}" for name, value in settings.items())
+        )
+        lines = (
+            ("Submissions", f"{report['submissions']}"),
+            ("Allowed", f"{report['allowed']}"),
+            ("Blocked", f"{report['blocked']}"),
+            ("Throughput", f"{report['submissions_per_second']} submissions/s"),
+            ("Allowed time", self.format_ms(report["allowed_seconds"])),
+            ("Blocked time", self.format_ms(report["blocked_seconds"])),
+            ("Worker occupancy", f"{report['worker_occupancy']} workers at {rate}/s"),
+            ("DB writes", f"{report['db_writes']}"),
+            ("DB writes avoided", f"{report['db_writes_avoided']}"),
+            ("False positives", self.format_rate(report["false_positive_rate"])),
+            ("False negatives", self.format_rate(report["false_negative_rate"])),
+        )
+        for label, value in lines:
+            self.stdout.write(f"  {label:<18} {value}")
+        for kind, counts in report["clients"].items():
+            self.stdout.write(
+                f"  {kind:<18} {counts['allowed']}/{counts['submissions']} allowed"
+            )
+
+    def format_ms(self, seconds):
+        return "-" if seconds is None else f"{seconds * 1000:.3f} ms"
+
+    def format_rate(self, rate):
+        return "-" if rate is None else f"{rate:.2%}"
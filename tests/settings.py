@@ -40,6 +40,7 @@ INSTALLED_APPS = [
     "tests.testapp",
     "wagtail.contrib.search_promotions",
     "wagtail.contrib.forms",
+    "wagtail.contrib.settings",
     "wagtail.contrib.redirects",
     "wagtail.users",
     "wagtail.snippets",
@@ -0,0 +1,201 @@
+import random
+import time
+
+from django.core.cache import caches
+from django.db import connection
+from django.test import Client, override_settings
+from wagtail.contrib.forms.models import FormSubmission
+
+from tests.benchmark import create_form_page
+from wagtail_honeypot.conf import get_config
+from wagtail_honeypot.fields import get_field_names
+from wagtail_honeypot.tokens import make_token
+
+HUMAN = "human"
+FAST = "fast"
+FILLING = "filling"
+REPLAY = "replay"
+
+CLIENTS = (HUMAN, FAST, FILLING, REPLAY)
+DEFAULT_MIX = {HUMAN: 40, FAST: 30, FILLING: 20, REPLAY: 10}
+
+WRITE_STATEMENTS = ("INSERT", "UPDATE", "DELETE")
+
+
+def parse_mix(value):
+    """
+    Return the client mix from a string such as "human=40,fast=30"
+    """
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in CLIENTS:
+            raise ValueError(f"Unknown client {name!r}, choose from {CLIENTS}")
+        mix[name] = float(weight)
+    if not any(mix.values()):
+        raise ValueError("The client mix must have a weight above zero")
+    return mix
+
+
+def get_time_value(page, issued):
+    """
+    Return the time field value a form rendered at the issued time would hold
+    """
+    config = get_config()
+    if config.signed_tokens:
+        return make_token(page.pk, config.token_max_age, timestamp=int(issued))
+    return str(int(issued))
+
+
+class Simulator:
+    """
+    Posts a mix of simulated human and bot submissions to a FormPage
+
+    Form fill times are simulated by the age of the time field value so
+    no request has to wait, human fill times follow a log normal
+    distribution around human_median seconds
+    """
+
+    def __init__(self, page, mix=None, human_median=25, seed=None):
+        self.page = page
+        self.mix = mix or DEFAULT_MIX
+        self.human_median = human_median
+        self.random = random.Random(seed)
+        self.client = Client()
+        self.replay_values = []
+
+    def get_submission(self, kind):
+        now = time.time()
+        name_value = ""
+        if kind == HUMAN:
+            fill_time = self.random.lognormvariate(0, 0.8) * self.human_median
+            value = get_time_value(self.page, now - fill_time)
+            ip = f"10.0.{self.random.randint(0, 255)}.{self.random.randint(1, 254)}"
+        elif kind == FAST:
+            value = get_time_value(self.page, now - self.random.uniform(0, 2))
+            ip = f"192.0.2.{self.random.randint(1, 10)}"
+        elif kind == FILLING:
+            value = get_time_value(self.page, now - self.random.uniform(0, 30))
+            name_value = "bot"
+            ip = f"198.51.100.{self.random.randint(1, 10)}"
+        else:
+            # a handful of forms captured up to an hour ago are posted again
+            if len(self.replay_values) < 5:
+                issued = now - self.random.uniform(60, 3600)
+                self.replay_values.append(get_time_value(self.page, issued))
+            value = self.random.choice(self.replay_values)
+            ip = f"203.0.113.{self.random.randint(1, 10)}"
+
+        name_field, time_field = get_field_names()
+        return ip, {"name": kind, name_field: name_value, time_field: value}
+
+    def post(self, kind):
+        """
+        Post one submission and return if it was saved and the seconds taken
+        """
+        ip, data = self.get_submission(kind)
+        count = FormSubmission.objects.filter(page=self.page).count()
+        start = time.perf_counter()
+        self.client.post(self.page.url, data, REMOTE_ADDR=ip)
+        seconds = time.perf_counter() - start
+        return FormSubmission.objects.filter(page=self.page).count() > count, seconds
+
+    def run(self, submissions, rate=10):
+        kinds = self.random.choices(
+            list(self.mix), weights=list(self.mix.values()), k=submissions
+        )
+        totals = {kind: [0, 0] for kind in CLIENTS}
+        busy = {"allowed": 0.0, "blocked": 0.0}
+        writes = 0
+
+        def count_writes(execute, sql, params, many, context):
+            nonlocal writes
+            writes += sql.lstrip().upper().startswith(WRITE_STATEMENTS)
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        with connection.execute_wrapper(count_writes):
+            for kind in kinds:
+                saved, seconds = self.post(kind)
+                totals[kind][0] += 1
+                totals[kind][1] += saved
+                busy["allowed" if saved else "blocked"] += seconds
+        elapsed = time.perf_counter() - start
+
+        return get_report(totals, busy, elapsed, writes, rate)
+
+
+def get_report(totals, busy, elapsed, writes, rate):
+    """
+    Summarise a simulation run
+
+    The worker occupancy is the average number of workers kept busy when
+    submissions arrive at rate per second, the db writes avoided are
+    estimated from the writes made by each allowed submission
+    """
+    submissions = sum(total for total, _ in totals.values())
+    allowed = sum(saved for _, saved in totals.values())
+    blocked = submissions - allowed
+    bots = sum(totals[kind][0] for kind in CLIENTS if kind != HUMAN)
+    bots_allowed = sum(totals[kind][1] for kind in CLIENTS if kind != HUMAN)
+    humans, humans_allowed = totals[HUMAN]
+    writes_per_allowed = writes / allowed if allowed else 0
+
+    return {
+        "submissions": submissions,
+        "allowed": allowed,
+        "blocked": blocked,
+        "submissions_per_second": round(submissions / elapsed, 1),
+        "allowed_seconds": round(busy["allowed"] / allowed, 6) if allowed else None,
+        "blocked_seconds": round(busy["blocked"] / blocked, 6) if blocked else None,
+        "busy_seconds": round(sum(busy.values()) / submissions, 6),
+        "worker_occupancy": round(rate * sum(busy.values()) / submissions, 3),
+        "db_writes": writes,
+        "db_writes_avoided": round(blocked * writes_per_allowed),
+        "false_positive_rate": (
+            round((humans - humans_allowed) / humans, 4) if humans else None
+        ),
+        "false_negative_rate": round(bots_allowed / bots, 4) if bots else None,
+        "clients": {
+            kind: {"submissions": total, "allowed": saved}
+            for kind, (total, saved) in totals.items()
+        },
+    }
+
+
+def get_configurations(
+    intervals, signed_tokens=False, single_use_tokens=False, rate_limit=None
+):
+    """
+    Return the settings for each configuration to simulate
+    """
+    return [
+        {
+            "HONEYPOT_TIME_INTERVAL": interval,
+            "HONEYPOT_SIGNED_TOKENS": signed_tokens or single_use_tokens,
+            "HONEYPOT_SINGLE_USE_TOKENS": single_use_tokens,
+            "HONEYPOT_RATE_LIMIT": rate_limit,
+        }
+        for interval in intervals
+    ]
+
+
+def simulate(
+    configurations, submissions=1000, mix=None, human_median=25, rate=10, seed=None
+):
+    """
+    Run the simulation once for each configuration
+
+    Must run against a test database, the allowed submissions are saved
+    """
+    page = create_form_page("simulator")
+    results = []
+    for configuration in configurations:
+        with override_settings(**configuration):
+            caches["default"].clear()
+            simulator = Simulator(page, mix, human_median, seed)
+            results.append(
+                {"settings": configuration, "report": simulator.run(submissions, rate)}
+            )
+    return results
@@ -0,0 +1,112 @@
+import time
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from wagtail.models import Site
+
+from wagtail_honeypot.attempts import alog_attempt
+from wagtail_honeypot.models import HoneypotAttempt, HoneypotSettings
+from wagtail_honeypot.nonces import CacheNonceStore, LocalNonceStore
+from wagtail_honeypot.ratelimit import ais_rate_limited
+from wagtail_honeypot.site_settings import DEFAULT_SITE_SETTINGS, aget_site_settings
+from wagtail_honeypot.tokens import make_token
+from wagtail_honeypot.utils import aget_rejection_reason
+
+
+class TestHoneypotAsyncChecks(TestCase):
+    """
+    Test the async versions of the honeypot checks
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.form_view_time = int(time.time())
+
+    async def test_rejection_reason(self):
+        data = {"whf_name": "", "whf_time": self.form_view_time - 10}
+        self.assertIsNone(await aget_rejection_reason(data))
+        data = {"whf_name": "foo", "whf_time": self.form_view_time - 10}
+        self.assertEqual(await aget_rejection_reason(data), "field")
+        data = {"whf_name": "", "whf_time": self.form_view_time}
+        self.assertEqual(await aget_rejection_reason(data), "time")
+        self.assertEqual(await aget_rejection_reason({}), "missing")
+
+    @override_settings(HONEYPOT_SIGNED_TOKENS=True, HONEYPOT_SINGLE_USE_TOKENS=True)
+    async def test_rejection_reason_replay(self):
+        data = {
+            "whf_name": "",
+            "whf_time": make_token(5, timestamp=self.form_view_time - 10),
+        }
+        self.assertIsNone(await aget_rejection_reason(data, 5))
+        self.assertIsNone(await aget_rejection_reason(data, 5, redeem=True))
+        self.assertEqual(await aget_rejection_reason(data, 5), "replay")
+        self.assertEqual(await aget_rejection_reason(data, 6), "time")
+
+    async def test_nonce_stores(self):
+        for store in (CacheNonceStore("default"), LocalNonceStore(10)):
+            self.assertFalse(await store.acontains("foo"))
+            self.assertTrue(await store.aadd("foo", 60))
+            self.assertTrue(await store.acontains("foo"))
+            self.assertFalse(await store.aadd("foo", 60))
+
+    async def test_rate_limited(self):
+        request = self.factory.post("/")
+        for _ in range(3):
+            self.assertFalse(await ais_rate_limited(request, 3))
+        self.assertTrue(await ais_rate_limited(request, 3))
+        self.assertFalse(await ais_rate_limited(request, 3, page_id=1))
+
+    @override_settings(HONEYPOT_LOG_ATTEMPTS=True, HONEYPOT_ATTEMPT_BATCH_SIZE=1)
+    async def test_log_attempt(self):
+        request = self.factory.post("/", {"whf_name": "foo"})
+        await alog_attempt("field", request=request)
+        self.assertEqual(await HoneypotAttempt.objects.acount(), 1)
+
+
+class TestHoneypotAsyncSiteSettings(TestCase):
+    """
+    Test the site settings are found without a thread once cached
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.site = Site.objects.get(is_default_site=True)
+        self.factory = RequestFactory()
+
+    async def test_defaults(self):
+        request = self.factory.post("/")
+        self.assertEqual(await aget_site_settings(request), DEFAULT_SITE_SETTINGS)
+
+    async def test_cached(self):
+        await HoneypotSettings.objects.acreate(site=self.site, time_interval=60)
+        site_settings = await aget_site_settings(self.factory.post("/"))
+        self.assertEqual(site_settings.time_interval, 60)
+
+        sync_to_async = mock.patch("wagtail_honeypot.site_settings.sync_to_async")
+        get_queryset = mock.patch("wagtail_honeypot.site_settings.get_queryset")
+        with sync_to_async as sync_to_async, get_queryset as get_queryset:
+            site_settings = await aget_site_settings(self.factory.post("/"))
+        self.assertEqual(site_settings.time_interval, 60)
+        sync_to_async.assert_not_called()
+        get_queryset.assert_not_called()
+
+    def test_site_saved(self):
+        request = self.factory.post("/")
+        HoneypotSettings.objects.create(site=self.site, time_interval=60)
+        Site.objects.filter(pk=self.site.pk).update(
+            hostname="example.com", is_default_site=False
+        )
+        self.assertEqual(
+            async_to_sync(aget_site_settings)(request), DEFAULT_SITE_SETTINGS
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.site.hostname = "testserver"
+            self.site.is_default_site = False
+            self.site.save()
+        request = self.factory.post("/")
+        self.assertEqual(async_to_sync(aget_site_settings)(request).time_interval, 60)
@@ -0,0 +1,130 @@
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from wagtail.models import Page
+
+from tests.testapp.models import FormField, FormPage
+from wagtail_honeypot import attempts
+from wagtail_honeypot.attempts import (
+    flush_attempts,
+    get_ip_hash,
+    get_payload,
+    log_attempt,
+)
+from wagtail_honeypot.models import HoneypotAttempt
+
+
+@override_settings(HONEYPOT_LOG_ATTEMPTS=True, HONEYPOT_ATTEMPT_BATCH_SIZE=3)
+class TestHoneypotAttempts(TestCase):
+
+    def setUp(self):
+        """
+        Enable honeypot on FormPage and log the blocked attempts
+        """
+        flush_attempts()
+        root_page = Page.objects.get(id=1)
+        home_page = root_page.get_children().first()
+
+        self.form_page = FormPage(
+            title="Form Page",
+            slug="formpage",
+            honeypot=True,
+            thank_you_text="Thank you for your message",
+        )
+        home_page.add_child(instance=self.form_page)
+        FormField.objects.create(
+            page=self.form_page, label="Name", field_type="singleline", required=True
+        )
+        self.form_page.save_revision().publish()
+
+        self.form_view_time = int(time.time())
+
+    def post(self, **data):
+        return self.client.post("/formpage/", dict({"name": "foo"}, **data))
+
+    def test_attempts_saved_in_batches(self):
+        self.post(whf_name="foo", whf_time=self.form_view_time - 10)
+        self.post(whf_name="", whf_time=self.form_view_time)
+        self.assertEqual(HoneypotAttempt.objects.count(), 0)
+
+        self.post()
+        self.assertEqual(HoneypotAttempt.objects.count(), 3)
+        self.assertEqual(
+            sorted(HoneypotAttempt.objects.values_list("reason", flat=True)),
+            ["field", "missing", "time"],
+        )
+
+    @override_settings(HONEYPOT_ATTEMPT_FLUSH_INTERVAL=0.01)
+    def test_flushed_by_timer(self):
+        with mock.patch.object(attempts, "flush_attempts") as flush:
+            log_attempt("field", self.form_page.pk)
+            attempts._timer.join(1)
+        # saved without another attempt being logged
+        flush.assert_called_once_with()
+        self.assertEqual(flush_attempts(), 1)
+        self.assertIsNone(attempts._timer)
+
+    def test_attempt_record(self):
+        self.post(whf_name="foo", whf_time=self.form_view_time - 10)
+        flush_attempts()
+
+        attempt = HoneypotAttempt.objects.get()
+        self.assertEqual(attempt.page_id, self.form_page.pk)
+        self.assertEqual(attempt.payload["whf_name"], "foo")
+        self.assertEqual(len(attempt.ip_hash), 16)
+        self.assertNotIn("127.0.0.1", attempt.ip_hash)
+
+    def test_passed_submission_not_logged(self):
+        self.post(whf_name="", whf_time=self.form_view_time - 10)
+        self.assertEqual(flush_attempts(), 0)
+
+    @override_settings(HONEYPOT_ATTEMPT_SAMPLE_RATE=0)
+    def test_sample_rate(self):
+        for _ in range(3):
+            self.post(whf_name="foo", whf_time=self.form_view_time - 10)
+        self.assertEqual(flush_attempts(), 0)
+
+    @override_settings(HONEYPOT_LOG_ATTEMPTS=False)
+    def test_disabled(self):
+        log_attempt("field")
+        self.assertEqual(flush_attempts(), 0)
+
+    def test_ip_hash(self):
+        factory = RequestFactory()
+        ip_hash = get_ip_hash(factory.post("/", REMOTE_ADDR="10.0.0.1"))
+        self.assertEqual(
+            ip_hash, get_ip_hash(factory.post("/", REMOTE_ADDR="10.0.0.1"))
+        )
+        self.assertNotEqual(
+            ip_hash, get_ip_hash(factory.post("/", REMOTE_ADDR="10.0.0.2"))
+        )
+
+    def test_payload_truncated(self):
+        data = {f"field{i}": "x" * 200 for i in range(20)}
+        data["csrfmiddlewaretoken"] = "foo"
+        payload = get_payload(data)
+        self.assertEqual(len(payload), 10)
+        self.assertNotIn("csrfmiddlewaretoken", payload)
+        self.assertEqual(len(payload["field0"]), 100)
+
+
+class TestHoneypotPruneAttempts(TestCase):
+
+    def test_command(self):
+        now = timezone.now()
+        HoneypotAttempt.objects.bulk_create(
+            [
+                HoneypotAttempt(reason="field", created_at=now - timedelta(days=40))
+                for _ in range(5)
+            ]
+            + [HoneypotAttempt(reason="time", created_at=now - timedelta(days=1))]
+        )
+        out = StringIO()
+        call_command("honeypot_prune_attempts", days=30, chunk_size=2, stdout=out)
+        self.assertIn("Deleted 5 attempts", out.getvalue())
+        self.assertEqual(HoneypotAttempt.objects.get().reason, "time")
@@ -0,0 +1,54 @@
+from django.test import TestCase
+from wagtail.contrib.forms.models import FormSubmission
+
+from tests.benchmark import PATHS, compare, percentile, run_benchmarks
+
+BASELINE = {
+    "results": {
+        "passed": {"requests_per_second": 100.0, "p50_ms": 10.0, "p99_ms": 20.0},
+    }
+}
+
+
+class TestBenchmark(TestCase):
+
+    def test_run_benchmarks(self):
+        results = run_benchmarks(requests=3, warmup=0)
+        self.assertEqual(tuple(results["results"]), PATHS)
+        for result in results["results"].values():
+            self.assertGreater(result["requests_per_second"], 0)
+            self.assertLessEqual(result["p50_ms"], result["p99_ms"])
+
+        # only the disabled and passed paths are saved
+        self.assertEqual(FormSubmission.objects.count(), 6)
+
+    def test_percentile(self):
+        latencies = list(range(1, 101))
+        self.assertEqual(percentile(latencies, 50), 50)
+        self.assertEqual(percentile(latencies, 99), 99)
+        self.assertEqual(percentile([5], 99), 5)
+
+    def test_compare_within_threshold(self):
+        results = {
+            "results": {
+                "passed": {"requests_per_second": 85.0, "p50_ms": 11.5, "p99_ms": 29.0},
+                "render": {"requests_per_second": 1.0, "p50_ms": 1.0, "p99_ms": 1.0},
+            }
+        }
+        self.assertEqual(compare(results, BASELINE), [])
+
+    def test_compare_regressed(self):
+        results = {
+            "results": {
+                "passed": {"requests_per_second": 70.0, "p50_ms": 13.0, "p99_ms": 31.0},
+            }
+        }
+        self.assertEqual(
+            compare(results, BASELINE),
+            [
+                "passed requests_per_second 70.0 (baseline 100.0)",
+                "passed p50_ms 13.0 (baseline 10.0)",
+                "passed p99_ms 31.0 (baseline 20.0)",
+            ],
+        )
+        self.assertEqual(compare(results, BASELINE, 0.5, 1), [])
@@ -0,0 +1,207 @@
+import time
+from unittest import mock
+
+from bs4 import BeautifulSoup as bs4
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from wagtail.contrib.forms.models import FormSubmission
+from wagtail.models import Page
+
+from tests.testapp.models import FormField, FormPage
+from wagtail_honeypot import challenges
+from wagtail_honeypot.challenges import (
+    count_submission,
+    get_difficulty,
+    make_challenge,
+    read_challenge,
+    solve,
+    verify_solution,
+)
+from wagtail_honeypot.templatetags.honeypot_tags import honeypot_fields
+from wagtail_honeypot.utils import get_rejection_reason
+from wagtail_honeypot.validators import HoneypotValidator
+
+
+@override_settings(HONEYPOT_POW_MIN_DIFFICULTY=4, HONEYPOT_POW_MAX_DIFFICULTY=8)
+class TestHoneypotChallenges(TestCase):
+    """
+    Test the proof of work challenges
+    """
+
+    def setUp(self):
+        caches["default"].clear()
+
+    def test_make_challenge(self):
+        challenge = read_challenge(make_challenge(1))
+        self.assertEqual(challenge.page_id, 1)
+        self.assertEqual(challenge.difficulty, 4)
+        self.assertGreater(challenge.expires, time.time())
+        self.assertNotEqual(challenge.nonce, read_challenge(make_challenge(1)).nonce)
+        self.assertIsNone(read_challenge(make_challenge()).page_id)
+
+    def test_verify_solution(self):
+        value = solve(make_challenge(1, difficulty=8))
+        self.assertEqual(verify_solution(value, 1).difficulty, 8)
+        self.assertIsNotNone(verify_solution(value))
+
+    def test_verify_unsolved(self):
+        challenge = make_challenge(1, difficulty=8)
+        solution = int(solve(challenge).rpartition(":")[2])
+        # every number before the first solution fails
+        for n in range(solution):
+            self.assertIsNone(verify_solution(f"{challenge}:{n}", 1))
+
+    def test_verify_invalid(self):
+        value = solve(make_challenge(1))
+        self.assertIsNone(verify_solution(value, 2))
+        self.assertIsNone(verify_solution(value.replace("1.4.", "1.0.", 1), 1))
+        self.assertIsNone(verify_solution(value.rpartition(":")[0], 1))
+        self.assertIsNone(verify_solution(value + "1" * 12, 1))
+        self.assertIsNone(verify_solution("", 1))
+        self.assertIsNone(verify_solution(None, 1))
+
+    def test_verify_expired(self):
+        value = solve(make_challenge(1))
+        with mock.patch.object(
+            challenges.time, "time", return_value=time.time() + 3601
+        ):
+            self.assertIsNone(verify_solution(value, 1))
+
+    @override_settings(HONEYPOT_POW_TARGET_RATE=10)
+    def test_difficulty_rises_with_submissions(self):
+        self.assertEqual(get_difficulty(1), 4)
+        for i in range(10):
+            count_submission(1)
+        self.assertEqual(get_difficulty(1), 5)
+        for i in range(20):
+            count_submission(1)
+        self.assertEqual(get_difficulty(1), 6)
+        # other pages aren't affected
+        self.assertEqual(get_difficulty(2), 4)
+        for i in range(1000):
+            count_submission(1)
+        self.assertEqual(get_difficulty(1), 8)
+
+
+@override_settings(
+    HONEYPOT_POW=True,
+    HONEYPOT_POW_MIN_DIFFICULTY=4,
+    HONEYPOT_POW_MAX_DIFFICULTY=8,
+)
+class TestHoneypotFormProofOfWork(TestCase):
+
+    def setUp(self):
+        """
+        Enable honeypot on FormPage with a proof of work challenge
+        """
+        caches["default"].clear()
+        root_page = Page.objects.get(id=1)
+        home_page = root_page.get_children().first()
+
+        self.form_page = FormPage(
+            title="Form Page",
+            slug="formpage",
+            honeypot=True,
+            thank_you_text="Thank you for your message",
+        )
+        home_page.add_child(instance=self.form_page)
+        FormField.objects.create(
+            page=self.form_page, label="Name", field_type="singleline", required=True
+        )
+        self.form_page.save_revision().publish()
+
+        self.form_view_time = int(time.time())
+
+    def post(self, pow):
+        return self.client.post(
+            "/formpage/",
+            {
+                "name": "foo",
+                "whf_name": "",
+                "whf_time": self.form_view_time - 10,
+                "whf_pow": pow,
+            },
+        )
+
+    def test_solved(self):
+        resp = self.post(solve(make_challenge(self.form_page.pk)))
+        self.assertContains(resp, "Thank you for your message")
+        self.assertEqual(FormSubmission.objects.count(), 1)
+        self.assertNotIn("whf_pow", FormSubmission.objects.get().form_data)
+
+    def test_unsolved(self):
+        challenge = make_challenge(self.form_page.pk, difficulty=8)
+        unsolved = next(
+            f"{challenge}:{n}"
+            for n in range(1000)
+            if verify_solution(f"{challenge}:{n}") is None
+        )
+        resp = self.post(unsolved)
+        self.assertContains(resp, "Thank you for your message")
+        self.post("")
+        self.assertEqual(FormSubmission.objects.count(), 0)
+
+        data = {"whf_name": "", "whf_time": self.form_view_time - 10}
+        self.assertEqual(get_rejection_reason(data, self.form_page.pk), "pow")
+
+    def test_other_page(self):
+        self.post(solve(make_challenge(self.form_page.pk + 1)))
+        self.assertEqual(FormSubmission.objects.count(), 0)
+
+    def test_replayed(self):
+        value = solve(make_challenge(self.form_page.pk))
+        self.post(value)
+        self.post(value)
+        self.assertEqual(FormSubmission.objects.count(), 1)
+
+        data = {"whf_name": "", "whf_time": self.form_view_time - 10, "whf_pow": value}
+        self.assertEqual(get_rejection_reason(data, self.form_page.pk), "replay")
+
+    @override_settings(HONEYPOT_POW_TARGET_RATE=1)
+    def test_submissions_raise_difficulty(self):
+        self.post("")
+        self.post("")
+        self.assertGreater(get_difficulty(self.form_page.pk), 4)
+
+    def test_template_tag(self):
+        context = honeypot_fields(True, self.form_page)
+        self.assertEqual(context["honeypot_pow_field"], "whf_pow")
+        self.assertEqual(
+            read_challenge(context["challenge"]).page_id, self.form_page.pk
+        )
+
+        resp = self.client.get("/formpage/")
+        self.assertContains(resp, 'name="whf_pow" data-honeypot-pow="')
+
+    def test_template_tag_without_page(self):
+        template = Template(
+            "{% load honeypot_tags %}{% honeypot_fields page.honeypot %}"
+        )
+        with self.assertRaises(ImproperlyConfigured):
+            template.render(Context({"page": self.form_page}))
+
+        # the challenge rendered with the page passes its check
+        template = Template(
+            "{% load honeypot_tags %}{% honeypot_fields page.honeypot page %}"
+        )
+        soup = bs4(template.render(Context({"page": self.form_page})), "html.parser")
+        challenge = soup.find("input", {"name": "whf_pow"})["data-honeypot-pow"]
+        self.post(solve(challenge))
+        self.assertEqual(FormSubmission.objects.count(), 1)
+
+    @override_settings(HONEYPOT_FETCH_TOKEN=True)
+    def test_token_view(self):
+        self.assertEqual(honeypot_fields(True, self.form_page)["challenge"], "")
+        resp = self.client.get("/honeypot/token/", {"page": self.form_page.pk})
+        challenge = read_challenge(resp.json()["challenge"])
+        self.assertEqual(challenge.page_id, self.form_page.pk)
+
+    def test_validator(self):
+        validator = HoneypotValidator(self.form_page.pk)
+        data = {"whf_name": "", "whf_time": self.form_view_time - 10}
+        self.assertEqual(validator.validate(data), "pow")
+        data["whf_pow"] = solve(make_challenge(self.form_page.pk))
+        self.assertIsNone(validator.validate(data))
+        self.assertEqual(validator.validate(data), "replay")
@@ -0,0 +1,79 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+
+from wagtail_honeypot.conf import HoneypotConfig, get_config
+
+
+class TestHoneypotConfig(TestCase):
+    """
+    Test the honeypot config built from the settings
+    """
+
+    def test_defaults(self):
+        config = get_config()
+        self.assertEqual(config.name_field, "whf_name")
+        self.assertEqual(config.time_field, "whf_time")
+        self.assertEqual(config.time_interval, 3)
+        self.assertFalse(config.signed_tokens)
+
+    def test_built_once(self):
+        self.assertIs(get_config(), get_config())
+
+    def test_read_only(self):
+        config = get_config()
+        with self.assertRaises(AttributeError):
+            config.time_interval = 10
+        with self.assertRaises(AttributeError):
+            config.foo = "bar"
+        self.assertFalse(hasattr(config, "__dict__"))
+
+    @override_settings(HONEYPOT_NAME_FIELD="Foo Bar", HONEYPOT_TIME_INTERVAL=10)
+    def test_override_settings(self):
+        config = get_config()
+        self.assertEqual(config.name_field, "Foo Bar")
+        self.assertEqual(config.name_field_slug, "foo-bar")
+        self.assertEqual(config.time_interval, 10)
+
+    def test_override_settings_restored(self):
+        with override_settings(HONEYPOT_TIME_INTERVAL=10):
+            self.assertEqual(get_config().time_interval, 10)
+        self.assertEqual(get_config().time_interval, 3)
+
+    @override_settings(HONEYPOT_MIDDLEWARE_PATHS=["/foo/"])
+    def test_middleware_paths(self):
+        self.assertEqual(get_config().middleware_paths, ("/foo/",))
+
+    def test_invalid_settings(self):
+        for setting, value in (
+            ("HONEYPOT_NAME_FIELD", ""),
+            ("HONEYPOT_TIME_FIELD", "whf_name"),
+            ("HONEYPOT_TIME_INTERVAL", "3"),
+            ("HONEYPOT_TOKEN_MAX_AGE", 0),
+            ("HONEYPOT_RATE_LIMIT", -1),
+            ("HONEYPOT_TRUSTED_PROXIES", 0),
+            ("HONEYPOT_QUEUE_MAX_SIZE", 0),
+            ("HONEYPOT_QUEUE_FULL", "block"),
+            ("HONEYPOT_ATTEMPT_SAMPLE_RATE", 2),
+            ("HONEYPOT_NONCE_CACHE", "foo"),
+            ("HONEYPOT_METRICS_TOKEN", ""),
+            ("HONEYPOT_RATE_LIMIT_CACHE", None),
+            ("HONEYPOT_POW_FIELD", "whf_time"),
+            ("HONEYPOT_POW_MAX_DIFFICULTY", 33),
+            ("HONEYPOT_POW_MIN_DIFFICULTY", 23),
+        ):
+            with self.subTest(setting=setting):
+                with self.assertRaises(ImproperlyConfigured):
+                    with self.settings(**{setting: value}):
+                        pass
+        with self.assertRaises(ImproperlyConfigured):
+            with self.settings(
+                HONEYPOT_SINGLE_USE_TOKENS=True, HONEYPOT_SIGNED_TOKENS=False
+            ):
+                pass
+        # the valid settings are restored
+        self.assertEqual(get_config().time_interval, 3)
+
+    def test_from_settings(self):
+        config = HoneypotConfig.from_settings()
+        self.assertIsNot(config, get_config())
+        self.assertEqual(config.time_field_slug, "whf_time")
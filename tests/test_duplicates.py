@@ -0,0 +1,119 @@
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from wagtail.contrib.forms.models import FormSubmission
+from wagtail.models import Page
+
+from tests.testapp.models import FormField, FormPage
+from wagtail_honeypot.duplicates import (
+    LocalDuplicates,
+    get_fingerprints,
+    get_local_duplicates,
+    is_duplicate,
+)
+from wagtail_honeypot.metrics import metrics
+
+MESSAGE = "Buy cheap followers for your website today"
+
+
+class TestHoneypotDuplicates(TestCase):
+    """
+    Test repeated submissions are found by their fingerprints
+    """
+
+    def setUp(self):
+        cache.clear()
+        get_local_duplicates().entries.clear()
+
+    def test_fingerprints(self):
+        exact, normalised = get_fingerprints({"name": "foo", "message": MESSAGE})
+        self.assertEqual(
+            get_fingerprints({"message": MESSAGE, "name": "foo"}), [exact, normalised]
+        )
+
+        fingerprints = get_fingerprints(
+            {
+                "email": "bar@example.com",
+                "comments": "  BUY cheap followers, for your website today!",
+            }
+        )
+        self.assertNotEqual(fingerprints[0], exact)
+        self.assertEqual(fingerprints[1], normalised)
+
+    def test_short_values_not_normalised(self):
+        self.assertEqual(len(get_fingerprints({"name": "foo", "agree": True})), 1)
+        self.assertEqual(len(get_fingerprints({"choices": ["a", "b"]})), 1)
+
+    def test_local_duplicates(self):
+        local = LocalDuplicates(2)
+        local.add("a", 60)
+        local.add("b", 60)
+        self.assertTrue(local.contains("a"))
+        local.add("c", 60)
+        self.assertFalse(local.contains("b"))
+        self.assertTrue(local.contains("a"))
+        local.add("d", -1)
+        self.assertFalse(local.contains("d"))
+
+    @override_settings(HONEYPOT_DUPLICATE_LIMIT=2)
+    def test_is_duplicate(self):
+        self.assertFalse(is_duplicate({"name": "foo", "message": MESSAGE}))
+        self.assertFalse(is_duplicate({"name": "bar", "message": MESSAGE}))
+        self.assertTrue(is_duplicate({"name": "baz", "message": MESSAGE.upper()}))
+        self.assertFalse(is_duplicate({"name": "baz", "message": "Something else"}))
+
+    @override_settings(HONEYPOT_DUPLICATE_LIMIT=1)
+    def test_local_lookup(self):
+        data = {"name": "foo", "message": MESSAGE}
+        is_duplicate(data)
+        self.assertTrue(is_duplicate(data))
+        with mock.patch("wagtail_honeypot.duplicates.caches") as caches:
+            self.assertTrue(is_duplicate(data))
+        caches.__getitem__.assert_not_called()
+
+
+@override_settings(HONEYPOT_DUPLICATE_LIMIT=1, HONEYPOT_METRICS=True)
+class TestHoneypotDuplicatesForm(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        get_local_duplicates().entries.clear()
+        metrics.reset()
+        home_page = Page.objects.get(id=1).get_children().first()
+        self.form_pages = []
+        for slug in ("contact", "newsletter"):
+            form_page = FormPage(
+                title=slug,
+                slug=slug,
+                honeypot=True,
+                thank_you_text="Thank you for your message",
+            )
+            home_page.add_child(instance=form_page)
+            FormField.objects.create(
+                page=form_page, label="Message", field_type="multiline", required=True
+            )
+            form_page.save_revision().publish()
+            self.form_pages.append(form_page)
+        self.form_view_time = int(time.time())
+
+    def post(self, page, message):
+        return self.client.post(
+            page.url,
+            {"message": message, "whf_name": "", "whf_time": self.form_view_time - 10},
+        )
+
+    def test_duplicate_dropped(self):
+        contact, newsletter = self.form_pages
+        self.post(contact, MESSAGE)
+        self.post(newsletter, MESSAGE + "!")
+        self.post(contact, "A different message for the contact form")
+        self.assertEqual(FormSubmission.objects.count(), 2)
+        self.assertEqual(metrics.get_submission_count("blocked", reason="duplicate"), 1)
+
+    @override_settings(HONEYPOT_DUPLICATE_LIMIT=None)
+    def test_disabled(self):
+        self.post(self.form_pages[0], MESSAGE)
+        self.post(self.form_pages[0], MESSAGE)
+        self.assertEqual(FormSubmission.objects.count(), 2)
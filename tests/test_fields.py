@@ -0,0 +1,113 @@
+import time
+from unittest import mock
+
+from bs4 import BeautifulSoup as bs4
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from wagtail.contrib.forms.models import FormSubmission
+from wagtail.models import Page
+
+from tests.testapp.models import FormField, FormPage
+from wagtail_honeypot.fields import (
+    derive_field_names,
+    get_accepted_field_names,
+    get_bucket,
+    get_field_names,
+)
+
+
+class TestHoneypotFieldNames(TestCase):
+    """
+    Test the honeypot field names
+    """
+
+    def test_fixed_names(self):
+        self.assertEqual(get_field_names(), ("whf_name", "whf_time"))
+        self.assertEqual(get_accepted_field_names(), (("whf_name", "whf_time"),))
+
+    def test_derived_names(self):
+        name_field, time_field = derive_field_names(1, "secret")
+        self.assertEqual(derive_field_names(1, "secret"), (name_field, time_field))
+        self.assertNotEqual(name_field, time_field)
+        self.assertNotEqual(derive_field_names(2, "secret")[0], name_field)
+        self.assertNotEqual(derive_field_names(1, "other")[0], name_field)
+
+    @override_settings(HONEYPOT_ROTATE_FIELDS=True, HONEYPOT_ROTATION_HOURS=2)
+    def test_rotating_names(self):
+        now = time.time()
+        self.assertEqual(get_bucket(now), int(now // 7200))
+
+        current, previous = get_accepted_field_names()
+        self.assertEqual(get_field_names(), current)
+        self.assertEqual(previous, derive_field_names(get_bucket() - 1, "secret"))
+
+        with mock.patch("time.time", return_value=now + 7200):
+            self.assertEqual(get_accepted_field_names()[1], current)
+            self.assertNotEqual(get_field_names(), current)
+
+    @override_settings(HONEYPOT_ROTATE_FIELDS=True)
+    def test_template_tag_rendered(self):
+        name_field, time_field = get_field_names()
+        template = Template("{% load honeypot_tags %}{% honeypot_fields True %}")
+        soup = bs4(template.render(Context()), "html.parser")
+
+        self.assertIsNotNone(soup.find("input", {"name": name_field, "type": "text"}))
+        input_time = soup.find("input", {"name": time_field, "type": "hidden"})
+        self.assertEqual(input_time["data-honeypot-name"], name_field)
+
+
+@override_settings(HONEYPOT_ROTATE_FIELDS=True)
+class TestHoneypotFormRotatingFields(TestCase):
+
+    def setUp(self):
+        """
+        Enable honeypot on FormPage with rotating field names
+        """
+        root_page = Page.objects.get(id=1)
+        home_page = root_page.get_children().first()
+
+        form_page = FormPage(
+            title="Form Page",
+            slug="formpage",
+            honeypot=True,
+            thank_you_text="Thank you for your message",
+        )
+        home_page.add_child(instance=form_page)
+        FormField.objects.create(
+            page=form_page, label="Name", field_type="singleline", required=True
+        )
+        form_page.save_revision().publish()
+
+        self.form_view_time = int(time.time())
+
+    def post(self, names, name_value=""):
+        name_field, time_field = names
+        return self.client.post(
+            "/formpage/",
+            {
+                "name": "foo",
+                name_field: name_value,
+                time_field: self.form_view_time - 10,
+            },
+        )
+
+    def test_form_submission_current_names(self):
+        resp = self.post(get_accepted_field_names()[0])
+        self.assertEqual(FormSubmission.objects.all().count(), 1)
+        self.assertContains(resp, "Thank you for your message")
+
+    def test_form_submission_previous_names(self):
+        self.post(get_accepted_field_names()[1])
+        self.assertEqual(FormSubmission.objects.all().count(), 1)
+
+    def test_form_submission_fixed_names(self):
+        self.post(("whf_name", "whf_time"))
+        self.assertEqual(FormSubmission.objects.all().count(), 0)
+
+    def test_form_submission_old_names(self):
+        self.post(derive_field_names(get_bucket() - 2, "secret"))
+        self.assertEqual(FormSubmission.objects.all().count(), 0)
+
+    def test_form_submission_field_filled(self):
+        self.post(get_accepted_field_names()[0], "foo")
+        self.assertEqual(FormSubmission.objects.all().count(), 0)
@@ -1,4 +1,5 @@
 import time
+from unittest import mock
 
 from django.test import TestCase
 from wagtail.contrib.forms.models import FormSubmission
@@ -165,3 +166,43 @@ class TestHoneypotFormEnabled(TestCase):
         submissions_count = FormSubmission.objects.all().count()
         self.assertEqual(submissions_count, 0)
         self.assertContains(resp, "Thank you for your message")
+
+    def test_form_not_built_when_honeypot_fails(self):
+        """
+        Test that a failing submission skips building and validating the form
+
+        When the honeypot is enabled the verdict is taken from the POST data
+        before the form fields are queried
+        """
+        with mock.patch.object(FormPage, "get_form_fields") as get_form_fields:
+            resp = self.client.post(
+                "/formpage/",
+                {
+                    "name": "foo",
+                    "email_address": "foo@foo.com",
+                    "message": "foo",
+                    "whf_name": "foo",  # text in the honeypot field
+                    "whf_time": self.form_view_time - 10,  # A time in the past
+                },
+            )
+        get_form_fields.assert_not_called()
+        self.assertEqual(FormSubmission.objects.all().count(), 0)
+        self.assertContains(resp, "Thank you for your message")
+
+    def test_form_submission_honeypot_fields_missing(self):
+        """
+        Test that a form submission is unsuccessful
+
+        When the honeypot is enabled and the honeypot fields are not posted
+        """
+        resp = self.client.post(
+            "/formpage/",
+            {
+                "name": "foo",
+                "email_address": "foo@foo.com",
+                "message": "foo",
+            },
+        )
+        submissions_count = FormSubmission.objects.all().count()
+        self.assertEqual(submissions_count, 0)
+        self.assertContains(resp, "Thank you for your message")
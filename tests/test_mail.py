@@ -0,0 +1,157 @@
+import smtplib
+import time
+from io import StringIO
+from unittest import mock
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from wagtail.contrib.forms.models import FormSubmission
+from wagtail.models import Page
+
+from tests.testapp.models import FormField, FormPage
+from wagtail_honeypot.mail import send_queued_mail
+from wagtail_honeypot.models import QueuedEmail
+
+
+@override_settings(HONEYPOT_QUEUE_EMAIL=True)
+class TestHoneypotQueuedEmail(TestCase):
+
+    def setUp(self):
+        """
+        Enable honeypot on FormPage with a notification email
+        """
+        root_page = Page.objects.get(id=1)
+        home_page = root_page.get_children().first()
+
+        form_page = FormPage(
+            title="Form Page",
+            slug="formpage",
+            honeypot=True,
+            thank_you_text="Thank you for your message",
+            to_address="foo@foo.com, bar@bar.com",
+            from_address="form@foo.com",
+            subject="New submission",
+        )
+        home_page.add_child(instance=form_page)
+        FormField.objects.create(
+            page=form_page, label="Name", field_type="singleline", required=True
+        )
+        form_page.save_revision().publish()
+
+        self.form_view_time = int(time.time())
+
+    def post(self):
+        return self.client.post(
+            "/formpage/",
+            {"name": "foo", "whf_name": "", "whf_time": self.form_view_time - 10},
+        )
+
+    def test_form_submission_email_queued(self):
+        resp = self.post()
+        self.assertContains(resp, "Thank you for your message")
+        self.assertEqual(FormSubmission.objects.all().count(), 1)
+        self.assertEqual(len(mail.outbox), 0)
+
+        email = QueuedEmail.objects.get()
+        self.assertEqual(email.subject, "New submission")
+        self.assertEqual(email.recipient_list, "foo@foo.com,bar@bar.com")
+        self.assertIn("Name: foo", email.message)
+
+    @override_settings(HONEYPOT_QUEUE_EMAIL=False)
+    def test_form_submission_email_sent(self):
+        self.post()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertFalse(QueuedEmail.objects.exists())
+
+    def test_send_queued_mail(self):
+        self.post()
+        self.post()
+        self.assertEqual(send_queued_mail(), (2, 0))
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(mail.outbox[0].to, ["foo@foo.com", "bar@bar.com"])
+        self.assertEqual(mail.outbox[0].from_email, "form@foo.com")
+        self.assertFalse(QueuedEmail.objects.exists())
+
+    def test_send_queued_mail_batch_size(self):
+        self.post()
+        self.post()
+        self.assertEqual(send_queued_mail(batch_size=1), (1, 0))
+        self.assertEqual(QueuedEmail.objects.count(), 1)
+
+    def test_send_queued_mail_server_unavailable(self):
+        self.post()
+        self.post()
+        with mock.patch(
+            "wagtail_honeypot.mail.send_mail",
+            side_effect=smtplib.SMTPServerDisconnected(),
+        ) as send_mail:
+            self.assertEqual(send_queued_mail(), (0, 1))
+        # the batch stops at the first failure
+        self.assertEqual(send_mail.call_count, 1)
+
+        email = QueuedEmail.objects.filter(attempts=1).get()
+        self.assertGreater(email.send_after, email.created_at)
+        self.assertIn("SMTPServerDisconnected", email.last_error)
+
+        # the failed email isn't retried until the delay has passed
+        self.assertEqual(send_queued_mail(), (1, 0))
+        self.assertEqual(QueuedEmail.objects.count(), 1)
+
+    def test_send_queued_mail_connection_refused(self):
+        self.post()
+        self.post()
+        with mock.patch(
+            "django.core.mail.backends.locmem.EmailBackend.open",
+            side_effect=ConnectionRefusedError(),
+        ):
+            self.assertEqual(send_queued_mail(), (0, 2))
+        self.assertEqual(len(mail.outbox), 0)
+        # the whole batch is retried later
+        self.assertEqual(QueuedEmail.objects.filter(attempts=1).count(), 2)
+        self.assertIn("ConnectionRefusedError", QueuedEmail.objects.first().last_error)
+        self.assertEqual(send_queued_mail(), (0, 0))
+
+    @override_settings(HONEYPOT_QUEUE_MAX_SIZE=1)
+    def test_queue_full_sends(self):
+        self.post()
+        self.post()
+        self.assertEqual(QueuedEmail.objects.count(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+    @override_settings(HONEYPOT_QUEUE_MAX_SIZE=1, HONEYPOT_QUEUE_FULL="drop")
+    def test_queue_full_drops(self):
+        self.post()
+        with self.assertLogs("wagtail_honeypot.models", "WARNING"):
+            self.post()
+        self.assertEqual(QueuedEmail.objects.count(), 1)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(FormSubmission.objects.count(), 2)
+
+    @override_settings(HONEYPOT_QUEUE_MAX_SIZE=None)
+    def test_queue_unbounded(self):
+        self.post()
+        self.post()
+        self.assertEqual(QueuedEmail.objects.count(), 2)
+
+    def test_send_queued_mail_message_refused(self):
+        self.post()
+        self.post()
+        with mock.patch(
+            "wagtail_honeypot.mail.send_mail",
+            side_effect=smtplib.SMTPRecipientsRefused({}),
+        ) as send_mail:
+            self.assertEqual(send_queued_mail(), (0, 2))
+        self.assertEqual(send_mail.call_count, 2)
+
+    def test_send_queued_mail_max_attempts(self):
+        self.post()
+        QueuedEmail.objects.update(attempts=5)
+        self.assertEqual(send_queued_mail(max_attempts=5), (0, 0))
+
+    def test_command(self):
+        self.post()
+        out = StringIO()
+        call_command("honeypot_send_mail", stdout=out)
+        self.assertIn("Sent 1 emails, 0 failed", out.getvalue())
+        self.assertEqual(len(mail.outbox), 1)
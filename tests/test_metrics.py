@@ -0,0 +1,134 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from wagtail.models import Page
+
+from tests.testapp.models import FormField, FormPage
+from wagtail_honeypot.metrics import Histogram, metrics
+
+
+class TestHoneypotHistogram(TestCase):
+
+    def test_quantile(self):
+        histogram = Histogram()
+        for value in (0.0001, 0.0002, 0.0003, 0.02):
+            histogram.observe(value)
+        self.assertEqual(histogram.count, 4)
+        self.assertEqual(histogram.quantile(0.5), 0.0005)
+        self.assertEqual(histogram.quantile(0.99), 0.025)
+
+    def test_quantile_empty(self):
+        self.assertIsNone(Histogram().quantile(0.5))
+
+
+@override_settings(HONEYPOT_METRICS=True)
+class TestHoneypotMetrics(TestCase):
+
+    def setUp(self):
+        """
+        Enable honeypot on FormPage and collect metrics
+        """
+        metrics.reset()
+        root_page = Page.objects.get(id=1)
+        home_page = root_page.get_children().first()
+
+        self.form_page = FormPage(
+            title="Form Page",
+            slug="formpage",
+            honeypot=True,
+            thank_you_text="Thank you for your message",
+            to_address="foo@foo.com",
+        )
+        home_page.add_child(instance=self.form_page)
+        FormField.objects.create(
+            page=self.form_page, label="Name", field_type="singleline", required=True
+        )
+        self.form_page.save_revision().publish()
+
+        self.form_view_time = int(time.time())
+
+    def post(self, **data):
+        return self.client.post("/formpage/", dict({"name": "foo"}, **data))
+
+    def test_submissions_counted(self):
+        self.post(whf_name="", whf_time=self.form_view_time - 10)
+        self.post(whf_name="foo", whf_time=self.form_view_time - 10)
+        self.post(whf_name="", whf_time=self.form_view_time)
+        self.post()
+
+        self.assertEqual(
+            metrics.get_submission_count("allowed", page_id=self.form_page.pk), 1
+        )
+        self.assertEqual(metrics.get_submission_count("blocked"), 3)
+        for reason in ("field", "time", "missing"):
+            self.assertEqual(metrics.get_submission_count(reason=reason), 1)
+
+    def test_stages_timed(self):
+        self.post(whf_name="", whf_time=self.form_view_time - 10)
+        self.assertEqual(metrics.get_stage("precheck").count, 1)
+        self.assertEqual(metrics.get_stage("check").count, 1)
+        self.assertEqual(metrics.get_stage("save").count, 1)
+        self.assertEqual(metrics.get_stage("email").count, 1)
+
+    @override_settings(
+        MIDDLEWARE=["wagtail_honeypot.middleware.HoneypotMiddleware"]
+        + settings.MIDDLEWARE
+    )
+    def test_middleware_stage_timed_when_checked(self):
+        for _ in range(3):
+            self.client.get("/formpage/")
+        self.assertIsNone(metrics.get_stage("middleware"))
+        self.post(whf_name="", whf_time=self.form_view_time - 10)
+        self.assertEqual(metrics.get_stage("middleware").count, 1)
+        self.assertEqual(metrics.get_stage("precheck").count, 1)
+        self.assertEqual(metrics.get_stage("check").count, 1)
+
+    @override_settings(HONEYPOT_METRICS=False)
+    def test_disabled(self):
+        self.post(whf_name="", whf_time=self.form_view_time - 10)
+        self.post()
+        self.assertEqual(metrics.get_submission_count(), 0)
+        self.assertIsNone(metrics.get_stage("check"))
+
+    def test_metrics_view(self):
+        self.post(whf_name="foo", whf_time=self.form_view_time - 10)
+        user = get_user_model().objects.create_user("staff", is_staff=True)
+        self.client.force_login(user)
+        resp = self.client.get("/honeypot/metrics/")
+        self.assertEqual(resp.status_code, 200)
+        self.assertContains(
+            resp,
+            'wagtail_honeypot_submissions_total{outcome="blocked",'
+            f'reason="field",page="{self.form_page.pk}"}} 1',
+        )
+        # rejected before the form is built
+        self.assertContains(
+            resp,
+            'wagtail_honeypot_stage_seconds_bucket{stage="precheck",le="+Inf"} 1',
+        )
+        self.assertContains(
+            resp, 'wagtail_honeypot_stage_seconds_count{stage="precheck"} 1'
+        )
+        self.assertNotContains(resp, 'stage="check"')
+
+    def test_metrics_view_forbidden(self):
+        resp = self.client.get("/honeypot/metrics/")
+        self.assertEqual(resp.status_code, 403)
+        user = get_user_model().objects.create_user("editor")
+        self.client.force_login(user)
+        resp = self.client.get("/honeypot/metrics/")
+        self.assertEqual(resp.status_code, 403)
+
+    @override_settings(HONEYPOT_METRICS_TOKEN="secret")
+    def test_metrics_view_token(self):
+        resp = self.client.get("/honeypot/metrics/", HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(resp.status_code, 200)
+        resp = self.client.get("/honeypot/metrics/", HTTP_AUTHORIZATION="Bearer foo")
+        self.assertEqual(resp.status_code, 403)
+
+    @override_settings(HONEYPOT_METRICS=False)
+    def test_metrics_view_disabled(self):
+        resp = self.client.get("/honeypot/metrics/")
+        self.assertEqual(resp.status_code, 404)
@@ -0,0 +1,133 @@
+import json
+import time
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from wagtail_honeypot import challenges
+from wagtail_honeypot.challenges import read_challenge
+from wagtail_honeypot.middleware import HoneypotMiddleware
+
+
+class TestHoneypotMiddleware(TestCase):
+    """
+    Test the honeypot middleware rejects requests before the view is called
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.calls = []
+        self.form_view_time = int(str(time.time()).split(".")[0])
+
+    def get_response(self, request):
+        self.calls.append(request)
+        return HttpResponse("Thank you for your message")
+
+    async def aget_response(self, request):
+        self.calls.append(request)
+        return HttpResponse("Thank you for your message")
+
+    def post(self, path="/formpage/", **data):
+        return self.factory.post(path, data)
+
+    def test_get_passes_through(self):
+        middleware = HoneypotMiddleware(self.get_response)
+        middleware(self.factory.get("/formpage/"))
+        self.assertEqual(len(self.calls), 1)
+
+    def test_post_without_honeypot_fields_passes_through(self):
+        middleware = HoneypotMiddleware(self.get_response)
+        middleware(self.post(name="foo"))
+        self.assertEqual(len(self.calls), 1)
+
+    def test_valid_post_passes_through(self):
+        middleware = HoneypotMiddleware(self.get_response)
+        resp = middleware(self.post(whf_name="", whf_time=self.form_view_time - 10))
+        self.assertEqual(len(self.calls), 1)
+        self.assertContains(resp, "Thank you for your message")
+
+    def test_filled_field_rejected(self):
+        middleware = HoneypotMiddleware(self.get_response)
+        resp = middleware(self.post(whf_name="foo", whf_time=self.form_view_time - 10))
+        self.assertEqual(len(self.calls), 0)
+        self.assertEqual(resp.status_code, 200)
+
+    def test_fast_submit_rejected(self):
+        middleware = HoneypotMiddleware(self.get_response)
+        middleware(self.post(whf_name="", whf_time=self.form_view_time))
+        self.assertEqual(len(self.calls), 0)
+
+    def test_invalid_time_rejected(self):
+        middleware = HoneypotMiddleware(self.get_response)
+        middleware(self.post(whf_name="", whf_time="foo"))
+        self.assertEqual(len(self.calls), 0)
+
+    @override_settings(HONEYPOT_MIDDLEWARE_PATHS=["/formpage/"])
+    def test_configured_path_missing_fields_rejected(self):
+        middleware = HoneypotMiddleware(self.get_response)
+        middleware(self.post(name="foo"))
+        self.assertEqual(len(self.calls), 0)
+
+    @override_settings(HONEYPOT_MIDDLEWARE_PATHS=["/formpage/"])
+    def test_other_path_not_checked(self):
+        middleware = HoneypotMiddleware(self.get_response)
+        middleware(self.post("/other/", whf_name="foo"))
+        self.assertEqual(len(self.calls), 1)
+
+    def test_async_filled_field_rejected(self):
+        middleware = HoneypotMiddleware(self.aget_response)
+        request = self.post(whf_name="foo", whf_time=self.form_view_time - 10)
+        resp = async_to_sync(middleware)(request)
+        self.assertEqual(len(self.calls), 0)
+        self.assertEqual(resp.status_code, 200)
+
+    def test_async_valid_post_passes_through(self):
+        middleware = HoneypotMiddleware(self.aget_response)
+        request = self.post(whf_name="", whf_time=self.form_view_time - 10)
+        async_to_sync(middleware)(request)
+        self.assertEqual(len(self.calls), 1)
+
+    @override_settings(HONEYPOT_RATE_LIMIT=2)
+    def test_rate_limited(self):
+        middleware = HoneypotMiddleware(self.get_response)
+        for _ in range(3):
+            request = self.post(whf_name="", whf_time=self.form_view_time - 10)
+            middleware(request)
+        self.assertEqual(len(self.calls), 2)
+        # the form page doesn't count the request again
+        self.assertTrue(self.calls[0].honeypot_rate_counted)
+
+    @override_settings(HONEYPOT_RATE_LIMIT=2)
+    def test_async_rate_limited(self):
+        middleware = HoneypotMiddleware(self.aget_response)
+        for _ in range(3):
+            request = self.post(whf_name="", whf_time=self.form_view_time - 10)
+            async_to_sync(middleware)(request)
+        self.assertEqual(len(self.calls), 2)
+
+    @override_settings(HONEYPOT_RATE_LIMIT=2, HONEYPOT_RATE_LIMIT_PER_PAGE=True)
+    def test_rate_limit_per_page_left_to_page(self):
+        middleware = HoneypotMiddleware(self.aget_response)
+        for _ in range(3):
+            request = self.post(whf_name="", whf_time=self.form_view_time - 10)
+            async_to_sync(middleware)(request)
+        self.assertEqual(len(self.calls), 3)
+        self.assertFalse(hasattr(self.calls[0], "honeypot_rate_counted"))
+
+    @override_settings(HONEYPOT_POW=True)
+    def test_async_token_view(self):
+        middleware = HoneypotMiddleware(self.aget_response)
+        request = self.factory.get("/honeypot/token/", {"page": 5})
+        # the difficulty is read with the async cache API
+        with mock.patch.object(
+            challenges, "get_difficulty", side_effect=AssertionError
+        ):
+            resp = async_to_sync(middleware)(request)
+        self.assertEqual(len(self.calls), 0)
+        challenge = json.loads(resp.content)["challenge"]
+        self.assertEqual(read_challenge(challenge).page_id, 5)
+        self.assertIn("no-cache", resp["Cache-Control"])
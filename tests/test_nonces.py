@@ -0,0 +1,96 @@
+import time
+
+from django.test import TestCase, override_settings
+from wagtail.contrib.forms.models import FormSubmission
+from wagtail.models import Page
+
+from tests.testapp.models import FormField, FormPage
+from wagtail_honeypot.nonces import CacheNonceStore, LocalNonceStore, get_nonce_store
+from wagtail_honeypot.tokens import make_token
+
+
+class TestHoneypotNonceStores(TestCase):
+    """
+    Test the stores used to remember redeemed nonces
+    """
+
+    def test_local_store(self):
+        store = LocalNonceStore(10)
+        self.assertFalse(store.contains("foo"))
+        self.assertTrue(store.add("foo", 60))
+        self.assertTrue(store.contains("foo"))
+        self.assertFalse(store.add("foo", 60))
+
+    def test_local_store_expired(self):
+        store = LocalNonceStore(10)
+        store.add("foo", -1)
+        self.assertFalse(store.contains("foo"))
+        self.assertTrue(store.add("foo", 60))
+
+    def test_local_store_bounded(self):
+        store = LocalNonceStore(10)
+        for i in range(100):
+            store.add(str(i), 60)
+        self.assertEqual(len(store.entries), 10)
+        self.assertFalse(store.contains("0"))
+        self.assertTrue(store.contains("99"))
+
+    def test_cache_store(self):
+        store = CacheNonceStore("default")
+        self.assertFalse(store.contains("foo"))
+        self.assertTrue(store.add("foo", 60))
+        self.assertTrue(store.contains("foo"))
+        self.assertFalse(store.add("foo", 60))
+
+    def test_get_nonce_store(self):
+        self.assertIsInstance(get_nonce_store(), CacheNonceStore)
+        with override_settings(HONEYPOT_NONCE_CACHE=None):
+            self.assertIsInstance(get_nonce_store(), LocalNonceStore)
+            self.assertIs(get_nonce_store(), get_nonce_store())
+
+
+@override_settings(HONEYPOT_SIGNED_TOKENS=True, HONEYPOT_SINGLE_USE_TOKENS=True)
+class TestHoneypotFormSingleUseTokens(TestCase):
+
+    def setUp(self):
+        """
+        Enable honeypot on FormPage with single use tokens
+        """
+        root_page = Page.objects.get(id=1)
+        home_page = root_page.get_children().first()
+
+        self.form_page = FormPage(
+            title="Form Page",
+            slug="formpage",
+            honeypot=True,
+            thank_you_text="Thank you for your message",
+        )
+        home_page.add_child(instance=self.form_page)
+        FormField.objects.create(
+            page=self.form_page, label="Name", field_type="singleline", required=True
+        )
+        self.form_page.save_revision().publish()
+
+        self.token = make_token(self.form_page.pk, timestamp=int(time.time()) - 10)
+
+    def post(self):
+        return self.client.post(
+            "/formpage/", {"name": "foo", "whf_name": "", "whf_time": self.token}
+        )
+
+    def test_form_submission_replayed(self):
+        self.post()
+        resp = self.post()
+        self.assertEqual(FormSubmission.objects.all().count(), 1)
+        self.assertContains(resp, "Thank you for your message")
+
+    @override_settings(HONEYPOT_NONCE_CACHE=None)
+    def test_form_submission_replayed_local_store(self):
+        self.post()
+        self.post()
+        self.assertEqual(FormSubmission.objects.all().count(), 1)
+
+    def test_invalid_form_does_not_use_token(self):
+        self.client.post("/formpage/", {"whf_name": "", "whf_time": self.token})
+        self.post()
+        self.assertEqual(FormSubmission.objects.all().count(), 1)
@@ -0,0 +1,240 @@
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.db import DatabaseError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from wagtail.contrib.forms.models import FormSubmission
+from wagtail.models import Page
+
+from tests.testapp.models import FormField, FormPage
+from wagtail_honeypot import admin_views
+from wagtail_honeypot.models import QuarantinedSubmission, QueuedEmail
+from wagtail_honeypot.quarantine import delete, quarantine, release, render_email
+
+
+@override_settings(HONEYPOT_QUARANTINE=True)
+class TestHoneypotQuarantine(TestCase):
+
+    def setUp(self):
+        """
+        Enable honeypot on FormPage and quarantine the blocked submissions
+        """
+        root_page = Page.objects.get(id=1)
+        home_page = root_page.get_children().first()
+
+        self.form_page = FormPage(
+            title="Form Page",
+            slug="formpage",
+            honeypot=True,
+            thank_you_text="Thank you for your message",
+            to_address="to@example.com",
+            from_address="from@example.com",
+            subject="New submission",
+        )
+        home_page.add_child(instance=self.form_page)
+        FormField.objects.create(
+            page=self.form_page, label="Name", field_type="singleline", required=True
+        )
+        self.form_page.save_revision().publish()
+
+        self.form_view_time = int(time.time())
+
+    def post(self, **data):
+        return self.client.post("/formpage/", dict({"name": "foo"}, **data))
+
+    def quarantine(self, count, **data):
+        for i in range(count):
+            quarantine(self.form_page.pk, dict({"name": f"foo {i}"}, **data), "time")
+        return list(QuarantinedSubmission.objects.order_by("pk"))
+
+    def test_blocked_submissions_quarantined(self):
+        resp = self.post(whf_name="foo", whf_time=self.form_view_time - 10)
+        self.assertContains(resp, "Thank you for your message")
+        # saved straight away, without waiting for more submissions
+        self.assertEqual(QuarantinedSubmission.objects.count(), 1)
+
+        self.post(whf_name="", whf_time=self.form_view_time)
+        self.post(whf_name="", whf_time="")
+        self.assertEqual(FormSubmission.objects.count(), 0)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(
+            sorted(QuarantinedSubmission.objects.values_list("reason", flat=True)),
+            ["field", "time", "time"],
+        )
+        submission = QuarantinedSubmission.objects.first()
+        self.assertEqual(submission.page_id, self.form_page.pk)
+        self.assertEqual(submission.form_data, {"name": "foo"})
+
+    def test_passed_submission_not_quarantined(self):
+        self.post(whf_name="", whf_time=self.form_view_time - 10)
+        self.assertEqual(FormSubmission.objects.count(), 1)
+        self.assertEqual(QuarantinedSubmission.objects.count(), 0)
+
+    @override_settings(HONEYPOT_QUARANTINE=False)
+    def test_not_quarantined_when_disabled(self):
+        self.post(whf_name="foo", whf_time=self.form_view_time - 10)
+        self.assertEqual(QuarantinedSubmission.objects.count(), 0)
+
+    def test_database_error_logged(self):
+        with mock.patch.object(
+            QuarantinedSubmission.objects, "create", side_effect=DatabaseError
+        ):
+            with self.assertLogs("wagtail_honeypot.quarantine", "ERROR"):
+                self.assertFalse(quarantine(self.form_page.pk, {}, "time"))
+
+    def test_release(self):
+        submissions = self.quarantine(2)
+        submit_time = timezone.now() - timedelta(days=1)
+        QuarantinedSubmission.objects.update(submit_time=submit_time)
+
+        self.assertEqual(release([submission.pk for submission in submissions]), 2)
+        self.assertEqual(QuarantinedSubmission.objects.count(), 0)
+        self.assertEqual(
+            sorted(
+                submission.form_data["name"]
+                for submission in FormSubmission.objects.filter(page=self.form_page)
+            ),
+            ["foo 0", "foo 1"],
+        )
+        self.assertEqual(FormSubmission.objects.first().submit_time, submit_time)
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(mail.outbox[0].subject, "New submission")
+        self.assertEqual(mail.outbox[0].to, ["to@example.com"])
+        self.assertEqual(mail.outbox[0].body, "Name: foo 0")
+
+    def test_release_keeps_submit_time_without_bulk_insert_rows(self):
+        submissions = self.quarantine(2)
+        submit_time = timezone.now() - timedelta(days=1)
+        QuarantinedSubmission.objects.update(submit_time=submit_time)
+        with mock.patch.object(
+            type(connection.features), "can_return_rows_from_bulk_insert", False
+        ):
+            release([submission.pk for submission in submissions])
+        self.assertEqual(
+            list(FormSubmission.objects.values_list("submit_time", flat=True)),
+            [submit_time, submit_time],
+        )
+
+    def test_release_queries_dont_grow(self):
+        def count_queries(count):
+            submissions = self.quarantine(count)
+            with CaptureQueriesContext(connection) as queries:
+                release([submission.pk for submission in submissions])
+            return len(queries)
+
+        self.assertEqual(count_queries(2), count_queries(10))
+
+    @override_settings(HONEYPOT_QUEUE_EMAIL=True)
+    def test_release_queues_email(self):
+        submissions = self.quarantine(2)
+        release([submission.pk for submission in submissions])
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(
+            list(QueuedEmail.objects.values_list("message", flat=True)),
+            ["Name: foo 0", "Name: foo 1"],
+        )
+
+    @override_settings(HONEYPOT_QUEUE_EMAIL=True, HONEYPOT_QUEUE_MAX_SIZE=1)
+    def test_release_queue_full(self):
+        submissions = self.quarantine(2)
+        release([submission.pk for submission in submissions])
+        self.assertEqual(QueuedEmail.objects.count(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_release_only_selected(self):
+        submissions = self.quarantine(2)
+        self.assertEqual(release([submissions[0].pk, 0]), 1)
+        self.assertEqual(FormSubmission.objects.count(), 1)
+        self.assertQuerySetEqual(QuarantinedSubmission.objects.all(), [submissions[1]])
+
+    def test_delete(self):
+        submissions = self.quarantine(3)
+        self.assertEqual(delete([submission.pk for submission in submissions[:2]]), 2)
+        self.assertEqual(QuarantinedSubmission.objects.count(), 1)
+        self.assertEqual(FormSubmission.objects.count(), 0)
+
+    def test_render_email(self):
+        fields = self.form_page.get_form_fields()
+        self.assertEqual(
+            render_email(fields, {"name": ["a", "b"], "other": "c"}), "Name: a, b"
+        )
+
+
+@override_settings(HONEYPOT_QUARANTINE=True)
+class TestHoneypotQuarantineAdmin(TestCase):
+
+    def setUp(self):
+        self.form_page = Page.objects.get(id=1).get_children().first()
+        self.user = get_user_model().objects.create_superuser(
+            "admin", "admin@example.com", "password"
+        )
+        self.client.force_login(self.user)
+        QuarantinedSubmission.objects.bulk_create(
+            QuarantinedSubmission(
+                page=self.form_page, form_data={"name": f"foo {i}"}, reason="time"
+            )
+            for i in range(5)
+        )
+        self.ids = list(
+            QuarantinedSubmission.objects.order_by("-pk").values_list("pk", flat=True)
+        )
+        self.url = "/admin/honeypot/quarantine/"
+
+    def test_listing(self):
+        resp = self.client.get(self.url)
+        self.assertContains(resp, "foo 4")
+        self.assertContains(resp, 'value="release"')
+
+    @mock.patch.object(admin_views, "PER_PAGE", 2)
+    def test_keyset_pagination(self):
+        resp = self.client.get(self.url)
+        self.assertEqual(
+            [submission.pk for submission in resp.context["submissions"]],
+            self.ids[:2],
+        )
+        self.assertIsNone(resp.context["newer"])
+        self.assertEqual(resp.context["older"], self.ids[1])
+
+        resp = self.client.get(self.url, {"before": self.ids[3]})
+        self.assertEqual(
+            [submission.pk for submission in resp.context["submissions"]],
+            self.ids[4:],
+        )
+        self.assertEqual(resp.context["newer"], self.ids[4])
+        self.assertIsNone(resp.context["older"])
+
+        resp = self.client.get(self.url, {"after": self.ids[4]})
+        self.assertEqual(
+            [submission.pk for submission in resp.context["submissions"]],
+            self.ids[2:4],
+        )
+        self.assertEqual(resp.context["newer"], self.ids[2])
+        self.assertEqual(resp.context["older"], self.ids[3])
+
+    def test_delete_action(self):
+        resp = self.client.post(
+            self.url, {"action": "delete", "id": self.ids[:2] + ["foo"]}
+        )
+        self.assertRedirects(resp, self.url)
+        self.assertEqual(QuarantinedSubmission.objects.count(), 3)
+
+    def test_release_action_keeps_submissions_of_other_pages(self):
+        # the home page isn't a form page so nothing is released
+        self.client.post(self.url, {"action": "release", "id": self.ids})
+        self.assertEqual(QuarantinedSubmission.objects.count(), 5)
+        self.assertEqual(FormSubmission.objects.count(), 0)
+
+    def test_permission_required(self):
+        user = get_user_model().objects.create_user(
+            "editor", "editor@example.com", "password"
+        )
+        self.client.force_login(user)
+        resp = self.client.get(self.url)
+        self.assertEqual(resp.status_code, 302)
+        resp = self.client.post(self.url, {"action": "delete", "id": self.ids})
+        self.assertEqual(QuarantinedSubmission.objects.count(), 5)
@@ -0,0 +1,131 @@
+import time
+
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from wagtail.contrib.forms.models import FormSubmission
+from wagtail.models import Page
+
+from tests.testapp.models import FormField, FormPage
+from wagtail_honeypot.ratelimit import get_client_ip, is_rate_limited
+
+
+class TestHoneypotRateLimit(TestCase):
+    """
+    Test the sliding window rate limiter
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+
+    def test_get_client_ip(self):
+        request = self.factory.post("/", REMOTE_ADDR="10.0.0.1")
+        self.assertEqual(get_client_ip(request), "10.0.0.1")
+
+    @override_settings(HONEYPOT_IP_HEADER="HTTP_X_FORWARDED_FOR")
+    def test_get_client_ip_forwarded(self):
+        request = self.factory.post(
+            "/", REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR="10.0.0.2, 10.0.0.3"
+        )
+        # the address added by the proxy, the first is set by the client
+        self.assertEqual(get_client_ip(request), "10.0.0.3")
+
+    @override_settings(
+        HONEYPOT_IP_HEADER="HTTP_X_FORWARDED_FOR", HONEYPOT_TRUSTED_PROXIES=2
+    )
+    def test_get_client_ip_trusted_proxies(self):
+        request = self.factory.post(
+            "/", HTTP_X_FORWARDED_FOR="1.1.1.1, 10.0.0.2, 10.0.0.3, 10.0.0.4"
+        )
+        self.assertEqual(get_client_ip(request), "10.0.0.3")
+        request = self.factory.post("/", HTTP_X_FORWARDED_FOR="10.0.0.2")
+        self.assertEqual(get_client_ip(request), "10.0.0.2")
+
+    @override_settings(HONEYPOT_IP_HEADER="HTTP_X_FORWARDED_FOR")
+    def test_spoofed_forwarded_for_limited(self):
+        for i in range(3):
+            request = self.factory.post(
+                "/", HTTP_X_FORWARDED_FOR=f"10.1.0.{i}, 10.0.0.5"
+            )
+            is_rate_limited(request, 3)
+        request = self.factory.post("/", HTTP_X_FORWARDED_FOR="10.1.0.9, 10.0.0.5")
+        self.assertTrue(is_rate_limited(request, 3))
+
+    def test_under_limit(self):
+        request = self.factory.post("/")
+        for _ in range(3):
+            self.assertFalse(is_rate_limited(request, 3))
+
+    def test_over_limit(self):
+        request = self.factory.post("/")
+        for _ in range(3):
+            is_rate_limited(request, 3)
+        self.assertTrue(is_rate_limited(request, 3))
+
+    def test_clients_counted_separately(self):
+        for _ in range(3):
+            is_rate_limited(self.factory.post("/", REMOTE_ADDR="10.0.0.1"), 3)
+        self.assertFalse(
+            is_rate_limited(self.factory.post("/", REMOTE_ADDR="10.0.0.2"), 3)
+        )
+
+    def test_pages_counted_separately(self):
+        request = self.factory.post("/")
+        for _ in range(3):
+            is_rate_limited(request, 3, page_id=1)
+        self.assertFalse(is_rate_limited(request, 3, page_id=2))
+
+
+class TestHoneypotFormRateLimit(TestCase):
+
+    def setUp(self):
+        """
+        Enable honeypot on FormPage with a rate limit
+        """
+        cache.clear()
+        root_page = Page.objects.get(id=1)
+        home_page = root_page.get_children().first()
+
+        self.form_page = FormPage(
+            title="Form Page",
+            slug="formpage",
+            honeypot=True,
+            honeypot_rate_limit=2,
+            thank_you_text="Thank you for your message",
+        )
+        home_page.add_child(instance=self.form_page)
+        FormField.objects.create(
+            page=self.form_page, label="Name", field_type="singleline", required=True
+        )
+        self.form_page.save_revision().publish()
+
+        self.form_view_time = int(time.time())
+
+    def post(self):
+        return self.client.post(
+            "/formpage/",
+            {"name": "foo", "whf_name": "", "whf_time": self.form_view_time - 10},
+        )
+
+    def test_form_submission_over_page_limit(self):
+        for _ in range(3):
+            resp = self.post()
+        self.assertEqual(FormSubmission.objects.all().count(), 2)
+        self.assertContains(resp, "Thank you for your message")
+
+    @override_settings(HONEYPOT_RATE_LIMIT=1)
+    def test_form_submission_over_site_limit(self):
+        self.form_page.honeypot_rate_limit = None
+        self.form_page.save_revision().publish()
+        for _ in range(3):
+            self.post()
+        self.assertEqual(FormSubmission.objects.all().count(), 1)
+
+    def test_honeypot_failures_not_counted(self):
+        for _ in range(3):
+            self.client.post(
+                "/formpage/",
+                {"name": "foo", "whf_name": "foo", "whf_time": self.form_view_time},
+            )
+        self.post()
+        self.assertEqual(FormSubmission.objects.all().count(), 1)
@@ -0,0 +1,121 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from wagtail.contrib.forms.models import FormSubmission
+from wagtail.models import Page
+
+from tests.testapp.models import FormField, FormPage
+from wagtail_honeypot.responses import clear_landing_pages
+
+LANDING_TEMPLATE = "tests_testapp/form_page_landing.html"
+
+
+class TestHoneypotRejectionResponse(TestCase):
+
+    def setUp(self):
+        """
+        Enable honeypot on FormPage
+        """
+        clear_landing_pages()
+        root_page = Page.objects.get(id=1)
+        home_page = root_page.get_children().first()
+
+        self.form_page = FormPage(
+            title="Form Page",
+            slug="formpage",
+            honeypot=True,
+            thank_you_text="Thank you for your message",
+        )
+        home_page.add_child(instance=self.form_page)
+        FormField.objects.create(
+            page=self.form_page, label="Name", field_type="singleline", required=True
+        )
+        self.form_page.save_revision().publish()
+
+        self.form_view_time = int(time.time())
+
+    def post(self, **data):
+        return self.client.post("/formpage/", dict({"name": "foo"}, **data))
+
+    def post_bot(self):
+        # rejected before the form is built
+        return self.post(whf_name="foo", whf_time=self.form_view_time - 10)
+
+    def test_landing_page_cached(self):
+        with self.assertTemplateUsed(LANDING_TEMPLATE):
+            resp = self.post_bot()
+        self.assertContains(resp, "Thank you for your message")
+
+        with self.assertTemplateNotUsed(LANDING_TEMPLATE):
+            cached = self.post_bot()
+        self.assertEqual(cached.status_code, 200)
+        self.assertEqual(cached.content, resp.content)
+        self.assertEqual(cached["Content-Type"], resp["Content-Type"])
+
+    def test_cached_landing_page_for_rejected_form_submission(self):
+        self.post_bot()
+        with self.assertTemplateNotUsed(LANDING_TEMPLATE):
+            # rejected once the form is cleaned
+            resp = self.post(whf_name="", whf_time="")
+        self.assertContains(resp, "Thank you for your message")
+        self.assertEqual(FormSubmission.objects.count(), 0)
+
+    def test_landing_page_rendered_for_new_revision(self):
+        self.post_bot()
+        self.form_page.thank_you_text = "Thanks again"
+        self.form_page.save_revision().publish()
+        resp = self.post_bot()
+        self.assertContains(resp, "Thanks again")
+
+    def test_allowed_submission_not_cached(self):
+        self.post_bot()
+        with self.assertTemplateUsed(LANDING_TEMPLATE):
+            self.post(whf_name="", whf_time=self.form_view_time - 10)
+        self.assertEqual(FormSubmission.objects.count(), 1)
+
+    def test_signed_in_user_not_cached(self):
+        user = get_user_model().objects.create_user("user", "user@example.com")
+        self.client.force_login(user)
+        self.post_bot()
+        with self.assertTemplateUsed(LANDING_TEMPLATE):
+            self.post_bot()
+
+    @override_settings(HONEYPOT_REJECTION_RESPONSE="render")
+    def test_render(self):
+        self.post_bot()
+        with self.assertTemplateUsed(LANDING_TEMPLATE):
+            resp = self.post_bot()
+        self.assertContains(resp, "Thank you for your message")
+
+    @override_settings(
+        HONEYPOT_REJECTION_RESPONSE="static",
+        HONEYPOT_REJECTION_BODY="Thanks",
+        HONEYPOT_REJECTION_STATUS=202,
+    )
+    def test_static(self):
+        with self.assertTemplateNotUsed(LANDING_TEMPLATE):
+            resp = self.post_bot()
+        self.assertEqual(resp.status_code, 202)
+        self.assertEqual(resp.content, b"Thanks")
+
+        resp = self.post(whf_name="", whf_time="")
+        self.assertEqual(resp.content, b"Thanks")
+
+    @override_settings(
+        HONEYPOT_REJECTION_RESPONSE="status", HONEYPOT_REJECTION_STATUS=400
+    )
+    def test_status(self):
+        resp = self.post_bot()
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.content, b"")
+
+    @override_settings(
+        HONEYPOT_REJECTION_RESPONSE="status",
+        HONEYPOT_REJECTION_STATUS=400,
+        HONEYPOT_MIDDLEWARE_PATHS=["/formpage/"],
+        MIDDLEWARE=["wagtail_honeypot.middleware.HoneypotMiddleware"],
+    )
+    def test_middleware(self):
+        resp = self.post_bot()
+        self.assertEqual(resp.status_code, 400)
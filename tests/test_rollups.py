@@ -0,0 +1,252 @@
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import DatabaseError, IntegrityError
+from django.test import TestCase, override_settings
+from wagtail.models import Page
+
+from tests.testapp.models import FormField, FormPage
+from wagtail_honeypot import rollups
+from wagtail_honeypot.admin_views import get_report
+from wagtail_honeypot.models import HoneypotRollup
+from wagtail_honeypot.rollups import (
+    acount,
+    add_counts,
+    count,
+    flush_rollups,
+    get_key,
+    get_today,
+    parse_key,
+    take_counts,
+)
+
+
+@override_settings(HONEYPOT_ROLLUPS=True, HONEYPOT_ROLLUP_FLUSH_INTERVAL=3600)
+class TestHoneypotRollups(TestCase):
+
+    def setUp(self):
+        """
+        Enable honeypot on FormPage and count the submissions in rollups
+        """
+        caches["default"].clear()
+        flush_rollups()
+        root_page = Page.objects.get(id=1)
+        home_page = root_page.get_children().first()
+
+        self.form_page = FormPage(
+            title="Form Page",
+            slug="formpage",
+            honeypot=True,
+            thank_you_text="Thank you for your message",
+        )
+        home_page.add_child(instance=self.form_page)
+        FormField.objects.create(
+            page=self.form_page, label="Name", field_type="singleline", required=True
+        )
+        self.form_page.save_revision().publish()
+
+        self.form_view_time = int(time.time())
+
+    def post(self, **data):
+        return self.client.post("/formpage/", dict({"name": "foo"}, **data))
+
+    def get_rows(self):
+        return set(
+            HoneypotRollup.objects.values_list(
+                "day", "page_id", "outcome", "reason", "count"
+            )
+        )
+
+    def test_submissions_counted(self):
+        self.post(whf_name="", whf_time=self.form_view_time - 10)
+        self.post(whf_name="foo", whf_time=self.form_view_time - 10)
+        self.post(whf_name="foo", whf_time=self.form_view_time - 10)
+        self.assertEqual(HoneypotRollup.objects.count(), 0)
+
+        self.assertEqual(flush_rollups(), 3)
+        today, page_id = get_today(), self.form_page.pk
+        self.assertEqual(
+            self.get_rows(),
+            {
+                (today, page_id, "allowed", "", 1),
+                (today, page_id, "blocked", "field", 2),
+            },
+        )
+
+        # later flushes add to the rows
+        self.post(whf_name="foo", whf_time=self.form_view_time - 10)
+        self.assertEqual(flush_rollups(), 1)
+        self.assertIn((today, page_id, "blocked", "field", 3), self.get_rows())
+        self.assertEqual(flush_rollups(), 0)
+
+    @override_settings(HONEYPOT_ROLLUP_FLUSH_INTERVAL=0)
+    def test_flushed_when_due(self):
+        count("blocked", self.form_page.pk, "time")
+        self.assertEqual(HoneypotRollup.objects.get().count, 1)
+
+    @override_settings(HONEYPOT_ROLLUPS=False)
+    def test_not_counted_when_disabled(self):
+        self.post(whf_name="foo", whf_time=self.form_view_time - 10)
+        self.assertEqual(flush_rollups(), 0)
+
+    def test_async_count(self):
+        async_to_sync(acount)("blocked", None, "missing")
+        async_to_sync(acount)("blocked", None, "missing")
+        flush_rollups()
+        self.assertEqual(self.get_rows(), {(get_today(), 0, "blocked", "missing", 2)})
+
+    def test_command_flushes_counters_of_other_processes(self):
+        count("blocked", self.form_page.pk, "field")
+        async_to_sync(acount)("blocked", None, "missing")
+        count("blocked", self.form_page.pk, "field")
+        # counted by a process that stopped before flushing
+        rollups._keys.clear()
+        self.assertEqual(flush_rollups(), 0)
+
+        out = StringIO()
+        call_command("honeypot_flush_rollups", stdout=out)
+        self.assertIn("Added 3 submissions to the rollups", out.getvalue())
+        today = get_today()
+        self.assertEqual(
+            self.get_rows(),
+            {
+                (today, self.form_page.pk, "blocked", "field", 2),
+                (today, 0, "blocked", "missing", 1),
+            },
+        )
+
+        # the counters stay registered for the next counts
+        count("blocked", self.form_page.pk, "field")
+        rollups._keys.clear()
+        self.assertEqual(flush_rollups(registered=True), 1)
+
+    def test_key(self):
+        key = get_key(get_today(), None, "blocked", "custom:reason")
+        self.assertEqual(parse_key(key), (get_today(), 0, "blocked", "custom:reason"))
+
+    def test_take_counts_keeps_new_counts(self):
+        cache = caches["default"]
+        key = get_key(get_today(), 1, "blocked", "field")
+        cache.set(key, 5)
+        self.assertEqual(take_counts(cache, [key]), {key: 5})
+        self.assertEqual(cache.get(key), 0)
+
+        # counted again between reading and taking
+        cache.set(key, 2)
+        with mock.patch.object(cache, "get_many", return_value={key: 1}):
+            self.assertEqual(take_counts(cache, [key]), {key: 1})
+        self.assertEqual(cache.get(key), 1)
+
+    def test_take_counts_taken_by_another_process(self):
+        cache = caches["default"]
+        key = get_key(get_today(), 1, "blocked", "field")
+        # 3 of the 5 read were taken by another process before this one
+        cache.set(key, 2)
+        with mock.patch.object(cache, "get_many", return_value={key: 5}):
+            self.assertEqual(take_counts(cache, [key]), {key: 2})
+        self.assertEqual(cache.get(key), 0)
+
+    def test_counts_kept_when_database_fails(self):
+        count("blocked", self.form_page.pk, "field")
+        with mock.patch.object(rollups, "add_counts", side_effect=DatabaseError):
+            with self.assertLogs("wagtail_honeypot.rollups", "ERROR"):
+                self.assertEqual(flush_rollups(), 0)
+        self.assertEqual(flush_rollups(), 1)
+        self.assertEqual(HoneypotRollup.objects.get().count, 1)
+
+    def test_add_counts_row_created_by_another_process(self):
+        day = get_today()
+        with mock.patch.object(
+            HoneypotRollup.objects, "bulk_create", side_effect=IntegrityError
+        ):
+            add_counts({(day, 1, "blocked", "field"): 2})
+        self.assertEqual(self.get_rows(), {(day, 1, "blocked", "field", 2)})
+
+    def test_report(self):
+        today = get_today()
+        HoneypotRollup.objects.bulk_create(
+            [
+                HoneypotRollup(
+                    day=today, page_id=self.form_page.pk, outcome="allowed", count=4
+                ),
+                HoneypotRollup(
+                    day=today,
+                    page_id=self.form_page.pk,
+                    outcome="blocked",
+                    reason="time",
+                    count=7,
+                ),
+                HoneypotRollup(
+                    day=today - timedelta(days=1),
+                    page_id=0,
+                    outcome="blocked",
+                    reason="field",
+                    count=2,
+                ),
+                HoneypotRollup(
+                    day=today - timedelta(days=10),
+                    page_id=0,
+                    outcome="blocked",
+                    reason="field",
+                    count=100,
+                ),
+            ]
+        )
+        report = get_report(7)
+        self.assertEqual(
+            report["pages"],
+            [
+                {
+                    "page_id": self.form_page.pk,
+                    "title": "Form Page",
+                    "allowed": 4,
+                    "blocked": 7,
+                    "monitored": 0,
+                },
+                {
+                    "page_id": 0,
+                    "title": "",
+                    "allowed": 0,
+                    "blocked": 2,
+                    "monitored": 0,
+                },
+            ],
+        )
+        self.assertEqual(len(report["daily"]), 7)
+        self.assertEqual(report["daily"][0]["day"], today)
+        self.assertEqual(report["daily"][1]["blocked"], 2)
+        self.assertEqual(report["reasons"], [("time", 7), ("field", 2)])
+
+    def test_report_view(self):
+        user = get_user_model().objects.create_superuser(
+            "admin", "admin@example.com", "password"
+        )
+        self.client.force_login(user)
+        self.post(whf_name="foo", whf_time=self.form_view_time - 10)
+
+        # the counts of this process are saved first
+        resp = self.client.get("/admin/honeypot/report/", {"days": 7})
+        self.assertEqual(resp.context["days"], 7)
+        self.assertContains(resp, "Form Page")
+        self.assertEqual(resp.context["pages"][0]["blocked"], 1)
+
+        resp = self.client.get("/admin/honeypot/report/", {"days": "foo"})
+        self.assertEqual(resp.context["days"], 30)
+
+        resp = self.client.get("/admin/")
+        self.assertContains(resp, "Blocked submission")
+
+    @override_settings(HONEYPOT_ROLLUPS=False)
+    def test_dashboard_summary_hidden_when_disabled(self):
+        user = get_user_model().objects.create_superuser(
+            "admin", "admin@example.com", "password"
+        )
+        self.client.force_login(user)
+        resp = self.client.get("/admin/")
+        self.assertNotContains(resp, "Blocked submission")
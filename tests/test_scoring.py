@@ -0,0 +1,169 @@
+import time
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.http import QueryDict
+from django.test import TestCase, override_settings
+from wagtail.contrib.forms.models import FormSubmission
+from wagtail.models import Page
+
+from tests.testapp.models import FormField, FormPage
+from wagtail_honeypot.scoring import (
+    BLOCK,
+    KeywordScorer,
+    LinkScorer,
+    Pipeline,
+    Scorer,
+    Submission,
+    get_pipeline,
+)
+from wagtail_honeypot.utils import get_rejection_reason
+
+
+class FixedScorer(Scorer):
+    def __init__(self, cost, points, reason):
+        self.cost = cost
+        self.points = points
+        self.reason = reason
+        self.calls = 0
+
+    def score(self, submission):
+        self.calls += 1
+        return self.points
+
+
+class ShoutScorer(Scorer):
+    cost = 5
+    reason = "shout"
+
+    def score(self, submission):
+        return 1 if submission.get_text().isupper() else 0
+
+
+def get_submission(message, **data):
+    data = {"whf_name": "", "whf_time": "1", "message": message, **data}
+    return Submission(data, "whf_name", "whf_time")
+
+
+class TestHoneypotScoring(TestCase):
+    """
+    Test the scorers and the pipeline running them
+    """
+
+    def test_pipeline_cost_order(self):
+        expensive = FixedScorer(10, 1, "expensive")
+        cheap = FixedScorer(1, 1, "cheap")
+        pipeline = Pipeline([expensive, cheap])
+        self.assertEqual(pipeline.run(get_submission("")), "cheap")
+        self.assertEqual(expensive.calls, 0)
+
+    def test_pipeline_threshold(self):
+        scorers = [FixedScorer(1, 1, "first"), FixedScorer(2, 1, "second")]
+        self.assertEqual(Pipeline(scorers, 2).run(get_submission("")), "second")
+        self.assertIsNone(Pipeline(scorers, 3).run(get_submission("")))
+        block = [FixedScorer(1, BLOCK, "block")]
+        self.assertEqual(Pipeline(block, 1000).run(get_submission("")), "block")
+
+    def test_text(self):
+        submission = get_submission("hello", name="foo", csrfmiddlewaretoken="x")
+        self.assertEqual(submission.get_text(), "hello\nfoo")
+        data = QueryDict("whf_name=&whf_time=1&choice=a&choice=b")
+        submission = Submission(data, "whf_name", "whf_time")
+        self.assertEqual(submission.get_text(), "a\nb")
+
+    def test_links(self):
+        scorer = LinkScorer(1)
+        self.assertEqual(scorer.score(get_submission("see https://a.com")), 0)
+        message = "https://a.com www.b.com <a href='c'>c</a> [url=d]d[/url]"
+        self.assertEqual(scorer.score(get_submission(message)), 3)
+
+    def test_link_counted_once(self):
+        scorer = LinkScorer(1)
+        for message in (
+            "see https://www.example.com/page?a=1",
+            '<a href="http://www.x.com">http://www.x.com</a>',
+            "[url=https://www.x.com]www.x.com[/url]",
+            "[url]https://www.x.com[/url]",
+        ):
+            with self.subTest(message=message):
+                self.assertEqual(scorer.score(get_submission(message)), 0)
+        message = "https://www.a.com and <a href='https://www.b.com'>b</a>"
+        self.assertEqual(scorer.score(get_submission(message)), 1)
+
+    def test_keywords(self):
+        scorer = KeywordScorer(["casino", "free money"], ["spam.com"])
+        self.assertEqual(scorer.score(get_submission("Hello there")), 0)
+        self.assertEqual(scorer.score(get_submission("Casinos near you")), 0)
+        self.assertEqual(scorer.score(get_submission("CASINO casino")), 1)
+        message = "Free Money at http://www.spam.com and casino"
+        self.assertEqual(scorer.score(get_submission(message)), 3)
+        self.assertEqual(scorer.score(get_submission("notspam.com")), 0)
+        self.assertEqual(scorer.score(get_submission("x@mail.spam.com")), 1)
+
+    def test_keywords_compiled_once(self):
+        with self.settings(HONEYPOT_BLOCKED_KEYWORDS=["casino"]):
+            pipeline = get_pipeline()
+            with mock.patch("re.compile") as compile:
+                get_pipeline().run(get_submission("casino"))
+            compile.assert_not_called()
+            self.assertIs(get_pipeline(), pipeline)
+
+    @override_settings(HONEYPOT_SCORERS=["tests.test_scoring.ShoutScorer"])
+    def test_custom_scorer(self):
+        data = {"whf_name": "", "whf_time": int(time.time()) - 10, "message": "HI"}
+        self.assertEqual(get_rejection_reason(data), "shout")
+        data["message"] = "hi"
+        self.assertIsNone(get_rejection_reason(data))
+
+    def test_invalid_settings(self):
+        with self.assertRaises(ImproperlyConfigured):
+            with self.settings(HONEYPOT_SCORE_THRESHOLD=0):
+                pass
+        with self.assertRaises(ImproperlyConfigured):
+            with self.settings(HONEYPOT_BLOCKED_KEYWORDS=["casino", ""]):
+                pass
+
+
+@override_settings(
+    HONEYPOT_MAX_LINKS=1,
+    HONEYPOT_BLOCKED_KEYWORDS=["casino"],
+    HONEYPOT_SCORE_THRESHOLD=2,
+)
+class TestHoneypotScoringForm(TestCase):
+
+    def setUp(self):
+        home_page = Page.objects.get(id=1).get_children().first()
+        form_page = FormPage(
+            title="Form Page",
+            slug="formpage",
+            honeypot=True,
+            thank_you_text="Thank you for your message",
+        )
+        home_page.add_child(instance=form_page)
+        FormField.objects.create(
+            page=form_page, label="Message", field_type="multiline", required=True
+        )
+        form_page.save_revision().publish()
+        self.form_view_time = int(time.time())
+
+    def post(self, message, whf_name=""):
+        return self.client.post(
+            "/formpage/",
+            {
+                "message": message,
+                "whf_name": whf_name,
+                "whf_time": self.form_view_time - 10,
+            },
+        )
+
+    def test_under_threshold(self):
+        self.post("casino at https://a.com")
+        self.assertEqual(FormSubmission.objects.count(), 1)
+
+    def test_over_threshold(self):
+        self.post("casino at https://a.com and https://b.com")
+        self.assertEqual(FormSubmission.objects.count(), 0)
+
+    def test_field_blocks(self):
+        self.post("hello", whf_name="foo")
+        self.assertEqual(FormSubmission.objects.count(), 0)
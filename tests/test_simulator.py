@@ -0,0 +1,44 @@
+from django.test import TestCase
+
+from tests.simulator import get_configurations, parse_mix, simulate
+
+
+class TestSimulator(TestCase):
+
+    def test_parse_mix(self):
+        self.assertEqual(parse_mix("human=3, fast=1"), {"human": 3, "fast": 1})
+        with self.assertRaises(ValueError):
+            parse_mix("robot=1")
+        with self.assertRaises(ValueError):
+            parse_mix("human=0")
+
+    def test_simulate(self):
+        results = simulate(
+            get_configurations([3]), submissions=40, human_median=600, seed=1
+        )
+        report = results[0]["report"]
+        clients = report["clients"]
+
+        self.assertEqual(report["submissions"], 40)
+        self.assertEqual(clients["human"]["allowed"], clients["human"]["submissions"])
+        self.assertEqual(clients["fast"]["allowed"], 0)
+        self.assertEqual(clients["filling"]["allowed"], 0)
+        # plain timestamps can be replayed
+        self.assertEqual(clients["replay"]["allowed"], clients["replay"]["submissions"])
+        self.assertEqual(report["false_positive_rate"], 0)
+        self.assertEqual(report["db_writes_avoided"], report["blocked"])
+
+    def test_simulate_single_use_tokens(self):
+        results = simulate(
+            get_configurations([3, 600], single_use_tokens=True),
+            submissions=60,
+            mix={"human": 1, "replay": 2},
+            human_median=100,
+            seed=1,
+        )
+        short, long = (result["report"] for result in results)
+
+        # only the first post of each of the captured forms is allowed
+        self.assertLessEqual(short["clients"]["replay"]["allowed"], 5)
+        self.assertEqual(short["false_positive_rate"], 0)
+        self.assertGreater(long["false_positive_rate"], 0.5)
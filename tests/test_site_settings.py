@@ -0,0 +1,224 @@
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from wagtail.contrib.forms.models import FormSubmission
+from wagtail.models import Page, Site
+
+from tests.testapp.models import FormField, FormPage
+from wagtail_honeypot.metrics import metrics
+from wagtail_honeypot.middleware import HoneypotMiddleware
+from wagtail_honeypot.models import HoneypotSettings
+from wagtail_honeypot.site_settings import (
+    DEFAULT_SITE_SETTINGS,
+    get_settings_for_site,
+    get_site_settings,
+)
+
+
+class SiteSettingsTestCase(TestCase):
+
+    def setUp(self):
+        caches["default"].clear()
+        self.addCleanup(caches["default"].clear)
+        self.site = Site.objects.get(is_default_site=True)
+
+    def save_settings(self, **values):
+        with self.captureOnCommitCallbacks(execute=True):
+            HoneypotSettings.objects.update_or_create(site=self.site, defaults=values)
+
+
+class TestHoneypotSiteSettings(SiteSettingsTestCase):
+    """
+    Test the honeypot site settings are cached in process
+    """
+
+    def test_defaults(self):
+        self.assertEqual(get_settings_for_site(self.site.pk), DEFAULT_SITE_SETTINGS)
+
+    def test_cached(self):
+        self.save_settings(time_interval=60)
+        self.assertEqual(get_settings_for_site(self.site.pk).time_interval, 60)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_settings_for_site(self.site.pk).time_interval, 60)
+
+    def test_reloaded_when_saved(self):
+        self.save_settings(time_interval=60)
+        get_settings_for_site(self.site.pk)
+        self.save_settings(time_interval=30, mode="monitor")
+        with self.assertNumQueries(1):
+            site_settings = get_settings_for_site(self.site.pk)
+        self.assertEqual(site_settings.time_interval, 30)
+        self.assertEqual(site_settings.mode, "monitor")
+
+    def test_reloaded_when_deleted(self):
+        self.save_settings(time_interval=60)
+        get_settings_for_site(self.site.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            HoneypotSettings.objects.get(site=self.site).delete()
+        self.assertEqual(get_settings_for_site(self.site.pk), DEFAULT_SITE_SETTINGS)
+
+    def test_reloaded_when_version_evicted(self):
+        self.save_settings(time_interval=60)
+        get_settings_for_site(self.site.pk)
+        caches["default"].clear()
+        with self.assertNumQueries(1):
+            get_settings_for_site(self.site.pk)
+
+    def test_for_request(self):
+        self.save_settings(time_interval=60)
+        request = RequestFactory().get("/")
+        self.assertEqual(get_site_settings(request).time_interval, 60)
+
+    def test_admin_edit(self):
+        user = get_user_model().objects.create_superuser(
+            "admin", "admin@example.com", "password"
+        )
+        self.client.force_login(user)
+        url = f"/admin/settings/wagtail_honeypot/honeypotsettings/{self.site.pk}/"
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.client.post(
+                url,
+                {
+                    "mode": "monitor",
+                    "time_interval": "60",
+                    "rate_limit": "",
+                    "rate_limit_window": "",
+                },
+            )
+        self.assertRedirects(resp, url)
+        self.assertEqual(get_settings_for_site(self.site.pk).mode, "monitor")
+
+    def test_settings_app_not_installed(self):
+        self.save_settings(time_interval=60)
+        config = SimpleNamespace(site_settings=False)
+        with mock.patch(
+            "wagtail_honeypot.site_settings.get_config", return_value=config
+        ):
+            request = RequestFactory().get("/")
+            self.assertEqual(get_site_settings(request), DEFAULT_SITE_SETTINGS)
+
+
+class TestHoneypotSiteSettingsForm(SiteSettingsTestCase):
+    """
+    Test the site settings change how form submissions are checked
+    """
+
+    def setUp(self):
+        super().setUp()
+        metrics.reset()
+        home_page = Page.objects.get(id=1).get_children().first()
+        self.form_page = FormPage(
+            title="Form Page",
+            slug="formpage",
+            honeypot=True,
+            thank_you_text="Thank you for your message",
+        )
+        home_page.add_child(instance=self.form_page)
+        FormField.objects.create(
+            page=self.form_page, label="Name", field_type="singleline", required=True
+        )
+        self.form_page.save_revision().publish()
+        self.form_view_time = int(time.time())
+
+    def post(self, whf_name="", age=10):
+        return self.client.post(
+            "/formpage/",
+            {
+                "name": "foo",
+                "whf_name": whf_name,
+                "whf_time": self.form_view_time - age,
+            },
+        )
+
+    def test_time_interval(self):
+        self.save_settings(time_interval=60)
+        self.post(age=10)
+        self.assertEqual(FormSubmission.objects.count(), 0)
+        self.post(age=120)
+        self.assertEqual(FormSubmission.objects.count(), 1)
+
+    def test_not_looked_up_for_views(self):
+        with mock.patch(
+            "wagtail_honeypot.models.get_site_settings"
+        ) as get_site_settings:
+            self.client.get("/formpage/")
+            self.form_page.honeypot = False
+            self.form_page.save_revision().publish()
+            self.post()
+        get_site_settings.assert_not_called()
+        self.assertEqual(FormSubmission.objects.count(), 1)
+
+    def test_disabled(self):
+        self.save_settings(mode="disabled")
+        self.post(whf_name="foo", age=0)
+        self.assertEqual(FormSubmission.objects.count(), 1)
+
+    @override_settings(HONEYPOT_METRICS=True)
+    def test_monitor(self):
+        self.save_settings(mode="monitor")
+        self.post(whf_name="foo")
+        self.assertEqual(FormSubmission.objects.count(), 1)
+        self.assertEqual(metrics.get_submission_count("monitored", reason="field"), 1)
+        self.assertEqual(metrics.get_submission_count("blocked"), 0)
+
+    def test_rate_limit(self):
+        self.save_settings(rate_limit=1)
+        self.post()
+        self.post()
+        self.assertEqual(FormSubmission.objects.count(), 1)
+
+    def test_page_rate_limit(self):
+        self.save_settings(rate_limit=1)
+        self.form_page.honeypot_rate_limit = 2
+        self.form_page.save_revision().publish()
+        self.post()
+        self.post()
+        self.post()
+        self.assertEqual(FormSubmission.objects.count(), 2)
+
+    @override_settings(
+        HONEYPOT_RATE_LIMIT=100,
+        MIDDLEWARE=["wagtail_honeypot.middleware.HoneypotMiddleware"]
+        + settings.MIDDLEWARE,
+    )
+    def test_middleware_with_page_rate_limit(self):
+        self.form_page.honeypot_rate_limit = 2
+        self.form_page.save_revision().publish()
+        for _ in range(5):
+            self.post()
+        # the page limit is counted apart from the middleware limit
+        self.assertEqual(FormSubmission.objects.count(), 2)
+
+    @override_settings(
+        HONEYPOT_RATE_LIMIT=3,
+        MIDDLEWARE=["wagtail_honeypot.middleware.HoneypotMiddleware"]
+        + settings.MIDDLEWARE,
+    )
+    def test_middleware_rate_limit_counted_once(self):
+        for _ in range(5):
+            self.post()
+        self.assertEqual(FormSubmission.objects.count(), 3)
+
+    def test_middleware_disabled(self):
+        self.save_settings(mode="disabled")
+        calls = []
+        middleware = HoneypotMiddleware(lambda request: calls.append(request))
+        request = RequestFactory().post(
+            "/formpage/", {"whf_name": "foo", "whf_time": self.form_view_time}
+        )
+        self.assertIsNone(middleware(request))
+        self.assertEqual(len(calls), 1)
+
+    def test_middleware_time_interval(self):
+        self.save_settings(time_interval=60)
+        middleware = HoneypotMiddleware(lambda request: HttpResponse("view"))
+        request = RequestFactory().post(
+            "/formpage/", {"whf_name": "", "whf_time": self.form_view_time - 10}
+        )
+        self.assertEqual(middleware(request).content, b"")
@@ -0,0 +1,123 @@
+import glob
+import os
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from wagtail.contrib.forms.models import FormSubmission
+from wagtail.models import Page
+
+from tests.testapp.models import FormField, FormPage
+from wagtail_honeypot import spool
+
+
+class TestHoneypotSpool(TestCase):
+
+    def setUp(self):
+        """
+        Enable honeypot on FormPage and spool the submissions
+        """
+        self.spool_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.spool_dir)
+        settings_override = override_settings(HONEYPOT_SPOOL_DIR=self.spool_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        root_page = Page.objects.get(id=1)
+        home_page = root_page.get_children().first()
+
+        self.form_page = FormPage(
+            title="Form Page",
+            slug="formpage",
+            honeypot=True,
+            thank_you_text="Thank you for your message",
+            to_address="foo@foo.com",
+        )
+        home_page.add_child(instance=self.form_page)
+        FormField.objects.create(
+            page=self.form_page, label="Name", field_type="singleline", required=True
+        )
+        self.form_page.save_revision().publish()
+
+        self.form_view_time = int(time.time())
+
+    def post(self, name="foo"):
+        return self.client.post(
+            "/formpage/",
+            {"name": name, "whf_name": "", "whf_time": self.form_view_time - 10},
+        )
+
+    def test_form_submission_spooled(self):
+        resp = self.post()
+        self.assertContains(resp, "Thank you for your message")
+        self.assertEqual(FormSubmission.objects.all().count(), 0)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(len(glob.glob(os.path.join(self.spool_dir, "*.jsonl"))), 1)
+
+    def test_honeypot_failure_not_spooled(self):
+        self.client.post(
+            "/formpage/",
+            {"name": "foo", "whf_name": "foo", "whf_time": self.form_view_time - 10},
+        )
+        self.assertEqual(spool.flush(), 0)
+
+    def test_flush(self):
+        self.post("foo")
+        self.post("bar")
+        self.assertEqual(spool.flush(), 2)
+
+        names = FormSubmission.objects.values_list("form_data__name", flat=True)
+        self.assertEqual(sorted(names), ["bar", "foo"])
+        self.assertEqual(glob.glob(os.path.join(self.spool_dir, "*")), [])
+        self.assertEqual(spool.flush(), 0)
+
+    def test_flush_keeps_submit_time(self):
+        submission = FormSubmission(
+            page=self.form_page,
+            form_data={"name": "foo"},
+            submit_time=timezone.now().replace(microsecond=0) - timedelta(days=1),
+        )
+        spool.append(submission)
+        spool.flush()
+        self.assertEqual(
+            FormSubmission.objects.get().submit_time, submission.submit_time
+        )
+
+    def test_flush_deleted_page(self):
+        self.post()
+        self.form_page.delete()
+        self.assertEqual(spool.flush(), 0)
+
+    def test_append_after_spool_taken(self):
+        self.post("foo")
+        paths = spool.take_spool_files(self.spool_dir)
+        self.post("bar")
+        self.assertEqual(len(glob.glob(os.path.join(self.spool_dir, "*.jsonl"))), 1)
+        self.assertEqual(len(list(spool.read_spool_file(paths[0]))), 1)
+        # the taken file is flushed along with the new one
+        self.assertEqual(spool.flush(), 2)
+
+    def test_spool_unavailable(self):
+        with mock.patch("wagtail_honeypot.models.append", side_effect=OSError):
+            self.post()
+        self.assertEqual(FormSubmission.objects.all().count(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+    @override_settings(HONEYPOT_SPOOL_DIR=None)
+    def test_spool_disabled(self):
+        self.post()
+        self.assertEqual(FormSubmission.objects.all().count(), 1)
+
+    def test_command(self):
+        self.post()
+        out = StringIO()
+        call_command("honeypot_flush_submissions", stdout=out)
+        self.assertIn("Saved 1 submissions", out.getvalue())
+        self.assertEqual(FormSubmission.objects.all().count(), 1)
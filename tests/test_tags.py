@@ -1,8 +1,19 @@
+import os
+import shutil
+import tempfile
+
 from bs4 import BeautifulSoup as bs4
+from django.conf import settings
 from django.template import Context, Template
+from django.template.loader import render_to_string
 from django.test import TestCase, override_settings
+from wagtail.models import Page
 
-from wagtail_honeypot.templatetags.honeypot_tags import honeypot_fields
+from wagtail_honeypot.templatetags.honeypot_tags import (
+    honeypot_fields,
+    render_fields,
+    uses_default_template,
+)
 
 
 class TestHoneypotTemplateTags(TestCase):
@@ -65,3 +76,62 @@ class TestHoneypotTemplateTags(TestCase):
 
         input_time = soup.find("input", {"id": "bar", "name": "bar", "type": "hidden"})
         self.assertIsNotNone(input_time)
+
+
+class TestHoneypotFastRender(TestCase):
+    """
+    Test the honeypot fields rendered without the template engine
+    """
+
+    def assertRenderedLikeTemplate(self, context):
+        self.assertEqual(
+            render_fields(context),
+            render_to_string("tags/honeypot_fields.html", context),
+        )
+
+    def test_uses_default_template(self):
+        self.assertTrue(uses_default_template())
+
+    def test_render_enabled(self):
+        self.assertRenderedLikeTemplate(honeypot_fields(True))
+
+    def test_render_disabled(self):
+        self.assertRenderedLikeTemplate(honeypot_fields(False))
+
+    @override_settings(HONEYPOT_FETCH_TOKEN=True)
+    def test_render_token_url(self):
+        context = honeypot_fields(True)
+        context["token_url"] += "?page=1&foo=<bar>"
+        self.assertRenderedLikeTemplate(context)
+
+    @override_settings(HONEYPOT_SIGNED_TOKENS=True)
+    def test_render_signed_token(self):
+        page = Page.objects.get(id=1)
+        self.assertRenderedLikeTemplate(honeypot_fields(True, page))
+
+    @override_settings(HONEYPOT_POW=True)
+    def test_render_pow(self):
+        page = Page.objects.get(id=1)
+        self.assertRenderedLikeTemplate(honeypot_fields(True, page))
+
+    @override_settings(HONEYPOT_POW=True, HONEYPOT_FETCH_TOKEN=True)
+    def test_render_pow_token_url(self):
+        page = Page.objects.get(id=1)
+        self.assertRenderedLikeTemplate(honeypot_fields(True, page))
+
+    def test_overridden_template(self):
+        template_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, template_dir)
+        os.makedirs(os.path.join(template_dir, "tags"))
+        with open(os.path.join(template_dir, "tags", "honeypot_fields.html"), "w") as f:
+            f.write('<input name="{{ honeypot_name_field }}" class="custom">')
+
+        templates = [dict(settings.TEMPLATES[0], DIRS=[template_dir])]
+        with override_settings(TEMPLATES=templates):
+            self.assertFalse(uses_default_template())
+            template = Template("{% load honeypot_tags %}{% honeypot_fields True %}")
+            self.assertEqual(
+                template.render(Context()),
+                '<input name="whf_name" class="custom">',
+            )
+        self.assertTrue(uses_default_template())
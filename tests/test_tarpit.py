@@ -0,0 +1,125 @@
+import asyncio
+import time
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.http import HttpResponse
+from django.test import AsyncClient, RequestFactory, TestCase, override_settings
+from wagtail.models import Page
+
+from tests.testapp.models import FormField, FormPage
+from wagtail_honeypot import tarpit
+from wagtail_honeypot.middleware import HoneypotMiddleware
+
+
+@override_settings(HONEYPOT_TARPIT_DELAY=0.05)
+class TestHoneypotTarpit(TestCase):
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.form_view_time = int(time.time())
+
+    def get_response(self, request):
+        return HttpResponse("Thank you for your message")
+
+    async def aget_response(self, request):
+        return HttpResponse("Thank you for your message")
+
+    def post(self, ip="127.0.0.1", **data):
+        return self.factory.post("/formpage/", data, REMOTE_ADDR=ip)
+
+    def post_bot(self, ip="127.0.0.1"):
+        return self.post(ip, whf_name="foo", whf_time=self.form_view_time - 10)
+
+    def run_tarpits(self, ips):
+        async def run():
+            return await asyncio.gather(*(tarpit.tarpit(self.post(ip)) for ip in ips))
+
+        return async_to_sync(run)()
+
+    def test_delayed(self):
+        start = time.perf_counter()
+        self.assertEqual(self.run_tarpits(["10.0.0.1"]), [True])
+        self.assertGreaterEqual(time.perf_counter() - start, 0.05)
+        self.assertEqual(tarpit.get_active(), 0)
+
+    @override_settings(HONEYPOT_TARPIT_MAX_PER_CLIENT=2)
+    def test_max_per_client(self):
+        self.assertEqual(
+            self.run_tarpits(["10.0.0.1"] * 3 + ["10.0.0.2"]),
+            [True, True, False, True],
+        )
+        self.assertEqual(tarpit._clients, {})
+
+    @override_settings(HONEYPOT_TARPIT_MAX_CONNECTIONS=3)
+    def test_max_connections(self):
+        ips = [f"10.0.0.{i}" for i in range(5)]
+        self.assertEqual(self.run_tarpits(ips), [True] * 3 + [False] * 2)
+
+    def test_async_middleware_delays_rejected(self):
+        middleware = HoneypotMiddleware(self.aget_response)
+        with mock.patch("wagtail_honeypot.middleware.tarpit") as mock_tarpit:
+            async_to_sync(middleware)(self.post_bot())
+            async_to_sync(middleware)(
+                self.post(whf_name="", whf_time=self.form_view_time - 10)
+            )
+        self.assertEqual(mock_tarpit.call_count, 1)
+
+    @override_settings(HONEYPOT_TARPIT_DELAY=0)
+    def test_disabled(self):
+        middleware = HoneypotMiddleware(self.aget_response)
+        with mock.patch("wagtail_honeypot.middleware.tarpit") as mock_tarpit:
+            async_to_sync(middleware)(self.post_bot())
+        mock_tarpit.assert_not_called()
+
+    def test_sync_middleware_not_delayed(self):
+        middleware = HoneypotMiddleware(self.get_response)
+        with mock.patch("wagtail_honeypot.middleware.tarpit") as mock_tarpit:
+            middleware(self.post_bot())
+        mock_tarpit.assert_not_called()
+
+
+@override_settings(
+    HONEYPOT_TARPIT_DELAY=0.05,
+    HONEYPOT_MIDDLEWARE_PATHS=["/other/"],
+    MIDDLEWARE=["wagtail_honeypot.middleware.HoneypotMiddleware"] + settings.MIDDLEWARE,
+)
+class TestHoneypotTarpitFormPage(TestCase):
+
+    def setUp(self):
+        """
+        Enable honeypot on FormPage, the page rejects the submissions
+        """
+        root_page = Page.objects.get(id=1)
+        home_page = root_page.get_children().first()
+
+        self.form_page = FormPage(
+            title="Form Page",
+            slug="formpage",
+            honeypot=True,
+            thank_you_text="Thank you for your message",
+        )
+        home_page.add_child(instance=self.form_page)
+        FormField.objects.create(
+            page=self.form_page, label="Name", field_type="singleline", required=True
+        )
+        self.form_page.save_revision().publish()
+
+        self.form_view_time = int(time.time())
+
+    async def test_rejected_by_page_delayed(self):
+        client = AsyncClient()
+        with mock.patch.object(tarpit.asyncio, "sleep") as mock_sleep:
+            resp = await client.post(
+                "/formpage/",
+                {"name": "foo", "whf_name": "foo", "whf_time": self.form_view_time},
+            )
+            self.assertContains(resp, "Thank you for your message")
+            mock_sleep.assert_called_once_with(0.05)
+
+            await client.post(
+                "/formpage/",
+                {"name": "foo", "whf_name": "", "whf_time": self.form_view_time - 10},
+            )
+            mock_sleep.assert_called_once()
@@ -0,0 +1,155 @@
+import time
+from unittest import mock
+
+from bs4 import BeautifulSoup as bs4
+from django.core.exceptions import ImproperlyConfigured
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from wagtail.contrib.forms.models import FormSubmission
+from wagtail.models import Page
+
+from tests.testapp.models import FormField, FormPage
+from wagtail_honeypot import tokens
+from wagtail_honeypot.templatetags.honeypot_tags import honeypot_fields
+from wagtail_honeypot.tokens import make_token, read_token, verify_token
+
+
+class TestHoneypotTokens(TestCase):
+    """
+    Test the signed time tokens
+    """
+
+    def setUp(self):
+        self.interval = 3  # seconds
+        self.now = int(time.time())
+
+    def test_read_token(self):
+        token = make_token(5, max_age=60, timestamp=self.now)
+        data = read_token(token)
+        self.assertEqual(data.timestamp, self.now)
+        self.assertEqual(data.expires, self.now + 60)
+        self.assertEqual(data.page_id, 5)
+
+    def test_read_token_without_page(self):
+        token = make_token(timestamp=self.now)
+        self.assertIsNone(read_token(token).page_id)
+
+    def test_tampered_token(self):
+        token = make_token(5, timestamp=self.now - 10)
+        forged = token.replace(str(self.now - 10), str(self.now - 100), 1)
+        self.assertIsNone(read_token(forged))
+        self.assertFalse(verify_token(forged, self.interval))
+
+    def test_plain_timestamp_rejected(self):
+        self.assertFalse(verify_token(str(self.now - 10), self.interval))
+
+    def test_instant_submit(self):
+        token = make_token(timestamp=self.now)
+        self.assertFalse(verify_token(token, self.interval))
+
+    def test_delayed_submit(self):
+        token = make_token(timestamp=self.now - 10)
+        self.assertTrue(verify_token(token, self.interval))
+
+    def test_future_token(self):
+        token = make_token(timestamp=self.now + 100)
+        self.assertFalse(verify_token(token, self.interval))
+
+    def test_expired_token(self):
+        token = make_token(max_age=60, timestamp=self.now - 100)
+        self.assertFalse(verify_token(token, self.interval))
+
+    def test_tokens_unique(self):
+        self.assertNotEqual(
+            make_token(5, timestamp=self.now), make_token(5, timestamp=self.now)
+        )
+
+    def test_page_id(self):
+        token = make_token(5, timestamp=self.now - 10)
+        self.assertTrue(verify_token(token, self.interval, 5))
+        self.assertFalse(verify_token(token, self.interval, 6))
+
+    @override_settings(SECRET_KEY="other")
+    def test_other_secret_key(self):
+        token = make_token(timestamp=self.now - 10)
+        with override_settings(SECRET_KEY="secret"):
+            self.assertFalse(verify_token(token, self.interval))
+
+
+@override_settings(HONEYPOT_SIGNED_TOKENS=True)
+class TestHoneypotFormSignedTokens(TestCase):
+
+    def setUp(self):
+        """
+        Enable honeypot on FormPage with signed time tokens
+        """
+        root_page = Page.objects.get(id=1)
+        home_page = root_page.get_children().first()
+
+        self.form_page = FormPage(
+            title="Form Page",
+            slug="formpage",
+            honeypot=True,
+            thank_you_text="Thank you for your message",
+        )
+        home_page.add_child(instance=self.form_page)
+        FormField.objects.create(
+            page=self.form_page, label="Name", field_type="singleline", required=True
+        )
+        self.form_page.save_revision().publish()
+
+        self.form_view_time = int(time.time())
+
+    def post(self, whf_time):
+        return self.client.post(
+            "/formpage/", {"name": "foo", "whf_name": "", "whf_time": whf_time}
+        )
+
+    def test_template_tag_renders_token(self):
+        fields_data = honeypot_fields(True, self.form_page)
+        self.assertEqual(read_token(fields_data["time"]).page_id, self.form_page.pk)
+
+    def test_template_tag_without_page(self):
+        template = Template(
+            "{% load honeypot_tags %}{% honeypot_fields page.honeypot %}"
+        )
+        with self.assertRaises(ImproperlyConfigured):
+            template.render(Context({"page": self.form_page}))
+
+        # the form page checks the token against its id
+        template = Template(
+            "{% load honeypot_tags %}{% honeypot_fields page.honeypot page %}"
+        )
+        soup = bs4(template.render(Context({"page": self.form_page})), "html.parser")
+        token = soup.find("input", {"name": "whf_time"})["value"]
+        with mock.patch.object(tokens, "time") as mock_time:
+            mock_time.time.return_value = self.form_view_time + 10
+            self.post(token)
+        self.assertEqual(FormSubmission.objects.all().count(), 1)
+
+        # the fields aren't rendered for a page without the honeypot
+        self.form_page.honeypot = False
+        template = Template(
+            "{% load honeypot_tags %}{% honeypot_fields page.honeypot %}"
+        )
+        self.assertEqual(template.render(Context({"page": self.form_page})), "\n")
+
+    def test_form_submission(self):
+        resp = self.post(
+            make_token(self.form_page.pk, timestamp=self.form_view_time - 10)
+        )
+        self.assertEqual(FormSubmission.objects.all().count(), 1)
+        self.assertContains(resp, "Thank you for your message")
+
+    def test_form_submission_plain_timestamp(self):
+        resp = self.post(self.form_view_time - 10)
+        self.assertEqual(FormSubmission.objects.all().count(), 0)
+        self.assertContains(resp, "Thank you for your message")
+
+    def test_form_submission_other_page(self):
+        self.post(make_token(self.form_page.pk + 1, timestamp=self.form_view_time - 10))
+        self.assertEqual(FormSubmission.objects.all().count(), 0)
+
+    def test_form_submission_future_token(self):
+        self.post(make_token(self.form_page.pk, timestamp=self.form_view_time + 100))
+        self.assertEqual(FormSubmission.objects.all().count(), 0)
@@ -0,0 +1,118 @@
+import json
+import time
+from unittest import mock
+
+from django.core.cache import cache, caches
+from django.core.exceptions import ValidationError
+from django.test import TestCase, override_settings
+from rest_framework import serializers
+
+from wagtail_honeypot.tokens import make_token
+from wagtail_honeypot.validators import HoneypotValidator
+
+
+class ContactSerializer(serializers.Serializer):
+    name = serializers.CharField()
+
+    def validate(self, attrs):
+        HoneypotValidator()(self.initial_data)
+        return attrs
+
+
+class TestHoneypotValidator(TestCase):
+    """
+    Test the validator used outside of Wagtail form pages
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.form_view_time = int(time.time())
+
+    def test_validate(self):
+        validator = HoneypotValidator()
+        data = {"whf_name": "", "whf_time": self.form_view_time - 10}
+        self.assertIsNone(validator.validate(data))
+        data = {"whf_name": "foo", "whf_time": self.form_view_time - 10}
+        self.assertEqual(validator.validate(data), "field")
+        data = {"whf_name": "", "whf_time": self.form_view_time}
+        self.assertEqual(validator.validate(data), "time")
+        self.assertEqual(validator.validate({"name": "foo"}), "missing")
+
+    def test_validate_interval(self):
+        data = {"whf_name": "", "whf_time": self.form_view_time - 10}
+        self.assertEqual(HoneypotValidator(interval=60).validate(data), "time")
+
+    def test_call(self):
+        validator = HoneypotValidator()
+        validator({"whf_name": "", "whf_time": self.form_view_time - 10})
+        with self.assertRaises(ValidationError) as cm:
+            validator({"whf_name": "foo", "whf_time": self.form_view_time - 10})
+        self.assertEqual(cm.exception.code, "field")
+
+    def test_json_data(self):
+        data = json.loads(
+            json.dumps({"whf_name": "", "whf_time": self.form_view_time - 10})
+        )
+        self.assertIsNone(HoneypotValidator().validate(data))
+
+    def test_serializer(self):
+        serializer = ContactSerializer(
+            data={"name": "foo", "whf_name": "", "whf_time": self.form_view_time - 10}
+        )
+        self.assertTrue(serializer.is_valid())
+        serializer = ContactSerializer(
+            data={"name": "foo", "whf_name": "bot", "whf_time": self.form_view_time}
+        )
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors["non_field_errors"][0].code, "field")
+
+    def test_validate_many(self):
+        payloads = [
+            {"whf_name": "", "whf_time": self.form_view_time - 10},
+            {"whf_name": "foo", "whf_time": self.form_view_time - 10},
+            {"whf_name": "", "whf_time": self.form_view_time},
+            {},
+        ]
+        self.assertEqual(
+            HoneypotValidator().validate_many(payloads),
+            [None, "field", "time", "missing"],
+        )
+
+    @override_settings(HONEYPOT_SIGNED_TOKENS=True, HONEYPOT_SINGLE_USE_TOKENS=True)
+    def test_validate_many_single_use(self):
+        timestamp = self.form_view_time - 10
+        used, fresh = make_token(5, timestamp=timestamp), make_token(
+            5, timestamp=timestamp
+        )
+        HoneypotValidator(5).validate({"whf_name": "", "whf_time": used})
+        payloads = [
+            {"whf_name": "", "whf_time": used},
+            {"whf_name": "", "whf_time": fresh},
+            {"whf_name": "", "whf_time": fresh},
+            {"whf_name": "", "whf_time": make_token(6, timestamp=timestamp)},
+        ]
+        expected = ["replay", None, "replay", "time"]
+
+        store = caches["default"]
+        with mock.patch.object(store, "get_many", wraps=store.get_many) as get_many:
+            self.assertEqual(
+                HoneypotValidator(5, redeem=False).validate_many(payloads), expected
+            )
+        get_many.assert_called_once()
+        self.assertEqual(HoneypotValidator(5).validate_many(payloads), expected)
+        self.assertEqual(
+            HoneypotValidator(5).validate_many(payloads),
+            ["replay", "replay", "replay", "time"],
+        )
+
+    @override_settings(
+        HONEYPOT_SIGNED_TOKENS=True,
+        HONEYPOT_SINGLE_USE_TOKENS=True,
+        HONEYPOT_NONCE_CACHE=None,
+    )
+    def test_validate_many_local_store(self):
+        token = make_token(timestamp=self.form_view_time - 10)
+        payloads = [{"whf_name": "", "whf_time": token}] * 2
+        self.assertEqual(
+            HoneypotValidator(redeem=False).validate_many(payloads), [None, "replay"]
+        )
@@ -0,0 +1,82 @@
+from bs4 import BeautifulSoup as bs4
+from django.http import HttpResponse
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, override_settings
+
+from tests.testapp.models import FormPage
+from wagtail_honeypot.middleware import HoneypotMiddleware
+from wagtail_honeypot.tokens import read_token
+
+
+class TestHoneypotTokenView(TestCase):
+    """
+    Test the view used to fetch the honeypot time value
+    """
+
+    def test_token_view_timestamp(self):
+        resp = self.client.get("/honeypot/token/")
+        self.assertEqual(resp.status_code, 200)
+        self.assertIsInstance(int(resp.json()["token"]), int)
+        self.assertIn("no-cache", resp["Cache-Control"])
+
+    @override_settings(HONEYPOT_SIGNED_TOKENS=True)
+    def test_token_view_signed_token(self):
+        resp = self.client.get("/honeypot/token/", {"page": 5})
+        self.assertEqual(read_token(resp.json()["token"]).page_id, 5)
+
+    @override_settings(HONEYPOT_SIGNED_TOKENS=True)
+    def test_token_view_invalid_page(self):
+        resp = self.client.get("/honeypot/token/", {"page": "foo"})
+        self.assertIsNone(read_token(resp.json()["token"]).page_id)
+
+    def test_token_view_session_not_used(self):
+        resp = self.client.get("/honeypot/token/")
+        self.assertNotIn("Cookie", resp.get("Vary", ""))
+        self.assertNotIn("sessionid", resp.cookies)
+
+    def test_middleware_answers_token_request(self):
+        def get_response(request):
+            raise AssertionError("The token request should not reach the view")
+
+        middleware = HoneypotMiddleware(get_response)
+        resp = middleware(RequestFactory().get("/honeypot/token/"))
+        self.assertIn(b"token", resp.content)
+
+    def test_middleware_passes_other_requests(self):
+        middleware = HoneypotMiddleware(lambda request: HttpResponse("foo"))
+        resp = middleware(RequestFactory().get("/honeypot/"))
+        self.assertContains(resp, "foo")
+
+
+@override_settings(HONEYPOT_FETCH_TOKEN=True)
+class TestHoneypotFetchTokenTag(TestCase):
+    """
+    Test the template tag renders a cacheable placeholder
+    """
+
+    def test_honeypot_tags_rendered(self):
+        context = Context({"honeypot": True})
+        template = Template("{% load honeypot_tags %}{% honeypot_fields honeypot %}")
+
+        soup = bs4(template.render(context), "html.parser")
+
+        input_time = soup.find("input", {"id": "whf_time", "type": "hidden"})
+        self.assertEqual(input_time["value"], "")
+        self.assertEqual(input_time["data-honeypot-token-url"], "/honeypot/token/")
+
+    def test_honeypot_tags_rendered_with_page(self):
+        context = Context({"honeypot": True, "page": FormPage(pk=5)})
+        template = Template(
+            "{% load honeypot_tags %}{% honeypot_fields honeypot page %}"
+        )
+
+        soup = bs4(template.render(context), "html.parser")
+
+        input_time = soup.find("input", {"id": "whf_time", "type": "hidden"})
+        self.assertEqual(
+            input_time["data-honeypot-token-url"], "/honeypot/token/?page=5"
+        )
+
+    def test_honeypot_tags_rendered_same_each_time(self):
+        template = Template("{% load honeypot_tags %}{% honeypot_fields True %}")
+        self.assertEqual(template.render(Context()), template.render(Context()))
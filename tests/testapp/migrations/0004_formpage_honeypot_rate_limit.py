@@ -0,0 +1,22 @@
+# Generated by Django 4.2.30 on 2026-10-18 12:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tests_testapp", "0003_formfield_formpage"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="formpage",
+            name="honeypot_rate_limit",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="Maximum submissions from one visitor in the rate limit window. Leave empty to use the site default.",
+                null=True,
+                verbose_name="Rate Limit",
+            ),
+        ),
+    ]
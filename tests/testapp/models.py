@@ -47,7 +47,7 @@ class FormPage(HoneypotFormMixin, HoneypotFormSubmissionMixin):
 
     honeypot_panels = [
         MultiFieldPanel(
-            [FieldPanel("honeypot")],
+            [FieldPanel("honeypot"), FieldPanel("honeypot_rate_limit")],
             heading="Reduce Form Spam",
         )
     ]
@@ -13,5 +13,6 @@ urlpatterns = [
     path("django-admin/", admin.site.urls),
     path("admin/", include(wagtailadmin_urls)),
     path("documents/", include(wagtaildocs_urls)),
+    path("honeypot/", include("wagtail_honeypot.urls")),
     path("", include(wagtail_urls)),
 ]
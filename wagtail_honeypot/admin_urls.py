@@ -0,0 +1,10 @@
+from django.urls import path
+
+from . import admin_views
+
+app_name = "wagtail_honeypot_admin"
+
+urlpatterns = [
+    path("quarantine/", admin_views.quarantine_index, name="quarantine"),
+    path("report/", admin_views.report, name="report"),
+]
@@ -0,0 +1,156 @@
+from datetime import timedelta
+
+from django.contrib import messages
+from django.core.exceptions import PermissionDenied
+from django.db.models import Sum
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from wagtail.admin.auth import permission_required
+from wagtail.models import Page
+
+from .metrics import ALLOWED, BLOCKED, MONITORED
+from .models import HoneypotRollup, QuarantinedSubmission
+from .quarantine import delete, release
+from .rollups import flush_rollups, get_today
+
+PER_PAGE = 50
+
+VIEW_PERMISSION = "wagtail_honeypot.view_quarantinedsubmission"
+REVIEW_PERMISSION = "wagtail_honeypot.delete_quarantinedsubmission"
+REPORT_PERMISSION = "wagtail_honeypot.view_honeypotrollup"
+
+REPORT_DAYS = (7, 30, 90, 365)
+OUTCOMES = (ALLOWED, BLOCKED, MONITORED)
+
+
+def get_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def get_submissions(before=None, after=None):
+    """
+    Return a page of quarantined submissions newest first, with the ids
+    to link the newer and older pages
+
+    Pages are found from the id of the first or last submission shown so
+    every page costs the same however many submissions are quarantined
+    """
+    queryset = QuarantinedSubmission.objects.select_related("page")
+    if after is not None:
+        submissions = list(queryset.filter(pk__gt=after).order_by("pk")[: PER_PAGE + 1])
+        more = len(submissions) > PER_PAGE
+        submissions = submissions[:PER_PAGE][::-1]
+        newer = submissions[0].pk if more else None
+        older = submissions[-1].pk if submissions else None
+    else:
+        if before is not None:
+            queryset = queryset.filter(pk__lt=before)
+        submissions = list(queryset.order_by("-pk")[: PER_PAGE + 1])
+        more = len(submissions) > PER_PAGE
+        submissions = submissions[:PER_PAGE]
+        newer = submissions[0].pk if before is not None and submissions else None
+        older = submissions[-1].pk if more else None
+    return submissions, newer, older
+
+
+@permission_required(VIEW_PERMISSION)
+def quarantine_index(request):
+    """
+    List the quarantined submissions to release or delete
+    """
+    if request.method == "POST":
+        if not request.user.has_perm(REVIEW_PERMISSION):
+            raise PermissionDenied
+        ids = [pk for pk in map(get_id, request.POST.getlist("id")) if pk]
+        action = request.POST.get("action")
+        if action == "release":
+            count = release(ids)
+            messages.success(request, f"Released {count} quarantined submissions.")
+        elif action == "delete":
+            count = delete(ids)
+            messages.success(request, f"Deleted {count} quarantined submissions.")
+        return redirect(request.get_full_path())
+
+    submissions, newer, older = get_submissions(
+        get_id(request.GET.get("before")), get_id(request.GET.get("after"))
+    )
+    return TemplateResponse(
+        request,
+        "wagtail_honeypot/quarantine.html",
+        {
+            "submissions": submissions,
+            "newer": newer,
+            "older": older,
+            "can_review": request.user.has_perm(REVIEW_PERMISSION),
+        },
+    )
+
+
+def get_report(days):
+    """
+    Return the submission totals for each page, day and blocked reason
+
+    Only the daily rollup rows are read, so the report costs the same
+    however many submissions were made
+    """
+    end = get_today()
+    start = end - timedelta(days=days - 1)
+    rows = HoneypotRollup.objects.filter(day__gte=start, day__lte=end)
+
+    def get_totals(rows, *fields):
+        return (
+            rows.values(*fields)
+            .annotate(total=Sum("count"))
+            .values_list(*fields, "total")
+            .order_by()
+        )
+
+    pages = {}
+    for page_id, outcome, total in get_totals(rows, "page_id", "outcome"):
+        totals = pages.setdefault(page_id, dict.fromkeys(OUTCOMES, 0))
+        totals[outcome] = totals.get(outcome, 0) + total
+    titles = dict(Page.objects.filter(pk__in=pages).values_list("pk", "title"))
+    pages = sorted(
+        (
+            dict(totals, page_id=page_id, title=titles.get(page_id, ""))
+            for page_id, totals in pages.items()
+        ),
+        key=lambda row: (-row[BLOCKED], row["title"]),
+    )
+
+    day_totals = {}
+    for day, outcome, total in get_totals(rows, "day", "outcome"):
+        day_totals.setdefault(day, {})[outcome] = total
+    daily = [
+        dict(dict.fromkeys(OUTCOMES, 0), day=day, **day_totals.get(day, {}))
+        for day in (end - timedelta(days=i) for i in range(days))
+    ]
+
+    reasons = sorted(
+        get_totals(rows.filter(outcome=BLOCKED), "reason"), key=lambda row: -row[1]
+    )
+    return {"pages": pages, "daily": daily, "reasons": reasons}
+
+
+@permission_required(REPORT_PERMISSION)
+def report(request):
+    """
+    Show the allowed and blocked submissions of each form page
+    """
+    try:
+        days = int(request.GET.get("days", REPORT_DAYS[1]))
+    except ValueError:
+        days = REPORT_DAYS[1]
+    if days not in REPORT_DAYS:
+        days = REPORT_DAYS[1]
+
+    # include the counts this process hasn't saved yet
+    flush_rollups()
+    return TemplateResponse(
+        request,
+        "wagtail_honeypot/report.html",
+        dict(get_report(days), days=days, report_days=REPORT_DAYS),
+    )
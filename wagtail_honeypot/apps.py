@@ -1,7 +1,17 @@
 from django.apps import AppConfig
+from django.core.signals import setting_changed
 
 
 class WagtailHoneypotAppConfig(AppConfig):
     label = "wagtail_honeypot"
     name = "wagtail_honeypot"
     verbose_name = "Wagtail Honeypot"
+
+    default_auto_field = "django.db.models.AutoField"
+
+    def ready(self):
+        from .conf import reload_config
+
+        # validate the settings at startup
+        reload_config()
+        setting_changed.connect(reload_config)
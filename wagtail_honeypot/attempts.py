@@ -0,0 +1,154 @@
+import atexit
+import logging
+import random
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.db import DatabaseError, connections
+from django.utils import timezone
+from django.utils.crypto import salted_hmac
+
+from .conf import get_config
+from .ratelimit import get_client_ip
+
+logger = logging.getLogger(__name__)
+
+PAYLOAD_MAX_FIELDS = 10
+PAYLOAD_MAX_LENGTH = 100
+PAYLOAD_EXCLUDE = {"csrfmiddlewaretoken"}
+
+_lock = threading.Lock()
+_buffer = []
+_buffer_started = None
+_timer = None
+
+
+def is_enabled():
+    return get_config().log_attempts
+
+
+def get_ip_hash(request):
+    """
+    Return a truncated keyed hash of the client IP address
+    """
+    ip = get_client_ip(request)
+    return salted_hmac("wagtail_honeypot.attempts", ip).hexdigest()[:16]
+
+
+def get_payload(data):
+    """
+    Return the first few posted fields with their values truncated
+    """
+    payload = {}
+    for key in data:
+        if key in PAYLOAD_EXCLUDE:
+            continue
+        if len(payload) == PAYLOAD_MAX_FIELDS:
+            break
+        payload[key[:PAYLOAD_MAX_LENGTH]] = str(data.get(key))[:PAYLOAD_MAX_LENGTH]
+    return payload
+
+
+def log_attempt(reason, page_id=None, request=None, data=None):
+    """
+    Add a blocked submission to the buffer of attempts to be saved
+
+    Only HONEYPOT_ATTEMPT_SAMPLE_RATE of the attempts are kept, the buffer
+    is saved with a single insert once it holds HONEYPOT_ATTEMPT_BATCH_SIZE
+    attempts or the oldest is HONEYPOT_ATTEMPT_FLUSH_INTERVAL seconds old,
+    by a timer when no other attempt is logged and when the process exits
+    """
+    if buffer_attempt(reason, page_id, request, data):
+        flush_attempts()
+
+
+async def alog_attempt(reason, page_id=None, request=None, data=None):
+    """
+    Async version of log_attempt, only saving the buffer runs in a thread
+    """
+    if buffer_attempt(reason, page_id, request, data):
+        await sync_to_async(flush_attempts)()
+
+
+def buffer_attempt(reason, page_id=None, request=None, data=None):
+    """
+    Add the attempt to the buffer when it is sampled
+
+    Returns True when the buffer should be saved
+    """
+    global _buffer_started
+
+    config = get_config()
+    if not config.log_attempts:
+        return False
+    if random.random() >= config.attempt_sample_rate:
+        return False
+
+    from .models import HoneypotAttempt
+
+    if data is None and request is not None:
+        data = request.POST
+    attempt = HoneypotAttempt(
+        page_id=page_id,
+        reason=reason,
+        ip_hash=get_ip_hash(request) if request is not None else "",
+        created_at=timezone.now(),
+        payload=get_payload(data) if data is not None else {},
+    )
+
+    now = time.monotonic()
+    with _lock:
+        if not _buffer:
+            _buffer_started = now
+            start_timer(config.attempt_flush_interval)
+        _buffer.append(attempt)
+        full = len(_buffer) >= config.attempt_batch_size
+        due = now - _buffer_started >= config.attempt_flush_interval
+    return full or due
+
+
+def start_timer(interval):
+    """
+    Save the buffer once the interval has passed, even when no other attempt
+    is logged, called while holding the lock
+    """
+    global _timer
+
+    if _timer is None:
+        _timer = threading.Timer(interval, flush_on_timer)
+        _timer.daemon = True
+        _timer.start()
+
+
+def flush_on_timer():
+    try:
+        flush_attempts()
+    finally:
+        # the connection opened by the timer thread isn't used again
+        connections.close_all()
+
+
+@atexit.register
+def flush_attempts():
+    """
+    Save the buffered attempts, returns the number saved
+    """
+    global _buffer, _timer
+
+    from .models import HoneypotAttempt
+
+    with _lock:
+        attempts, _buffer = _buffer, []
+        if _timer is not None:
+            _timer.cancel()
+            _timer = None
+    if not attempts:
+        return 0
+    try:
+        HoneypotAttempt.objects.bulk_create(attempts)
+    except DatabaseError:
+        # losing a few audit records is better than failing the request
+        logger.exception("Unable to save %d honeypot attempts", len(attempts))
+        return 0
+    return len(attempts)
@@ -0,0 +1,155 @@
+import hashlib
+import math
+import secrets
+import time
+from collections import namedtuple
+
+from django.core import signing
+from django.core.cache import caches
+
+from .conf import get_config
+
+SALT = "wagtail_honeypot.challenges"
+SEPARATOR = "."
+SOLUTION_SEPARATOR = ":"
+KEY_PREFIX = "wagtail_honeypot:challenge:"
+
+# longer solutions can't have been found by counting from zero
+MAX_SOLUTION_LENGTH = 12
+
+Challenge = namedtuple("Challenge", ["page_id", "difficulty", "expires", "nonce"])
+
+
+def get_signer():
+    return signing.Signer(salt=SALT)
+
+
+def make_challenge(page_id=None, difficulty=None):
+    """
+    Return a signed proof of work challenge
+
+    The challenge carries the page the form belongs to, the number of
+    leading zero bits the SHA-256 hash of the solution must have, the
+    time it expires and a random nonce so it can only be used once
+    """
+    config = get_config()
+    if difficulty is None:
+        difficulty = get_difficulty(page_id)
+    expires = int(time.time()) + config.pow_max_age
+    page = "" if page_id is None else str(page_id)
+    return get_signer().sign(
+        SEPARATOR.join((page, str(difficulty), str(expires), secrets.token_hex(8)))
+    )
+
+
+def read_challenge(challenge):
+    """
+    Return the Challenge held in a signed challenge string, None if it
+    has been tampered with or can't be read
+    """
+    try:
+        value = get_signer().unsign(challenge)
+        page, difficulty, expires, nonce = value.split(SEPARATOR)
+        return Challenge(
+            int(page) if page else None, int(difficulty), int(expires), nonce
+        )
+    except (signing.BadSignature, TypeError, ValueError):
+        return None
+
+
+def has_leading_zero_bits(digest, bits):
+    return int.from_bytes(digest, "big") >> (len(digest) * 8 - bits) == 0
+
+
+def verify_solution(value, page_id=None):
+    """
+    Return the Challenge of a solved challenge, None if it isn't solved
+
+    The value is the challenge and the solution joined by a colon, it is
+    checked with one signature check and a single SHA-256 hash however
+    hard the challenge was. When a page_id is given the challenge must
+    have been issued for that page.
+    """
+    if not isinstance(value, str):
+        return None
+    challenge, _, solution = value.rpartition(SOLUTION_SEPARATOR)
+    if not solution.isdigit() or len(solution) > MAX_SOLUTION_LENGTH:
+        return None
+    data = read_challenge(challenge)
+    if data is None or data.expires < time.time():
+        return None
+    if page_id is not None and data.page_id != page_id:
+        return None
+    digest = hashlib.sha256(value.encode()).digest()
+    return data if has_leading_zero_bits(digest, data.difficulty) else None
+
+
+def solve(challenge):
+    """
+    Return the challenge with its solution, as honeypot.js would submit it
+    """
+    difficulty = read_challenge(challenge).difficulty
+    solution = 0
+    while True:
+        value = f"{challenge}{SOLUTION_SEPARATOR}{solution}"
+        if has_leading_zero_bits(hashlib.sha256(value.encode()).digest(), difficulty):
+            return value
+        solution += 1
+
+
+def get_keys(page_id, now, window):
+    index = int(now // window)
+    key = f"{KEY_PREFIX}{'' if page_id is None else page_id}:"
+    return key + str(index), key + str(index - 1)
+
+
+def count_submission(page_id):
+    """
+    Count a submission to the page for its difficulty
+    """
+    config = get_config()
+    cache = caches[config.pow_cache]
+    window = config.pow_window
+    current_key, _ = get_keys(page_id, time.time(), window)
+    cache.add(current_key, 0, window * 2)
+    try:
+        cache.incr(current_key)
+    except ValueError:
+        cache.set(current_key, 1, window * 2)
+
+
+def get_difficulty(page_id=None):
+    """
+    Return the difficulty of a new challenge for the page
+
+    Starts at HONEYPOT_POW_MIN_DIFFICULTY and adds a bit, doubling the
+    work, each time the submissions to the page in the sliding
+    HONEYPOT_POW_WINDOW double past HONEYPOT_POW_TARGET_RATE, up to
+    HONEYPOT_POW_MAX_DIFFICULTY
+    """
+    config = get_config()
+    window = config.pow_window
+    now = time.time()
+    current_key, previous_key = get_keys(page_id, now, window)
+    counts = caches[config.pow_cache].get_many([current_key, previous_key])
+    return get_difficulty_for(counts, current_key, previous_key, now)
+
+
+def get_difficulty_for(counts, current_key, previous_key, now):
+    config = get_config()
+    elapsed = (now % config.pow_window) / config.pow_window
+    rate = counts.get(previous_key, 0) * (1 - elapsed) + counts.get(current_key, 0)
+    extra = int(math.log2(1 + rate / config.pow_target_rate))
+    return min(config.pow_min_difficulty + extra, config.pow_max_difficulty)
+
+
+async def aget_difficulty(page_id=None):
+    """
+    Async version of get_difficulty using the async cache API
+    """
+    config = get_config()
+    window = config.pow_window
+    now = time.time()
+    current_key, previous_key = get_keys(page_id, now, window)
+    counts = await caches[config.pow_cache].aget_many([current_key, previous_key])
+    return get_difficulty_for(counts, current_key, previous_key, now)
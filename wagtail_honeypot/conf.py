@@ -0,0 +1,293 @@
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.text import slugify
+
+DEFAULTS = {
+    "HONEYPOT_NAME_FIELD": "whf_name",
+    "HONEYPOT_TIME_FIELD": "whf_time",
+    "HONEYPOT_TIME_INTERVAL": 3,
+    "HONEYPOT_SIGNED_TOKENS": False,
+    "HONEYPOT_TOKEN_MAX_AGE": 86400,
+    "HONEYPOT_SINGLE_USE_TOKENS": False,
+    "HONEYPOT_NONCE_CACHE": "default",
+    "HONEYPOT_NONCE_MAX_ENTRIES": 100000,
+    "HONEYPOT_FETCH_TOKEN": False,
+    "HONEYPOT_POW": False,
+    "HONEYPOT_POW_FIELD": "whf_pow",
+    "HONEYPOT_POW_MIN_DIFFICULTY": 14,
+    "HONEYPOT_POW_MAX_DIFFICULTY": 22,
+    "HONEYPOT_POW_TARGET_RATE": 30,
+    "HONEYPOT_POW_WINDOW": 60,
+    "HONEYPOT_POW_MAX_AGE": 3600,
+    "HONEYPOT_POW_CACHE": "default",
+    "HONEYPOT_SCORE_THRESHOLD": 1,
+    "HONEYPOT_MAX_LINKS": None,
+    "HONEYPOT_BLOCKED_KEYWORDS": (),
+    "HONEYPOT_BLOCKED_DOMAINS": (),
+    "HONEYPOT_SCORERS": (),
+    "HONEYPOT_DUPLICATE_LIMIT": None,
+    "HONEYPOT_DUPLICATE_WINDOW": 3600,
+    "HONEYPOT_DUPLICATE_MAX_ENTRIES": 10000,
+    "HONEYPOT_DUPLICATE_CACHE": "default",
+    "HONEYPOT_ROTATE_FIELDS": False,
+    "HONEYPOT_ROTATION_HOURS": 24,
+    "HONEYPOT_MIDDLEWARE_PATHS": (),
+    "HONEYPOT_RATE_LIMIT": None,
+    "HONEYPOT_RATE_LIMIT_WINDOW": 60,
+    "HONEYPOT_RATE_LIMIT_PER_PAGE": False,
+    "HONEYPOT_RATE_LIMIT_CACHE": "default",
+    "HONEYPOT_IP_HEADER": "REMOTE_ADDR",
+    "HONEYPOT_TRUSTED_PROXIES": 1,
+    "HONEYPOT_SITE_SETTINGS_CACHE": "default",
+    "HONEYPOT_REJECTION_RESPONSE": "cached",
+    "HONEYPOT_REJECTION_STATUS": 200,
+    "HONEYPOT_REJECTION_BODY": "Thank you",
+    "HONEYPOT_TARPIT_DELAY": 0,
+    "HONEYPOT_TARPIT_MAX_CONNECTIONS": 1000,
+    "HONEYPOT_TARPIT_MAX_PER_CLIENT": 2,
+    "HONEYPOT_QUEUE_EMAIL": False,
+    "HONEYPOT_QUEUE_MAX_SIZE": 10000,
+    "HONEYPOT_QUEUE_FULL": "send",
+    "HONEYPOT_SPOOL_DIR": None,
+    "HONEYPOT_SPOOL_FSYNC": False,
+    "HONEYPOT_METRICS": False,
+    "HONEYPOT_METRICS_TOKEN": None,
+    "HONEYPOT_LOG_ATTEMPTS": False,
+    "HONEYPOT_ATTEMPT_SAMPLE_RATE": 1.0,
+    "HONEYPOT_ATTEMPT_BATCH_SIZE": 100,
+    "HONEYPOT_ATTEMPT_FLUSH_INTERVAL": 10,
+    "HONEYPOT_QUARANTINE": False,
+    "HONEYPOT_ROLLUPS": False,
+    "HONEYPOT_ROLLUP_CACHE": "default",
+    "HONEYPOT_ROLLUP_FLUSH_INTERVAL": 60,
+}
+
+
+def get_attribute_name(setting):
+    return setting[len("HONEYPOT_") :].lower()
+
+
+class HoneypotConfig:
+    """
+    The validated honeypot settings
+
+    Each HONEYPOT_ setting is available as a lower case attribute without the
+    prefix, the template field names are also available already slugified.
+    site_settings is True when wagtail.contrib.settings is installed so the
+    honeypot site settings can be edited.
+    """
+
+    __slots__ = tuple(get_attribute_name(setting) for setting in DEFAULTS) + (
+        "name_field_slug",
+        "time_field_slug",
+        "site_settings",
+    )
+
+    def __init__(self, **values):
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+        object.__setattr__(self, "name_field_slug", slugify(self.name_field))
+        object.__setattr__(self, "time_field_slug", slugify(self.time_field))
+        object.__setattr__(
+            self, "site_settings", apps.is_installed("wagtail.contrib.settings")
+        )
+
+    def __setattr__(self, name, value):
+        raise AttributeError("HoneypotConfig is read only")
+
+    def __delattr__(self, name):
+        raise AttributeError("HoneypotConfig is read only")
+
+    @classmethod
+    def from_settings(cls):
+        values = {
+            get_attribute_name(setting): getattr(settings, setting, default)
+            for setting, default in DEFAULTS.items()
+        }
+        for name in (
+            "middleware_paths",
+            "blocked_keywords",
+            "blocked_domains",
+            "scorers",
+        ):
+            values[name] = tuple(values[name] or ())
+        validate(values)
+        return cls(**values)
+
+
+def validate(values):
+    def check(valid, setting, message):
+        if not valid:
+            raise ImproperlyConfigured(f"{setting} {message}")
+
+    def is_number(value):
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+    for name in ("name_field", "time_field", "pow_field"):
+        check(
+            isinstance(values[name], str) and values[name],
+            f"HONEYPOT_{name.upper()}",
+            "must be a non empty string",
+        )
+    check(
+        values["name_field"] != values["time_field"],
+        "HONEYPOT_TIME_FIELD",
+        "must be different to HONEYPOT_NAME_FIELD",
+    )
+    check(
+        values["pow_field"] not in (values["name_field"], values["time_field"]),
+        "HONEYPOT_POW_FIELD",
+        "must be different to the honeypot name and time fields",
+    )
+    for name in ("pow_min_difficulty", "pow_max_difficulty"):
+        check(
+            isinstance(values[name], int) and 0 <= values[name] <= 32,
+            f"HONEYPOT_{name.upper()}",
+            "must be a number of bits from 0 to 32",
+        )
+    check(
+        values["pow_min_difficulty"] <= values["pow_max_difficulty"],
+        "HONEYPOT_POW_MAX_DIFFICULTY",
+        "must not be less than HONEYPOT_POW_MIN_DIFFICULTY",
+    )
+    for name in (
+        "time_interval",
+        "attempt_flush_interval",
+        "rollup_flush_interval",
+        "tarpit_delay",
+    ):
+        check(
+            is_number(values[name]) and values[name] >= 0,
+            f"HONEYPOT_{name.upper()}",
+            "must be a number of seconds",
+        )
+    for name in (
+        "token_max_age",
+        "nonce_max_entries",
+        "rate_limit_window",
+        "trusted_proxies",
+        "rotation_hours",
+        "duplicate_window",
+        "duplicate_max_entries",
+        "pow_target_rate",
+        "pow_window",
+        "pow_max_age",
+        "attempt_batch_size",
+        "tarpit_max_connections",
+        "tarpit_max_per_client",
+    ):
+        check(
+            isinstance(values[name], int) and values[name] > 0,
+            f"HONEYPOT_{name.upper()}",
+            "must be a positive integer",
+        )
+    check(
+        is_number(values["score_threshold"]) and values["score_threshold"] > 0,
+        "HONEYPOT_SCORE_THRESHOLD",
+        "must be a number above zero",
+    )
+    check(
+        values["max_links"] is None
+        or (isinstance(values["max_links"], int) and values["max_links"] >= 0),
+        "HONEYPOT_MAX_LINKS",
+        "must be None or a number of links",
+    )
+    for name in ("blocked_keywords", "blocked_domains", "scorers"):
+        check(
+            all(isinstance(value, str) and value for value in values[name]),
+            f"HONEYPOT_{name.upper()}",
+            "must be a list of non empty strings",
+        )
+    check(
+        values["queue_full"] in ("send", "drop"),
+        "HONEYPOT_QUEUE_FULL",
+        'must be "send" or "drop"',
+    )
+    check(
+        values["rejection_response"] in ("render", "cached", "static", "status"),
+        "HONEYPOT_REJECTION_RESPONSE",
+        'must be "render", "cached", "static" or "status"',
+    )
+    check(
+        isinstance(values["rejection_status"], int)
+        and 100 <= values["rejection_status"] <= 599,
+        "HONEYPOT_REJECTION_STATUS",
+        "must be an HTTP status code",
+    )
+    check(
+        isinstance(values["rejection_body"], str),
+        "HONEYPOT_REJECTION_BODY",
+        "must be a string",
+    )
+    check(
+        is_number(values["attempt_sample_rate"])
+        and 0 <= values["attempt_sample_rate"] <= 1,
+        "HONEYPOT_ATTEMPT_SAMPLE_RATE",
+        "must be a number between 0 and 1",
+    )
+    check(
+        values["signed_tokens"] or not values["single_use_tokens"],
+        "HONEYPOT_SINGLE_USE_TOKENS",
+        "needs HONEYPOT_SIGNED_TOKENS, only signed tokens have a nonce",
+    )
+    check(
+        values["metrics_token"] is None
+        or (isinstance(values["metrics_token"], str) and values["metrics_token"]),
+        "HONEYPOT_METRICS_TOKEN",
+        "must be None or a non empty string",
+    )
+    check(
+        values["nonce_cache"] is None or values["nonce_cache"] in settings.CACHES,
+        "HONEYPOT_NONCE_CACHE",
+        "must be None or the alias of a cache in the CACHES setting",
+    )
+    for name in ("rate_limit", "duplicate_limit", "queue_max_size"):
+        check(
+            values[name] is None
+            or (isinstance(values[name], int) and values[name] > 0),
+            f"HONEYPOT_{name.upper()}",
+            "must be None or a positive integer",
+        )
+    for name in (
+        "rate_limit_cache",
+        "site_settings_cache",
+        "duplicate_cache",
+        "rollup_cache",
+        "pow_cache",
+    ):
+        check(
+            values[name] in settings.CACHES,
+            f"HONEYPOT_{name.upper()}",
+            "must be the alias of a cache in the CACHES setting",
+        )
+
+
+_config = None
+
+
+def get_config():
+    """
+    Return the HoneypotConfig built from the current settings
+    """
+    global _config
+
+    if _config is None:
+        _config = HoneypotConfig.from_settings()
+    return _config
+
+
+def reload_config(setting=None, **kwargs):
+    """
+    Rebuild the config when a honeypot setting changes
+
+    Connected to the setting_changed signal so override_settings works
+    """
+    global _config
+
+    if (
+        setting is None
+        or setting.startswith("HONEYPOT_")
+        or setting in ("CACHES", "INSTALLED_APPS")
+    ):
+        _config = HoneypotConfig.from_settings()
@@ -0,0 +1,131 @@
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+
+from .conf import get_config
+
+REASON_DUPLICATE = "duplicate"
+
+KEY_PREFIX = "wagtail_honeypot:duplicate:"
+
+# only longer text values are compared loosely, short answers are too common
+MIN_TEXT_LENGTH = 20
+
+NORMALISE_RE = re.compile(r"[\W_]+")
+
+
+def is_enabled():
+    return get_config().duplicate_limit is not None
+
+
+def get_value(value):
+    if isinstance(value, (list, tuple)):
+        return ",".join(get_value(item) for item in value)
+    return "" if value is None else str(value)
+
+
+def get_fingerprints(cleaned_data):
+    """
+    Return the fingerprints of the submitted data
+
+    The exact fingerprint covers every field and value. The normalised
+    fingerprint covers only the longer text values, ignoring the field
+    names, case, punctuation and spacing, so the same message posted to
+    different forms has the same fingerprint.
+    """
+    exact = hashlib.sha256()
+    texts = []
+    for key in sorted(cleaned_data):
+        value = get_value(cleaned_data[key])
+        exact.update(f"{key}\0{value}\0".encode())
+        text = NORMALISE_RE.sub(" ", value.casefold()).strip()
+        if len(text) >= MIN_TEXT_LENGTH:
+            texts.append(text)
+
+    fingerprints = ["e" + exact.hexdigest()[:32]]
+    if texts:
+        normalised = hashlib.sha256("\0".join(sorted(texts)).encode())
+        fingerprints.append("n" + normalised.hexdigest()[:32])
+    return fingerprints
+
+
+class LocalDuplicates:
+    """
+    Fingerprints known to be over the limit, kept in process memory
+
+    Holds at most max_entries fingerprints, the least recently seen are
+    dropped first
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def contains(self, fingerprint):
+        with self.lock:
+            expires = self.entries.get(fingerprint)
+            if expires is None:
+                return False
+            if expires <= time.monotonic():
+                del self.entries[fingerprint]
+                return False
+            self.entries.move_to_end(fingerprint)
+            return True
+
+    def add(self, fingerprint, ttl):
+        with self.lock:
+            self.entries[fingerprint] = time.monotonic() + ttl
+            self.entries.move_to_end(fingerprint)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+_local = None
+
+
+def get_local_duplicates():
+    global _local
+
+    max_entries = get_config().duplicate_max_entries
+    if _local is None or _local.max_entries != max_entries:
+        _local = LocalDuplicates(max_entries)
+    return _local
+
+
+def is_duplicate(cleaned_data):
+    """
+    Count the submission and check if it has been seen too many times
+
+    Each fingerprint is counted in the HONEYPOT_DUPLICATE_CACHE for
+    HONEYPOT_DUPLICATE_WINDOW seconds, a submission is a duplicate once
+    either of its fingerprints has been seen more than HONEYPOT_DUPLICATE_LIMIT
+    times. Fingerprints over the limit are remembered in process so repeats
+    are dropped without a cache lookup.
+    """
+    config = get_config()
+    local = get_local_duplicates()
+    fingerprints = get_fingerprints(cleaned_data)
+    if any(local.contains(fingerprint) for fingerprint in fingerprints):
+        return True
+
+    cache = caches[config.duplicate_cache]
+    window = config.duplicate_window
+    duplicate = False
+    for fingerprint in fingerprints:
+        key = KEY_PREFIX + fingerprint
+        cache.add(key, 0, window)
+        try:
+            count = cache.incr(key)
+        except ValueError:
+            # the key was evicted between add and incr
+            cache.set(key, 1, window)
+            count = 1
+        if count > config.duplicate_limit:
+            local.add(fingerprint, window)
+            duplicate = True
+    return duplicate
@@ -0,0 +1,66 @@
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.crypto import salted_hmac
+
+from .conf import get_config
+
+NAME_PREFIXES = (
+    "website",
+    "company",
+    "address",
+    "phone",
+    "fax",
+    "url",
+    "title",
+    "city",
+)
+
+
+def get_bucket(now=None):
+    """
+    Return the number of the current rotation period
+    """
+    if now is None:
+        now = time.time()
+    return int(now // (get_config().rotation_hours * 3600))
+
+
+@lru_cache(maxsize=8)
+def derive_field_names(bucket, secret_key):
+    """
+    Return the (name field, time field) names for a rotation period
+    """
+    digest = salted_hmac(
+        "wagtail_honeypot.fields", str(bucket), secret=secret_key, algorithm="sha256"
+    ).hexdigest()
+    prefix = NAME_PREFIXES[int(digest[:2], 16) % len(NAME_PREFIXES)]
+    return f"{prefix}_{digest[2:8]}", f"f{digest[8:16]}"
+
+
+def get_field_names():
+    """
+    Return the (name field, time field) names to render in a form
+    """
+    config = get_config()
+    if config.rotate_fields:
+        return derive_field_names(get_bucket(), settings.SECRET_KEY)
+    return config.name_field, config.time_field
+
+
+def get_accepted_field_names():
+    """
+    Return the (name field, time field) names accepted in a submission
+
+    With rotating field names a form rendered in the previous rotation
+    period is accepted as well as the current one
+    """
+    config = get_config()
+    if config.rotate_fields:
+        bucket = get_bucket()
+        return (
+            derive_field_names(bucket, settings.SECRET_KEY),
+            derive_field_names(bucket - 1, settings.SECRET_KEY),
+        )
+    return ((config.name_field, config.time_field),)
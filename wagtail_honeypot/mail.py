@@ -0,0 +1,114 @@
+import logging
+import smtplib
+from datetime import timedelta
+
+from django.core.mail import get_connection
+from django.db import connection, transaction
+from django.utils import timezone
+from wagtail.admin.mail import send_mail
+
+from .conf import get_config
+
+logger = logging.getLogger(__name__)
+
+QUEUE_FULL_SEND = "send"
+QUEUE_FULL_DROP = "drop"
+
+# errors caused by the message itself, other errors mean the server is unavailable
+MESSAGE_ERRORS = (
+    smtplib.SMTPRecipientsRefused,
+    smtplib.SMTPSenderRefused,
+    smtplib.SMTPDataError,
+)
+
+
+def get_retry_delay(attempts):
+    """
+    Return the time to wait before retrying, doubling with each attempt up to an hour
+    """
+    return timedelta(seconds=min(60 * 2 ** (attempts - 1), 3600))
+
+
+def get_queue_space():
+    """
+    Return the number of emails the queue has room for, None when
+    HONEYPOT_QUEUE_MAX_SIZE is None
+
+    At most HONEYPOT_QUEUE_MAX_SIZE rows are counted however long the queue is
+    """
+    from .models import QueuedEmail
+
+    max_size = get_config().queue_max_size
+    if max_size is None:
+        return None
+    return max_size - QueuedEmail.objects.values("pk")[:max_size].count()
+
+
+def has_queue_space():
+    space = get_queue_space()
+    return space is None or space > 0
+
+
+def record_failure(email, error):
+    email.attempts += 1
+    email.last_error = repr(error)
+    email.send_after = timezone.now() + get_retry_delay(email.attempts)
+    email.save(update_fields=["attempts", "last_error", "send_after"])
+
+
+def send_queued_mail(batch_size=100, max_attempts=5):
+    """
+    Send a batch of queued emails over a single connection
+
+    Sent emails are deleted. A failed email is retried later until it has
+    been attempted max_attempts times, it is then kept but no longer sent.
+    The batch stops at the first error that isn't caused by the message so
+    an unavailable mail server isn't retried for every email.
+
+    Returns the number of emails sent and failed
+    """
+    from .models import QueuedEmail
+
+    sent = failed = 0
+    with transaction.atomic():
+        emails = QueuedEmail.objects.filter(
+            send_after__lte=timezone.now(), attempts__lt=max_attempts
+        ).order_by("send_after", "pk")
+        if connection.features.has_select_for_update_skip_locked:
+            emails = emails.select_for_update(skip_locked=True)
+        emails = list(emails[:batch_size])
+        if not emails:
+            return sent, failed
+
+        mail_connection = get_connection()
+        try:
+            mail_connection.open()
+        except Exception as e:
+            # the mail server is unavailable, the whole batch is retried later
+            for email in emails:
+                record_failure(email, e)
+            return sent, len(emails)
+
+        sent_ids = []
+        try:
+            for email in emails:
+                try:
+                    send_mail(
+                        email.subject,
+                        email.message,
+                        email.recipient_list.split(","),
+                        email.from_email,
+                        connection=mail_connection,
+                    )
+                except Exception as e:
+                    failed += 1
+                    record_failure(email, e)
+                    if not isinstance(e, MESSAGE_ERRORS):
+                        break
+                else:
+                    sent += 1
+                    sent_ids.append(email.pk)
+        finally:
+            mail_connection.close()
+            QueuedEmail.objects.filter(pk__in=sent_ids).delete()
+    return sent, failed
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from wagtail_honeypot.rollups import flush_rollups
+
+
+class Command(BaseCommand):
+    help = "Add the rollup counters of every process in the cache to the rollup table"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=None,
+            help="Keep running and flush the counters every interval seconds",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            count = flush_rollups(registered=True)
+            self.stdout.write(f"Added {count} submissions to the rollups")
+            if options["interval"] is None:
+                break
+            time.sleep(options["interval"])
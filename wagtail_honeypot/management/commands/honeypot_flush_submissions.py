@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from wagtail_honeypot.spool import flush
+
+
+class Command(BaseCommand):
+    help = "Save the spooled form submissions to the database"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="The number of submissions saved by each insert",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=None,
+            help="Keep running and flush the spool every interval seconds",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            count = flush(options["batch_size"])
+            self.stdout.write(f"Saved {count} submissions")
+            if options["interval"] is None:
+                break
+            time.sleep(options["interval"])
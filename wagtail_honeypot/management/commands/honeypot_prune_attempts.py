@@ -0,0 +1,40 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from wagtail_honeypot.models import HoneypotAttempt
+
+
+class Command(BaseCommand):
+    help = "Delete logged honeypot attempts older than the given number of days"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=30,
+            help="Keep attempts from this many days",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="The number of attempts deleted by each query",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["days"])
+        old_attempts = HoneypotAttempt.objects.filter(created_at__lt=cutoff)
+        total = 0
+        while True:
+            # small deletes keep each lock short on a busy table
+            pks = list(
+                old_attempts.order_by("pk").values_list("pk", flat=True)[
+                    : options["chunk_size"]
+                ]
+            )
+            if not pks:
+                break
+            total += HoneypotAttempt.objects.filter(pk__in=pks).delete()[0]
+        self.stdout.write(f"Deleted {total} attempts")
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from wagtail_honeypot.mail import send_queued_mail
+
+
+class Command(BaseCommand):
+    help = "Send the queued form submission notification emails"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="The number of emails sent over each connection",
+        )
+        parser.add_argument(
+            "--max-attempts",
+            type=int,
+            default=5,
+            help="The number of times an email is attempted before giving up",
+        )
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = send_queued_mail(
+                options["batch_size"], options["max_attempts"]
+            )
+            total_sent += sent
+            total_failed += failed
+            # stop when the queue is empty or the mail server is failing
+            if failed or sent < options["batch_size"]:
+                break
+        self.stdout.write(f"Sent {total_sent} emails, {total_failed} failed")
@@ -0,0 +1,176 @@
+import bisect
+import threading
+import time
+
+from . import rollups
+from .conf import get_config
+
+ALLOWED = "allowed"
+BLOCKED = "blocked"
+MONITORED = "monitored"
+
+STAGE_MIDDLEWARE = "middleware"
+STAGE_PRECHECK = "precheck"
+STAGE_CHECK = "check"
+STAGE_SAVE = "save"
+STAGE_EMAIL = "email"
+
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+
+def is_enabled():
+    return get_config().metrics
+
+
+class Histogram:
+    """
+    Counts of observed durations in each of the BUCKETS
+    """
+
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """
+        Return the upper bound of the bucket holding the q quantile
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        total = 0
+        for bound, count in zip(BUCKETS + (float("inf"),), self.counts):
+            total += count
+            if total >= rank:
+                return bound
+
+
+class Metrics:
+    """
+    Submission counters and stage latency histograms for this process
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.submissions = {}
+            self.stages = {}
+
+    def count_submission(self, outcome, page_id=None, reason=None):
+        key = (outcome, reason or "", "" if page_id is None else str(page_id))
+        with self.lock:
+            self.submissions[key] = self.submissions.get(key, 0) + 1
+
+    def observe_stage(self, stage, seconds):
+        with self.lock:
+            if stage not in self.stages:
+                self.stages[stage] = Histogram()
+            self.stages[stage].observe(seconds)
+
+    def get_submission_count(self, outcome=None, page_id=None, reason=None):
+        """
+        Return the number of submissions matching all of the given labels
+        """
+        page = None if page_id is None else str(page_id)
+        return sum(
+            count
+            for (key_outcome, key_reason, key_page), count in self.submissions.items()
+            if outcome in (None, key_outcome)
+            and reason in (None, key_reason)
+            and page in (None, key_page)
+        )
+
+    def get_stage(self, stage):
+        return self.stages.get(stage)
+
+    def render_prometheus(self):
+        """
+        Return the metrics in the Prometheus text exposition format
+        """
+        lines = [
+            "# HELP wagtail_honeypot_submissions_total Form submissions checked by the honeypot.",
+            "# TYPE wagtail_honeypot_submissions_total counter",
+        ]
+        with self.lock:
+            for (outcome, reason, page), count in sorted(self.submissions.items()):
+                lines.append(
+                    f'wagtail_honeypot_submissions_total{{outcome="{outcome}",'
+                    f'reason="{reason}",page="{page}"}} {count}'
+                )
+            lines += [
+                "# HELP wagtail_honeypot_stage_seconds Time taken by each stage of a submission.",
+                "# TYPE wagtail_honeypot_stage_seconds histogram",
+            ]
+            for stage, histogram in sorted(self.stages.items()):
+                total = 0
+                for bound, count in zip(BUCKETS + ("+Inf",), histogram.counts):
+                    total += count
+                    lines.append(
+                        f'wagtail_honeypot_stage_seconds_bucket{{stage="{stage}",'
+                        f'le="{bound}"}} {total}'
+                    )
+                lines.append(
+                    f'wagtail_honeypot_stage_seconds_sum{{stage="{stage}"}} {histogram.sum}'
+                )
+                lines.append(
+                    f'wagtail_honeypot_stage_seconds_count{{stage="{stage}"}} {histogram.count}'
+                )
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+def count_submission(outcome, page_id=None, reason=None):
+    if is_enabled():
+        metrics.count_submission(outcome, page_id, reason)
+    if rollups.is_enabled():
+        rollups.count(outcome, page_id, reason)
+
+
+async def acount_submission(outcome, page_id=None, reason=None):
+    if is_enabled():
+        metrics.count_submission(outcome, page_id, reason)
+    if rollups.is_enabled():
+        await rollups.acount(outcome, page_id, reason)
+
+
+def observe_stage(stage, seconds):
+    if is_enabled():
+        metrics.observe_stage(stage, seconds)
+
+
+class timed:
+    """
+    Context manager recording the time taken by a stage
+
+    Does nothing when metrics are disabled
+    """
+
+    __slots__ = ("stage", "start", "seconds")
+
+    def __init__(self, stage):
+        self.stage = stage
+        self.start = None
+        self.seconds = 0.0
+
+    def __enter__(self):
+        if is_enabled():
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.start is not None:
+            self.seconds = time.perf_counter() - self.start
+            metrics.observe_stage(self.stage, self.seconds)
@@ -0,0 +1,158 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.http import HttpResponse
+from django.urls import NoReverseMatch, reverse
+
+from . import views
+from .attempts import alog_attempt, log_attempt
+from .conf import get_config
+from .fields import get_accepted_field_names
+from .metrics import (
+    BLOCKED,
+    STAGE_MIDDLEWARE,
+    acount_submission,
+    count_submission,
+    timed,
+)
+from .ratelimit import ais_rate_limited, is_rate_limited
+from .responses import get_static_response
+from .site_settings import MODE_PAGE, aget_site_settings, get_site_settings
+from .tarpit import is_enabled as tarpit_enabled
+from .tarpit import tarpit
+from .utils import REASON_RATE, aget_rejection_reason, get_rejection_reason
+
+
+class HoneypotMiddleware:
+    """
+    Rejects honeypot failing POST requests before the page is routed
+
+    Only requests to paths starting with one of HONEYPOT_MIDDLEWARE_PATHS are
+    checked. When the setting is empty, POST requests that carry either of the
+    honeypot fields are checked and all other requests are passed through.
+    Nothing is checked on a site whose honeypot settings aren't in the page mode.
+
+    Requests for the honeypot token view are answered here, so none of the
+    middleware after this one runs for them.
+
+    Under ASGI the checks run on the event loop using the async cache API,
+    and the responses to rejected requests can be delayed by the tarpit.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.token_path = None
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.process_request(request)
+        if response is not None:
+            return response
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        response = await self.aprocess_request(request)
+        if response is None:
+            response = await self.get_response(request)
+        # rejected here or by the form page
+        if getattr(request, "honeypot_rejected", False) and tarpit_enabled():
+            await tarpit(request)
+        return response
+
+    def process_request(self, request):
+        if request.method == "GET" and request.path == self.get_token_path():
+            return views.token(request)
+        reason = self.get_rejection_reason(request)
+        if reason is not None:
+            count_submission(BLOCKED, reason=reason)
+            log_attempt(reason, request=request)
+            return self.get_rejected_response(request)
+        return None
+
+    async def aprocess_request(self, request):
+        if request.method == "GET" and request.path == self.get_token_path():
+            return await views.atoken(request)
+        reason = await self.aget_rejection_reason(request)
+        if reason is not None:
+            await acount_submission(BLOCKED, reason=reason)
+            await alog_attempt(reason, request=request)
+            request.honeypot_rejected = True
+            return self.get_rejected_response(request)
+        return None
+
+    def get_token_path(self):
+        if self.token_path is None:
+            try:
+                self.token_path = reverse("wagtail_honeypot:token")
+            except NoReverseMatch:
+                self.token_path = ""
+        return self.token_path
+
+    def get_rejection_reason(self, request):
+        if not self.should_check(request):
+            return None
+        # only the requests that are checked are timed
+        with timed(STAGE_MIDDLEWARE):
+            site_settings = get_site_settings(request)
+            if site_settings.mode != MODE_PAGE:
+                return None
+            reason = get_rejection_reason(
+                request.POST, interval=site_settings.time_interval
+            )
+            rate_limit = self.get_rate_limit(request, site_settings)
+            if reason is None and rate_limit:
+                if is_rate_limited(request, *rate_limit):
+                    reason = REASON_RATE
+        return reason
+
+    async def aget_rejection_reason(self, request):
+        if not self.should_check(request):
+            return None
+        with timed(STAGE_MIDDLEWARE):
+            site_settings = await aget_site_settings(request)
+            if site_settings.mode != MODE_PAGE:
+                return None
+            reason = await aget_rejection_reason(
+                request.POST, interval=site_settings.time_interval
+            )
+            rate_limit = self.get_rate_limit(request, site_settings)
+            if reason is None and rate_limit:
+                if await ais_rate_limited(request, *rate_limit):
+                    reason = REASON_RATE
+        return reason
+
+    def get_rate_limit(self, request, site_settings):
+        """
+        Return the limit and window of the site or HONEYPOT_RATE_LIMIT
+
+        Per page limits are left to the form page as the page isn't known
+        yet. The request is marked so the form page doesn't count it again.
+        """
+        config = get_config()
+        limit = site_settings.rate_limit or config.rate_limit
+        if not limit or config.rate_limit_per_page:
+            return None
+        request.honeypot_rate_counted = True
+        return limit, site_settings.rate_limit_window or config.rate_limit_window
+
+    def should_check(self, request):
+        if request.method != "POST":
+            return False
+
+        config = get_config()
+        if config.middleware_paths:
+            return request.path_info.startswith(config.middleware_paths)
+        return any(
+            name in request.POST
+            for names in get_accepted_field_names()
+            for name in names
+        )
+
+    def get_rejected_response(self, request):
+        # the landing page isn't known before the page is routed
+        response = get_static_response()
+        return response if response is not None else HttpResponse()
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-18 12:53
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("wagtail_honeypot", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HoneypotAttempt",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("page_id", models.PositiveIntegerField(blank=True, null=True)),
+                ("reason", models.CharField(max_length=16)),
+                ("ip_hash", models.CharField(blank=True, max_length=16)),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        db_index=True, default=django.utils.timezone.now
+                    ),
+                ),
+                ("payload", models.JSONField(blank=True, default=dict)),
+            ],
+        ),
+    ]
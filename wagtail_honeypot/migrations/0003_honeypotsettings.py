@@ -0,0 +1,82 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:06
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("wagtailcore", "0078_referenceindex"),
+        ("wagtail_honeypot", "0002_honeypotattempt"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HoneypotSettings",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "mode",
+                    models.CharField(
+                        choices=[
+                            ("page", "Use the setting of each form page"),
+                            (
+                                "monitor",
+                                "Record failing submissions without blocking them",
+                            ),
+                            ("disabled", "Disabled on this site"),
+                        ],
+                        default="page",
+                        help_text="Monitor checks submissions and records the failures in the attempt log and metrics but saves them as usual.",
+                        max_length=16,
+                    ),
+                ),
+                (
+                    "time_interval",
+                    models.PositiveIntegerField(
+                        blank=True,
+                        help_text="Minimum seconds taken to fill out a form. Leave empty to use HONEYPOT_TIME_INTERVAL.",
+                        null=True,
+                    ),
+                ),
+                (
+                    "rate_limit",
+                    models.PositiveIntegerField(
+                        blank=True,
+                        help_text="Maximum submissions from one visitor in the rate limit window when a form page has no rate limit. Leave empty to use HONEYPOT_RATE_LIMIT.",
+                        null=True,
+                        validators=[django.core.validators.MinValueValidator(1)],
+                    ),
+                ),
+                (
+                    "rate_limit_window",
+                    models.PositiveIntegerField(
+                        blank=True,
+                        help_text="Seconds in the rate limit window. Leave empty to use HONEYPOT_RATE_LIMIT_WINDOW.",
+                        null=True,
+                        validators=[django.core.validators.MinValueValidator(1)],
+                    ),
+                ),
+                (
+                    "site",
+                    models.OneToOneField(
+                        editable=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="wagtailcore.site",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Honeypot settings",
+            },
+        ),
+    ]
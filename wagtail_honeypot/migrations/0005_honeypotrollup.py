@@ -0,0 +1,38 @@
+# Generated by Django 4.2.30 on 2026-10-18 13:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("wagtail_honeypot", "0004_quarantinedsubmission"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HoneypotRollup",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("page_id", models.PositiveIntegerField(default=0)),
+                ("outcome", models.CharField(max_length=16)),
+                ("reason", models.CharField(blank=True, max_length=16)),
+                ("count", models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="honeypotrollup",
+            constraint=models.UniqueConstraint(
+                fields=("day", "page_id", "outcome", "reason"),
+                name="wagtail_honeypot_rollup_unique",
+            ),
+        ),
+    ]
@@ -1,16 +1,64 @@
+import logging
 import time
+from functools import partial
 
-from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.validators import MinValueValidator
 from django.db import models
+from django.utils import timezone
+from wagtail.admin.panels import FieldPanel
 from wagtail.contrib.forms.models import AbstractEmailForm
+from wagtail.contrib.settings.models import BaseSiteSetting
+
+from .attempts import log_attempt
+from .challenges import count_submission as count_challenge_submission
+from .conf import get_config
+from .duplicates import REASON_DUPLICATE, is_duplicate
+from .duplicates import is_enabled as duplicates_enabled
+from .mail import QUEUE_FULL_DROP, has_queue_space
+from .metrics import (
+    ALLOWED,
+    BLOCKED,
+    MONITORED,
+    STAGE_CHECK,
+    STAGE_EMAIL,
+    STAGE_PRECHECK,
+    STAGE_SAVE,
+    count_submission,
+    observe_stage,
+    timed,
+)
+from .quarantine import is_enabled as quarantine_enabled
+from .quarantine import quarantine
+from .ratelimit import is_rate_limited
+from .responses import RESPONSE_CACHED, get_cached_landing_page, get_static_response
+from .site_settings import (
+    DEFAULT_SITE_SETTINGS,
+    MODE_CHOICES,
+    MODE_DISABLED,
+    MODE_MONITOR,
+    MODE_PAGE,
+    get_site_settings,
+)
+from .spool import append, get_spool_dir
+from .utils import REASON_RATE, get_rejection_reason, time_diff
+
+logger = logging.getLogger(__name__)
 
 
 class HoneypotFormMixin(models.Model):
     """
-    Model to provide the honeypot field
+    Model to provide the honeypot fields
     """
 
     honeypot = models.BooleanField(default=False, verbose_name="Honeypot Enabled")
+    honeypot_rate_limit = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        verbose_name="Rate Limit",
+        help_text="Maximum submissions from one visitor in the rate limit window. "
+        "Leave empty to use the site default.",
+    )
 
     class Meta:
         abstract = True
@@ -18,36 +66,282 @@ class HoneypotFormMixin(models.Model):
 
 class HoneypotFormSubmissionMixin(AbstractEmailForm):
     """
-    Adds the overridden process_form_submission method to your form model
+    Adds the overridden serve and process_form_submission methods to your form model
     """
 
+    def serve(self, request, *args, **kwargs):
+        if request.method != "POST" or not self.honeypot:
+            return super().serve(request, *args, **kwargs)
+
+        # only looked up for submissions, process_form_submission falls back
+        # to the defaults without them
+        site_settings = self.honeypot_site_settings = get_site_settings(request)
+        if get_config().pow:
+            # raises the difficulty of new challenges while the page is busy
+            count_challenge_submission(self.pk)
+        # reject a failing submission before the form is built and validated
+        if site_settings.mode == MODE_PAGE:
+            with timed(STAGE_PRECHECK):
+                reason = None
+                # quarantined submissions are checked once the form is cleaned
+                if not quarantine_enabled():
+                    reason = get_rejection_reason(
+                        request.POST, self.pk, interval=site_settings.time_interval
+                    )
+                if reason is None and self.is_rate_limited(request):
+                    reason = REASON_RATE
+            if reason is not None:
+                return self.get_rejected_response(request, reason, *args, **kwargs)
+        return super().serve(request, *args, **kwargs)
+
+    def get_rejected_response(self, request, reason, *args, **kwargs):
+        """
+        Return the response for a submission rejected by the honeypot
+        """
+        count_submission(BLOCKED, self.pk, reason)
+        log_attempt(reason, self.pk, request)
+        self.honeypot_rejected = request.honeypot_rejected = True
+        return self.render_landing_page(request, None, *args, **kwargs)
+
+    def render_landing_page(self, request, form_submission=None, *args, **kwargs):
+        """
+        Return the response set by HONEYPOT_REJECTION_RESPONSE for a rejected
+        submission, otherwise the landing page
+        """
+        if not getattr(self, "honeypot_rejected", False):
+            return super().render_landing_page(
+                request, form_submission, *args, **kwargs
+            )
+        # lets the middleware delay the response under ASGI
+        request.honeypot_rejected = True
+        response = get_static_response()
+        if response is not None:
+            return response
+        render = partial(super().render_landing_page, request, None, *args, **kwargs)
+        if get_config().rejection_response == RESPONSE_CACHED:
+            return get_cached_landing_page(self, request, render)
+        return render()
+
+    def is_rate_limited(self, request):
+        counted = getattr(request, "honeypot_rate_counted", False)
+        if counted and not self.honeypot_rate_limit:
+            # already counted and let through by the middleware
+            return False
+        config = get_config()
+        site_settings = getattr(self, "honeypot_site_settings", DEFAULT_SITE_SETTINGS)
+        limit = (
+            self.honeypot_rate_limit or site_settings.rate_limit or config.rate_limit
+        )
+        if not limit:
+            return False
+        return is_rate_limited(
+            request,
+            limit,
+            site_settings.rate_limit_window or config.rate_limit_window,
+            # the page's own limit is kept apart from the middleware's count
+            self.pk if config.rate_limit_per_page or counted else None,
+        )
+
     def process_form_submission(self, form):
-        honeypot_name_field = getattr(settings, "HONEYPOT_NAME_FIELD", "whf_name")
-        honeypot_time_field = getattr(settings, "HONEYPOT_TIME_FIELD", "whf_time")
-        honeypot_time_interval = getattr(settings, "HONEYPOT_TIME_INTERVAL", 3)
+        site_settings = getattr(self, "honeypot_site_settings", DEFAULT_SITE_SETTINGS)
+        # honeypot enabled
+        if self.honeypot and site_settings.mode != MODE_DISABLED:
+            with timed(STAGE_CHECK):
+                reason = get_rejection_reason(
+                    form.data,
+                    self.pk,
+                    redeem=True,
+                    interval=site_settings.time_interval,
+                )
+                if reason is None and duplicates_enabled():
+                    if is_duplicate(form.cleaned_data):
+                        reason = REASON_DUPLICATE
+            if reason is not None and site_settings.mode == MODE_MONITOR:
+                # recorded but saved as usual
+                count_submission(MONITORED, self.pk, reason)
+                log_attempt(reason, self.pk, data=form.data)
+            elif reason is not None:
+                count_submission(BLOCKED, self.pk, reason)
+                log_attempt(reason, self.pk, data=form.data)
+                self.honeypot_rejected = True
+                if quarantine_enabled():
+                    # kept for review in case it was a real submission
+                    quarantine(self.pk, form.cleaned_data, reason)
+                return None
+
+        start = time.perf_counter()
+        self.honeypot_email_seconds = 0.0
+        if get_spool_dir() is not None:
+            submission = self.spool_form_submission(form)
+        else:
+            submission = super().process_form_submission(form)
+        observe_stage(
+            STAGE_SAVE, time.perf_counter() - start - self.honeypot_email_seconds
+        )
+        count_submission(ALLOWED, self.pk)
+        return submission
 
-        # honey pot disabled
-        if not self.honeypot:
+    def spool_form_submission(self, form):
+        """
+        Append the submission to the spool to be saved later and send the email
+        """
+        submission = self.get_submission_class()(
+            form_data=form.cleaned_data, page=self, submit_time=timezone.now()
+        )
+        try:
+            append(submission)
+        except OSError:
+            # save the submission now if it can't be spooled
             return super().process_form_submission(form)
+        if self.to_address:
+            self.send_mail(form)
+        return submission
 
-        # honeypot enabled
-        score = []
-        if honeypot_name_field in form.data and honeypot_time_field in form.data:
-            score.append(form.data[honeypot_name_field] == "")
-            score.append(
-                self.time_diff(form.data[honeypot_time_field], honeypot_time_interval)
-            )
-            return (
-                super().process_form_submission(form)
-                if len(score) and all(score)
-                else None
-            )
+    def send_mail(self, form):
+        with timed(STAGE_EMAIL) as email:
+            config = get_config()
+            if config.queue_email and has_queue_space():
+                # queued emails are sent by the honeypot_send_mail management command
+                addresses = [x.strip() for x in self.to_address.split(",")]
+                QueuedEmail.objects.create(
+                    subject=self.subject,
+                    message=self.render_email(form),
+                    recipient_list=",".join(addresses),
+                    from_email=self.from_address,
+                )
+            elif config.queue_email and config.queue_full == QUEUE_FULL_DROP:
+                logger.warning(
+                    "The email queue is full, dropped the email of page %s", self.pk
+                )
+            else:
+                # also sent while the visitor waits when the queue is full
+                super().send_mail(form)
+        self.honeypot_email_seconds = email.seconds
 
     @staticmethod
     def time_diff(value, interval):
-        now_time = str(time.time()).split(".")[0]
-        diff = abs(int(now_time) - int(value))
-        return True if diff > interval else False
+        return time_diff(value, interval)
 
     class Meta:
         abstract = True
+
+
+class HoneypotSettings(BaseSiteSetting):
+    """
+    Honeypot settings for a site, edited in the Wagtail admin
+
+    Empty values fall back to the HONEYPOT_ Django settings
+    """
+
+    mode = models.CharField(
+        max_length=16,
+        choices=MODE_CHOICES,
+        default=MODE_PAGE,
+        help_text="Monitor checks submissions and records the failures "
+        "in the attempt log and metrics but saves them as usual.",
+    )
+    time_interval = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Minimum seconds taken to fill out a form. "
+        "Leave empty to use HONEYPOT_TIME_INTERVAL.",
+    )
+    rate_limit = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(1)],
+        help_text="Maximum submissions from one visitor in the rate limit window "
+        "when a form page has no rate limit. Leave empty to use HONEYPOT_RATE_LIMIT.",
+    )
+    rate_limit_window = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(1)],
+        help_text="Seconds in the rate limit window. "
+        "Leave empty to use HONEYPOT_RATE_LIMIT_WINDOW.",
+    )
+
+    panels = [
+        FieldPanel("mode"),
+        FieldPanel("time_interval"),
+        FieldPanel("rate_limit"),
+        FieldPanel("rate_limit_window"),
+    ]
+
+    class Meta:
+        verbose_name = "Honeypot settings"
+
+
+class QueuedEmail(models.Model):
+    """
+    A form submission notification email waiting to be sent
+    """
+
+    subject = models.CharField(max_length=255, blank=True)
+    message = models.TextField()
+    recipient_list = models.TextField()
+    from_email = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    send_after = models.DateTimeField(default=timezone.now, db_index=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    def __str__(self):
+        return self.subject
+
+
+class HoneypotAttempt(models.Model):
+    """
+    A submission blocked by the honeypot, kept for auditing
+    """
+
+    page_id = models.PositiveIntegerField(null=True, blank=True)
+    reason = models.CharField(max_length=16)
+    ip_hash = models.CharField(max_length=16, blank=True)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+    payload = models.JSONField(default=dict, blank=True)
+
+    def __str__(self):
+        return self.reason
+
+
+class QuarantinedSubmission(models.Model):
+    """
+    A submission blocked by the honeypot, kept for review in the Wagtail admin
+    """
+
+    page = models.ForeignKey("wagtailcore.Page", on_delete=models.CASCADE)
+    form_data = models.JSONField(encoder=DjangoJSONEncoder)
+    reason = models.CharField(max_length=16)
+    submit_time = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        verbose_name = "quarantined submission"
+
+    def __str__(self):
+        return self.reason
+
+
+class HoneypotRollup(models.Model):
+    """
+    The number of submissions with an outcome and reason for a page on a day
+
+    page_id is 0 for submissions rejected before the page was known
+    """
+
+    day = models.DateField()
+    page_id = models.PositiveIntegerField(default=0)
+    outcome = models.CharField(max_length=16)
+    reason = models.CharField(max_length=16, blank=True)
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "page_id", "outcome", "reason"],
+                name="wagtail_honeypot_rollup_unique",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.outcome} {self.reason}"
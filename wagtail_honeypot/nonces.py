@@ -0,0 +1,97 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+
+from .conf import get_config
+
+KEY_PREFIX = "wagtail_honeypot:nonce:"
+
+
+class CacheNonceStore:
+    """
+    Redeemed nonces kept in a Django cache, shared by every process using it
+    """
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    def contains(self, nonce):
+        return caches[self.alias].get(KEY_PREFIX + nonce) is not None
+
+    def add(self, nonce, ttl):
+        # cache.add is atomic, only one of two concurrent requests succeeds
+        return caches[self.alias].add(KEY_PREFIX + nonce, 1, ttl)
+
+    def contains_many(self, nonces):
+        """
+        Return the nonces that have been redeemed with a single cache lookup
+        """
+        found = caches[self.alias].get_many([KEY_PREFIX + nonce for nonce in nonces])
+        return {key[len(KEY_PREFIX) :] for key in found}
+
+    async def acontains(self, nonce):
+        return await caches[self.alias].aget(KEY_PREFIX + nonce) is not None
+
+    async def aadd(self, nonce, ttl):
+        return await caches[self.alias].aadd(KEY_PREFIX + nonce, 1, ttl)
+
+
+class LocalNonceStore:
+    """
+    Redeemed nonces kept in process memory
+
+    Holds at most max_entries nonces, the oldest are dropped first
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def contains(self, nonce):
+        expires = self.entries.get(nonce)
+        return expires is not None and expires > time.monotonic()
+
+    def contains_many(self, nonces):
+        return {nonce for nonce in nonces if self.contains(nonce)}
+
+    def add(self, nonce, ttl):
+        now = time.monotonic()
+        with self.lock:
+            if self.contains(nonce):
+                return False
+            self.entries[nonce] = now + ttl
+            self.entries.move_to_end(nonce)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return True
+
+    # nothing to wait for in memory, the async methods can't block the loop
+    async def acontains(self, nonce):
+        return self.contains(nonce)
+
+    async def aadd(self, nonce, ttl):
+        return self.add(nonce, ttl)
+
+
+_local_store = None
+
+
+def get_nonce_store():
+    """
+    Return the store set by HONEYPOT_NONCE_CACHE
+
+    A cache alias uses that Django cache, None uses an in-process store
+    """
+    global _local_store
+
+    config = get_config()
+    if config.nonce_cache is not None:
+        return CacheNonceStore(config.nonce_cache)
+
+    max_entries = config.nonce_max_entries
+    if _local_store is None or _local_store.max_entries != max_entries:
+        _local_store = LocalNonceStore(max_entries)
+    return _local_store
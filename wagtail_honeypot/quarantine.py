@@ -0,0 +1,174 @@
+import logging
+
+from django.core.mail import get_connection
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+from wagtail.admin.mail import send_mail
+from wagtail.models import Page
+
+from .conf import get_config
+from .mail import QUEUE_FULL_DROP, get_queue_space
+from .spool import bulk_create_submissions
+
+logger = logging.getLogger(__name__)
+
+
+def is_enabled():
+    return get_config().quarantine
+
+
+def quarantine(page_id, form_data, reason):
+    """
+    Save a blocked submission for review, returns True when it was saved
+
+    The row is written straight away so a real visitor caught by mistake
+    isn't lost when the process stops
+    """
+    from .models import QuarantinedSubmission
+
+    try:
+        QuarantinedSubmission.objects.create(
+            page_id=page_id,
+            form_data=form_data,
+            reason=reason,
+            submit_time=timezone.now(),
+        )
+    except DatabaseError:
+        logger.exception("Unable to quarantine a submission to page %s", page_id)
+        return False
+    return True
+
+
+def render_email(fields, form_data):
+    """
+    Return the notification email text for a quarantined submission
+
+    Follows EmailFormMixin.render_email using the form fields of the page
+    instead of a bound form, values are shown as they were saved
+    """
+    content = []
+    for field in fields:
+        if field.clean_name not in form_data:
+            continue
+        value = form_data[field.clean_name]
+        if isinstance(value, list):
+            value = ", ".join(str(item) for item in value)
+        content.append(f"{field.label}: {value}")
+    return "\n".join(content)
+
+
+def release(ids, batch_size=500):
+    """
+    Save quarantined submissions as form submissions and send their emails
+
+    The submissions of each page are saved with bulk_create and the
+    quarantined rows removed with a single delete. The notification emails
+    are queued with a single insert when HONEYPOT_QUEUE_EMAIL is set,
+    otherwise they are sent over one connection once the submissions are
+    saved. Submissions for pages that are no longer form pages are kept.
+
+    Returns the number of submissions released
+    """
+    from .models import QuarantinedSubmission, QueuedEmail
+
+    emails = []
+    with transaction.atomic():
+        quarantined = list(
+            QuarantinedSubmission.objects.filter(pk__in=ids).order_by("pk")
+        )
+        grouped = {}
+        for submission in quarantined:
+            grouped.setdefault(submission.page_id, []).append(submission)
+        pages = Page.objects.filter(pk__in=grouped).specific()
+
+        released = []
+        for page in pages:
+            if not hasattr(page, "get_submission_class"):
+                continue
+            model = page.get_submission_class()
+            submissions = grouped[page.pk]
+            bulk_create_submissions(
+                model,
+                [
+                    model(
+                        page=page,
+                        form_data=submission.form_data,
+                        submit_time=submission.submit_time,
+                    )
+                    for submission in submissions
+                ],
+                batch_size,
+            )
+            released += [submission.pk for submission in submissions]
+
+            if getattr(page, "to_address", ""):
+                fields = page.get_form_fields()
+                addresses = [x.strip() for x in page.to_address.split(",")]
+                emails += [
+                    (
+                        page.subject,
+                        render_email(fields, submission.form_data),
+                        addresses,
+                        page.from_address,
+                    )
+                    for submission in submissions
+                ]
+
+        QuarantinedSubmission.objects.filter(pk__in=released).delete()
+        config = get_config()
+        if emails and config.queue_email:
+            space = get_queue_space()
+            queued = emails if space is None else emails[: max(space, 0)]
+            QueuedEmail.objects.bulk_create(
+                [
+                    QueuedEmail(
+                        subject=subject,
+                        message=message,
+                        recipient_list=",".join(addresses),
+                        from_email=from_email,
+                    )
+                    for subject, message, addresses, from_email in queued
+                ],
+                batch_size=batch_size,
+            )
+            emails = emails[len(queued) :]
+            if emails and config.queue_full == QUEUE_FULL_DROP:
+                logger.warning(
+                    "The email queue is full, dropped %d released emails", len(emails)
+                )
+                emails = []
+
+    if emails:
+        send_emails(emails)
+    return len(released)
+
+
+def send_emails(emails):
+    """
+    Send the emails over a single connection, a failed email is logged
+    """
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception:
+        logger.exception("Unable to send the emails for released submissions")
+        return
+    try:
+        for subject, message, addresses, from_email in emails:
+            try:
+                send_mail(
+                    subject, message, addresses, from_email, connection=connection
+                )
+            except Exception:
+                logger.exception("Unable to send the email for a released submission")
+    finally:
+        connection.close()
+
+
+def delete(ids):
+    """
+    Delete quarantined submissions with a single query, returns the number deleted
+    """
+    from .models import QuarantinedSubmission
+
+    return QuarantinedSubmission.objects.filter(pk__in=ids).delete()[0]
@@ -0,0 +1,78 @@
+import time
+
+from django.core.cache import caches
+
+from .conf import get_config
+
+KEY_PREFIX = "wagtail_honeypot:rate:"
+
+
+def get_client_ip(request):
+    """
+    Return the client IP address from the HONEYPOT_IP_HEADER request header
+
+    For a comma separated header such as X-Forwarded-For the address added
+    by the outermost of the HONEYPOT_TRUSTED_PROXIES is used, counted from
+    the right, the addresses to its left are set by the client
+    """
+    config = get_config()
+    value = request.META.get(config.ip_header) or request.META.get("REMOTE_ADDR", "")
+    addresses = value.split(",")
+    return addresses[-min(config.trusted_proxies, len(addresses))].strip()
+
+
+def is_rate_limited(request, limit, window=60, page_id=None):
+    """
+    Count a submission from the client and check if it is over the limit
+
+    Uses a sliding window estimated from the counts of the current and
+    previous fixed windows, counts are kept with atomic cache increments
+    so the limit is shared by every process using the cache
+    """
+    cache = caches[get_config().rate_limit_cache]
+    now = time.time()
+    current_key, previous_key = get_keys(request, now, window, page_id)
+
+    cache.add(current_key, 0, window * 2)
+    try:
+        current = cache.incr(current_key)
+    except ValueError:
+        # the key was evicted between add and incr
+        cache.set(current_key, 1, window * 2)
+        current = 1
+    previous = cache.get(previous_key, 0)
+    return is_over_limit(previous, current, now, window, limit)
+
+
+async def ais_rate_limited(request, limit, window=60, page_id=None):
+    """
+    Async version of is_rate_limited using the async cache API
+    """
+    cache = caches[get_config().rate_limit_cache]
+    now = time.time()
+    current_key, previous_key = get_keys(request, now, window, page_id)
+
+    await cache.aadd(current_key, 0, window * 2)
+    try:
+        current = await cache.aincr(current_key)
+    except ValueError:
+        await cache.aset(current_key, 1, window * 2)
+        current = 1
+    previous = await cache.aget(previous_key, 0)
+    return is_over_limit(previous, current, now, window, limit)
+
+
+def get_keys(request, now, window, page_id=None):
+    """
+    Return the cache keys of the current and previous window for the client
+    """
+    index = int(now // window)
+    key = "{}{}:{}:".format(
+        KEY_PREFIX, get_client_ip(request), "" if page_id is None else page_id
+    )
+    return key + str(index), key + str(index - 1)
+
+
+def is_over_limit(previous, current, now, window, limit):
+    elapsed = (now % window) / window
+    return previous * (1 - elapsed) + current > limit
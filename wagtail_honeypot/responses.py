@@ -0,0 +1,77 @@
+import threading
+
+from django.http import HttpResponse
+
+from .conf import get_config
+
+RESPONSE_RENDER = "render"
+RESPONSE_CACHED = "cached"
+RESPONSE_STATIC = "static"
+RESPONSE_STATUS = "status"
+
+_landing_pages = {}
+_lock = threading.Lock()
+
+
+def get_static_response():
+    """
+    Return the static or bare status rejection response
+
+    None is returned when rejected submissions get the landing page
+    """
+    config = get_config()
+    if config.rejection_response == RESPONSE_STATIC:
+        return HttpResponse(config.rejection_body, status=config.rejection_status)
+    if config.rejection_response == RESPONSE_STATUS:
+        return HttpResponse(status=config.rejection_status)
+    return None
+
+
+def get_cached_landing_page(page, request, render):
+    """
+    Return the landing page of the page rendered once for each revision
+
+    render is called to render the landing page when it isn't cached for
+    the live revision. A landing page rendered for a signed in user, that
+    sets a cookie or uses the CSRF token isn't cached as it holds something
+    of that visitor.
+    """
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return render()
+
+    cached = _landing_pages.get(page.pk)
+    if cached is not None and cached[0] == page.live_revision_id:
+        return build_response(*cached[1:])
+
+    csrf_cookie = request.META.get("CSRF_COOKIE_NEEDS_UPDATE")
+    response = render()
+    if hasattr(response, "render"):
+        response.render()
+    if (
+        response.streaming
+        or response.cookies
+        or request.META.get("CSRF_COOKIE_NEEDS_UPDATE") != csrf_cookie
+    ):
+        return response
+
+    with _lock:
+        _landing_pages[page.pk] = (
+            page.live_revision_id,
+            response.content,
+            response.status_code,
+            list(response.items()),
+        )
+    return response
+
+
+def build_response(content, status, headers):
+    response = HttpResponse(content, status=status)
+    for header, value in headers:
+        response[header] = value
+    return response
+
+
+def clear_landing_pages():
+    with _lock:
+        _landing_pages.clear()
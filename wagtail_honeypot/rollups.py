@@ -0,0 +1,240 @@
+import datetime
+import logging
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError, IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .conf import get_config
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "wagtail_honeypot:rollup:"
+REGISTRY_PREFIX = "wagtail_honeypot:rollup-keys:"
+
+# counters outlive a day so a late flush still finds them
+COUNTER_TIMEOUT = 2 * 86400
+# the day's list of counters outlives the last counter of the day
+REGISTRY_TIMEOUT = COUNTER_TIMEOUT + 86400
+
+_lock = threading.Lock()
+_keys = set()
+_flushed = time.monotonic()
+
+
+def is_enabled():
+    return get_config().rollups
+
+
+def get_today():
+    return timezone.localdate() if settings.USE_TZ else datetime.date.today()
+
+
+def get_key(day, page_id, outcome, reason):
+    return f"{KEY_PREFIX}{day.isoformat()}:{page_id or 0}:{outcome}:{reason or ''}"
+
+
+def parse_key(key):
+    """
+    Return the day, page id, outcome and reason of a counter key
+    """
+    day, page_id, outcome, reason = key[len(KEY_PREFIX) :].split(":", 3)
+    return datetime.date.fromisoformat(day), int(page_id), outcome, reason
+
+
+def get_registry_key(day):
+    return f"{REGISTRY_PREFIX}{day.isoformat()}"
+
+
+def register_key(cache, day, key):
+    """
+    Add a new counter to the day's list in the cache
+
+    The list is a count of its items and one cache key for each item, so
+    processes adding counters together each get their own place
+    """
+    registry_key = get_registry_key(day)
+    cache.add(registry_key, 0, REGISTRY_TIMEOUT)
+    try:
+        index = cache.incr(registry_key)
+    except ValueError:
+        index = 1
+        cache.set(registry_key, index, REGISTRY_TIMEOUT)
+    cache.set(f"{registry_key}:{index}", key, REGISTRY_TIMEOUT)
+
+
+async def aregister_key(cache, day, key):
+    """
+    Async version of register_key using the async cache API
+    """
+    registry_key = get_registry_key(day)
+    await cache.aadd(registry_key, 0, REGISTRY_TIMEOUT)
+    try:
+        index = await cache.aincr(registry_key)
+    except ValueError:
+        index = 1
+        await cache.aset(registry_key, index, REGISTRY_TIMEOUT)
+    await cache.aset(f"{registry_key}:{index}", key, REGISTRY_TIMEOUT)
+
+
+def get_registered_keys(cache):
+    """
+    Return the counters added by any process that may still be in the cache
+    """
+    today = get_today()
+    registry_keys = [
+        get_registry_key(today - datetime.timedelta(days=days))
+        for days in range(COUNTER_TIMEOUT // 86400 + 1)
+    ]
+    item_keys = [
+        f"{registry_key}:{index}"
+        for registry_key, size in cache.get_many(registry_keys).items()
+        for index in range(1, size + 1)
+    ]
+    return set(cache.get_many(item_keys).values())
+
+
+def add_key(key):
+    """
+    Remember the counter to flush, returns True when the flush is due
+    """
+    now = time.monotonic()
+    with _lock:
+        _keys.add(key)
+        return now - _flushed >= get_config().rollup_flush_interval
+
+
+def count(outcome, page_id=None, reason=None):
+    """
+    Add one to today's counter for the page, outcome and reason
+
+    The counters are kept in the HONEYPOT_ROLLUP_CACHE and added to the
+    rollup table every HONEYPOT_ROLLUP_FLUSH_INTERVAL seconds, so counting
+    a submission doesn't write to the database
+    """
+    cache = caches[get_config().rollup_cache]
+    day = get_today()
+    key = get_key(day, page_id, outcome, reason)
+    if cache.add(key, 0, COUNTER_TIMEOUT):
+        register_key(cache, day, key)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # the key was evicted between add and incr
+        cache.set(key, 1, COUNTER_TIMEOUT)
+    if add_key(key):
+        flush_rollups()
+
+
+async def acount(outcome, page_id=None, reason=None):
+    """
+    Async version of count using the async cache API
+    """
+    cache = caches[get_config().rollup_cache]
+    day = get_today()
+    key = get_key(day, page_id, outcome, reason)
+    if await cache.aadd(key, 0, COUNTER_TIMEOUT):
+        await aregister_key(cache, day, key)
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        await cache.aset(key, 1, COUNTER_TIMEOUT)
+    if add_key(key):
+        await sync_to_async(flush_rollups)()
+
+
+def take_counts(cache, keys):
+    """
+    Take the values of the counters by decrementing them by the value read
+
+    Counts made while taking are kept for the next flush, when another
+    process took the same counter first only what was left is taken
+    """
+    counts = {}
+    for key, value in cache.get_many(keys).items():
+        if not value:
+            continue
+        try:
+            left = cache.decr(key, value)
+        except ValueError:
+            # expired since it was read
+            left = 0
+        if left < 0:
+            cache.incr(key, -left)
+            value += left
+        if value:
+            counts[key] = value
+    return counts
+
+
+def flush_rollups(registered=False):
+    """
+    Add the counters this process has counted to the rollup table
+
+    With registered the counters every process has added to the cache in
+    the last days are flushed too, including those of stopped processes.
+    Returns the number of submissions added
+    """
+    global _keys, _flushed
+
+    cache = caches[get_config().rollup_cache]
+    with _lock:
+        keys, _keys = _keys, set()
+        _flushed = time.monotonic()
+    if registered:
+        keys |= get_registered_keys(cache)
+    if not keys:
+        return 0
+
+    counts = take_counts(cache, keys)
+    try:
+        add_counts({parse_key(key): value for key, value in counts.items()})
+    except DatabaseError:
+        logger.exception("Unable to save the honeypot rollups")
+        # put the counts back to be saved by the next flush
+        for key, value in counts.items():
+            cache.add(key, 0, COUNTER_TIMEOUT)
+            cache.incr(key, value)
+        with _lock:
+            _keys.update(counts)
+        return 0
+    return sum(counts.values())
+
+
+def add_counts(counts):
+    """
+    Add the counts to the rollup rows, creating the rows that don't exist
+
+    Each existing row is updated in the database with count = count + n,
+    the missing rows are then inserted together. A row inserted by another
+    process in between is updated instead.
+    """
+    from .models import HoneypotRollup
+
+    def update(fields, value):
+        return HoneypotRollup.objects.filter(**fields).update(count=F("count") + value)
+
+    rows = [
+        (dict(day=day, page_id=page_id, outcome=outcome, reason=reason), value)
+        for (day, page_id, outcome, reason), value in counts.items()
+    ]
+    with transaction.atomic():
+        missing = [
+            (fields, value) for fields, value in rows if not update(fields, value)
+        ]
+        if not missing:
+            return
+        try:
+            with transaction.atomic():
+                HoneypotRollup.objects.bulk_create(
+                    [HoneypotRollup(count=value, **fields) for fields, value in missing]
+                )
+        except IntegrityError:
+            for fields, value in missing:
+                if not update(fields, value):
+                    HoneypotRollup.objects.create(count=value, **fields)
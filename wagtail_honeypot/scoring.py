@@ -0,0 +1,259 @@
+import re
+import time
+
+from django.utils.module_loading import import_string
+
+from .challenges import verify_solution
+from .conf import get_config
+from .tokens import check_token, read_token
+
+REASON_FIELD = "field"
+REASON_TIME = "time"
+REASON_LINKS = "links"
+REASON_KEYWORD = "keyword"
+REASON_POW = "pow"
+
+# a score that blocks the submission whatever the threshold
+BLOCK = float("inf")
+
+# each alternative takes the whole link so a link is only counted once
+LINK_RE = re.compile(
+    r"<a\s[^>]*>[^<]*|\[url[=\]][^\[]*|(?:https?://|www\.)\S+", re.IGNORECASE
+)
+
+EXCLUDE_FIELDS = {"csrfmiddlewaretoken"}
+
+
+def time_diff(value, interval):
+    now_time = str(time.time()).split(".")[0]
+    diff = abs(int(now_time) - int(value))
+    return True if diff > interval else False
+
+
+class Submission:
+    """
+    The submitted data being scored with the honeypot fields that were found
+    """
+
+    __slots__ = (
+        "data",
+        "name_field",
+        "time_field",
+        "page_id",
+        "interval",
+        "token",
+        "challenge",
+        "text",
+    )
+
+    def __init__(self, data, name_field, time_field, page_id=None, interval=3):
+        self.data = data
+        self.name_field = name_field
+        self.time_field = time_field
+        self.page_id = page_id
+        self.interval = interval
+        self.token = None
+        self.challenge = None
+        self.text = None
+
+    def get_text(self):
+        """
+        Return the text of every submitted value except the honeypot fields
+        """
+        if self.text is None:
+            self.text = self.build_text()
+        return self.text
+
+    def build_text(self):
+        exclude = EXCLUDE_FIELDS | {
+            self.name_field,
+            self.time_field,
+            get_config().pow_field,
+        }
+        if hasattr(self.data, "lists"):
+            items = self.data.lists()
+        else:
+            items = ((key, [value]) for key, value in self.data.items())
+        return "\n".join(
+            value
+            for key, values in items
+            if key not in exclude
+            for value in values
+            if isinstance(value, str)
+        )
+
+
+class Scorer:
+    """
+    Scores a submission, the higher the score the more likely it is spam
+
+    Scorers run cheapest cost first, reason is reported when the total
+    score reaches the threshold at this scorer
+    """
+
+    cost = 0
+    reason = None
+
+    def score(self, submission):
+        raise NotImplementedError
+
+
+class FieldScorer(Scorer):
+    """
+    Blocks a submission with text in the honeypot field
+    """
+
+    cost = 0
+    reason = REASON_FIELD
+
+    def score(self, submission):
+        return BLOCK if submission.data[submission.name_field] != "" else 0
+
+
+class TimeScorer(Scorer):
+    """
+    Blocks a submission made too quickly after the form was rendered
+
+    A signed token is kept on the submission so its nonce can be checked
+    """
+
+    cost = 1
+    reason = REASON_TIME
+
+    def score(self, submission):
+        value = submission.data[submission.time_field]
+        if get_config().signed_tokens:
+            token = read_token(value)
+            if token is None or not check_token(
+                token, submission.interval, submission.page_id
+            ):
+                return BLOCK
+            submission.token = token
+            return 0
+        try:
+            return 0 if time_diff(value, submission.interval) else BLOCK
+        except (TypeError, ValueError):
+            return BLOCK
+
+
+class ProofOfWorkScorer(Scorer):
+    """
+    Blocks a submission without a solved proof of work challenge
+
+    The solved challenge is kept on the submission so its nonce can be
+    checked, a challenge can only be used once
+    """
+
+    cost = 2
+    reason = REASON_POW
+
+    def __init__(self, field):
+        self.field = field
+
+    def score(self, submission):
+        challenge = verify_solution(submission.data.get(self.field), submission.page_id)
+        if challenge is None:
+            return BLOCK
+        submission.challenge = challenge
+        return 0
+
+
+class LinkScorer(Scorer):
+    """
+    Scores a point for each link over max_links in the submitted text
+    """
+
+    cost = 10
+    reason = REASON_LINKS
+
+    def __init__(self, max_links):
+        self.max_links = max_links
+
+    def score(self, submission):
+        links = len(LINK_RE.findall(submission.get_text()))
+        return max(links - self.max_links, 0)
+
+
+class KeywordScorer(Scorer):
+    """
+    Scores a point for each different blocked keyword or domain in the text
+
+    The keywords and domains are compiled into a single regular expression
+    so the text is scanned once however long the lists are. Keywords match
+    whole words, domains also match their subdomains.
+    """
+
+    cost = 20
+    reason = REASON_KEYWORD
+
+    def __init__(self, keywords=(), domains=()):
+        patterns = []
+        if domains:
+            patterns.append(
+                r"(?<![\w-])(?:{})(?![\w-])".format(get_alternation(domains))
+            )
+        if keywords:
+            patterns.append(r"(?<!\w)(?:{})(?!\w)".format(get_alternation(keywords)))
+        self.pattern = re.compile("|".join(patterns), re.IGNORECASE)
+
+    def score(self, submission):
+        matches = {
+            match.lower() for match in self.pattern.findall(submission.get_text())
+        }
+        return len(matches)
+
+
+def get_alternation(terms):
+    # longest first so a term isn't cut short by a shorter one it starts with
+    terms = sorted({term.lower() for term in terms}, key=len, reverse=True)
+    return "|".join(re.escape(term) for term in terms)
+
+
+class Pipeline:
+    """
+    Runs the scorers cheapest first until the threshold is reached
+    """
+
+    def __init__(self, scorers, threshold=1):
+        self.scorers = sorted(scorers, key=lambda scorer: scorer.cost)
+        self.threshold = threshold
+
+    def run(self, submission):
+        """
+        Return the reason of the scorer that reached the threshold, or None
+        """
+        total = 0
+        for scorer in self.scorers:
+            total += scorer.score(submission)
+            if total >= self.threshold:
+                return scorer.reason
+        return None
+
+
+def get_scorers(config):
+    scorers = [FieldScorer(), TimeScorer()]
+    if config.pow:
+        scorers.append(ProofOfWorkScorer(config.pow_field))
+    if config.max_links is not None:
+        scorers.append(LinkScorer(config.max_links))
+    if config.blocked_keywords or config.blocked_domains:
+        scorers.append(KeywordScorer(config.blocked_keywords, config.blocked_domains))
+    scorers += [import_string(path)() for path in config.scorers]
+    return scorers
+
+
+_pipeline = None
+_pipeline_config = None
+
+
+def get_pipeline():
+    """
+    Return the Pipeline built from the current settings
+    """
+    global _pipeline, _pipeline_config
+
+    config = get_config()
+    if _pipeline is None or _pipeline_config is not config:
+        _pipeline = Pipeline(get_scorers(config), config.score_threshold)
+        _pipeline_config = config
+    return _pipeline
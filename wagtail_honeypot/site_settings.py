@@ -0,0 +1,188 @@
+import threading
+import uuid
+from collections import namedtuple
+
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.http.request import split_domain_port
+from wagtail.models import Site
+
+from .conf import get_config
+
+MODE_PAGE = "page"
+MODE_MONITOR = "monitor"
+MODE_DISABLED = "disabled"
+
+MODE_CHOICES = [
+    (MODE_PAGE, "Use the setting of each form page"),
+    (MODE_MONITOR, "Record failing submissions without blocking them"),
+    (MODE_DISABLED, "Disabled on this site"),
+]
+
+VERSION_KEY_PREFIX = "wagtail_honeypot:site_settings:"
+SITES_VERSION_KEY = VERSION_KEY_PREFIX + "sites"
+MAX_HOSTS = 1000
+
+SiteHoneypotSettings = namedtuple(
+    "SiteHoneypotSettings", ["mode", "time_interval", "rate_limit", "rate_limit_window"]
+)
+
+DEFAULT_SITE_SETTINGS = SiteHoneypotSettings(MODE_PAGE, None, None, None)
+
+_site_settings = {}
+_site_ids = {}
+_site_ids_version = None
+_lock = threading.Lock()
+
+
+def get_site_settings(request):
+    """
+    Return the honeypot settings of the site serving the request
+
+    The defaults are returned when wagtail.contrib.settings isn't installed
+    or the request doesn't match a site
+    """
+    if not get_config().site_settings:
+        return DEFAULT_SITE_SETTINGS
+    # Wagtail keeps the site on the request so routing doesn't look it up again
+    site = Site.find_for_request(request)
+    if site is None:
+        return DEFAULT_SITE_SETTINGS
+    return get_settings_for_site(site.pk)
+
+
+async def aget_site_settings(request):
+    """
+    Async version of get_site_settings
+
+    Sites are found from the host in a process cache, so the database is
+    only queried the first time a host is seen or the settings change
+    """
+    if not get_config().site_settings:
+        return DEFAULT_SITE_SETTINGS
+    site = getattr(request, "_wagtail_site", None)
+    site_id = site.pk if site is not None else await aget_site_id(request)
+    if site_id is None:
+        return DEFAULT_SITE_SETTINGS
+    return await aget_settings_for_site(site_id)
+
+
+def get_settings_for_site(site_id):
+    """
+    Return the honeypot settings of a site from the process cache
+
+    The cached settings are used while their version matches the version
+    stamp in the shared cache, so only a cache lookup is made until the
+    settings are saved by any process
+    """
+    cache = caches[get_config().site_settings_cache]
+    key = VERSION_KEY_PREFIX + str(site_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+
+    cached = _site_settings.get(site_id)
+    if cached is not None and version is not None and cached[0] == version:
+        return cached[1]
+
+    # the version is read before the settings, a save in between bumps
+    # the version again so a stale read is replaced on the next request
+    values = get_queryset(site_id).first()
+    return set_site_settings(site_id, version, values)
+
+
+async def aget_settings_for_site(site_id):
+    """
+    Async version of get_settings_for_site using the async cache API
+    """
+    cache = caches[get_config().site_settings_cache]
+    key = VERSION_KEY_PREFIX + str(site_id)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, uuid.uuid4().hex, None)
+        version = await cache.aget(key)
+
+    cached = _site_settings.get(site_id)
+    if cached is not None and version is not None and cached[0] == version:
+        return cached[1]
+
+    values = await get_queryset(site_id).afirst()
+    return set_site_settings(site_id, version, values)
+
+
+def get_queryset(site_id):
+    model = apps.get_model("wagtail_honeypot", "HoneypotSettings")
+    return model.objects.filter(site_id=site_id).values_list(
+        *SiteHoneypotSettings._fields
+    )
+
+
+def set_site_settings(site_id, version, values):
+    site_settings = (
+        DEFAULT_SITE_SETTINGS if values is None else SiteHoneypotSettings(*values)
+    )
+    with _lock:
+        _site_settings[site_id] = (version, site_settings)
+    return site_settings
+
+
+async def aget_site_id(request):
+    """
+    Return the id of the site for the request host from the process cache
+
+    The hosts are forgotten when any site is saved or deleted
+    """
+    global _site_ids, _site_ids_version
+
+    cache = caches[get_config().site_settings_cache]
+    version = await cache.aget(SITES_VERSION_KEY)
+    if version is None:
+        await cache.aadd(SITES_VERSION_KEY, uuid.uuid4().hex, None)
+        version = await cache.aget(SITES_VERSION_KEY)
+
+    host = (split_domain_port(request.get_host())[0], request.get_port())
+    site_ids = _site_ids
+    if version is not None and version == _site_ids_version and host in site_ids:
+        return site_ids[host]
+
+    site = await sync_to_async(Site.find_for_request)(request)
+    site_id = site.pk if site is not None else None
+    with _lock:
+        if version != _site_ids_version or len(_site_ids) >= MAX_HOSTS:
+            _site_ids, _site_ids_version = {}, version
+        _site_ids[host] = site_id
+    return site_id
+
+
+def clear_site_settings(site_id):
+    """
+    Bump the version stamp so every process reloads the settings of the site
+    """
+    cache = caches[get_config().site_settings_cache]
+    cache.set(VERSION_KEY_PREFIX + str(site_id), uuid.uuid4().hex, None)
+
+
+def clear_site_ids():
+    """
+    Bump the version stamp so every process finds the sites for hosts again
+    """
+    cache = caches[get_config().site_settings_cache]
+    cache.set(SITES_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+@receiver(post_save, sender="wagtail_honeypot.HoneypotSettings")
+@receiver(post_delete, sender="wagtail_honeypot.HoneypotSettings")
+def site_settings_changed(sender, instance, **kwargs):
+    # wait for the commit so other processes can't reload the old row
+    transaction.on_commit(lambda: clear_site_settings(instance.site_id))
+
+
+@receiver(post_save, sender=Site)
+@receiver(post_delete, sender=Site)
+def site_changed(sender, instance, **kwargs):
+    transaction.on_commit(clear_site_ids)
@@ -0,0 +1,160 @@
+import glob
+import json
+import os
+import uuid
+
+from django.apps import apps
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.utils.dateparse import parse_datetime
+from wagtail.models import Page
+
+from .conf import get_config
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+SPOOL_PATTERN = "spool-*.jsonl"
+FLUSHING_PATTERN = "spool-*.flushing"
+
+
+def get_spool_dir():
+    """
+    Return the HONEYPOT_SPOOL_DIR setting, None when spooling isn't available
+    """
+    if fcntl is None:
+        return None
+    return get_config().spool_dir
+
+
+def append(submission):
+    """
+    Append an unsaved form submission to this process's spool file
+
+    The file is locked while writing so a flush can't take it part way
+    through, if the file was taken between opening and locking it the
+    submission is written to a new file
+    """
+    spool_dir = get_spool_dir()
+    os.makedirs(spool_dir, exist_ok=True)
+    path = os.path.join(spool_dir, f"spool-{os.getpid()}.jsonl")
+    record = {
+        "model": submission._meta.label,
+        "page_id": submission.page_id,
+        "form_data": submission.form_data,
+        "submit_time": submission.submit_time,
+    }
+    line = json.dumps(record, cls=DjangoJSONEncoder) + "\n"
+
+    while True:
+        with open(path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                if os.fstat(f.fileno()).st_ino != os.stat(path).st_ino:
+                    continue
+            except FileNotFoundError:
+                continue
+            f.write(line)
+            f.flush()
+            if get_config().spool_fsync:
+                os.fsync(f.fileno())
+            return
+
+
+def take_spool_files(spool_dir):
+    """
+    Rename the spool files so new submissions go to new files
+
+    Files left by a flush that didn't finish are taken again
+    """
+    paths = glob.glob(os.path.join(spool_dir, FLUSHING_PATTERN))
+    for path in glob.glob(os.path.join(spool_dir, SPOOL_PATTERN)):
+        flushing = f"{path[:-len('.jsonl')]}-{uuid.uuid4().hex}.flushing"
+        try:
+            os.rename(path, flushing)
+        except FileNotFoundError:
+            continue
+        paths.append(flushing)
+    return paths
+
+
+def read_spool_file(path):
+    with open(path) as f:
+        # wait for a write that started before the file was taken
+        fcntl.flock(f, fcntl.LOCK_EX)
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def create_submissions(records, batch_size):
+    """
+    Save spooled submissions with bulk_create, grouped by submission model
+
+    Submissions for pages deleted since they were spooled are dropped.
+    """
+    records = list(records)
+    page_ids = set(
+        Page.objects.filter(
+            pk__in={record["page_id"] for record in records}
+        ).values_list("pk", flat=True)
+    )
+    grouped = {}
+    for record in records:
+        if record["page_id"] in page_ids:
+            grouped.setdefault(record["model"], []).append(record)
+
+    count = 0
+    for label, model_records in grouped.items():
+        model = apps.get_model(label)
+        submissions = [
+            model(
+                page_id=record["page_id"],
+                form_data=record["form_data"],
+                submit_time=parse_datetime(record["submit_time"]),
+            )
+            for record in model_records
+        ]
+        bulk_create_submissions(model, submissions, batch_size)
+        count += len(submissions)
+    return count
+
+
+def bulk_create_submissions(model, submissions, batch_size):
+    """
+    Save the submissions with bulk_create keeping their submit_time
+
+    Saving sets submit_time to the current time, the given time is restored
+    with a single update. Databases that don't return the primary keys of a
+    bulk insert, such as MySQL, save the submissions one at a time instead
+    so the new rows can be updated.
+    """
+    submit_times = [submission.submit_time for submission in submissions]
+    if connection.features.can_return_rows_from_bulk_insert:
+        model.objects.bulk_create(submissions, batch_size=batch_size)
+    else:
+        for submission in submissions:
+            submission.save()
+    for submission, submit_time in zip(submissions, submit_times):
+        submission.submit_time = submit_time
+    model.objects.bulk_update(submissions, ["submit_time"], batch_size=batch_size)
+
+
+def flush(batch_size=500):
+    """
+    Save all spooled submissions to the database
+
+    Returns the number of submissions saved
+    """
+    spool_dir = get_spool_dir()
+    if not spool_dir or not os.path.isdir(spool_dir):
+        return 0
+
+    count = 0
+    for path in take_spool_files(spool_dir):
+        with transaction.atomic():
+            count += create_submissions(read_spool_file(path), batch_size)
+        os.remove(path)
+    return count
@@ -1,7 +1,177 @@
 var whf_name = "whf_name";
-var data_whf_name = "[data-" + whf_name + "]";
 
-document.querySelectorAll(data_whf_name).forEach(function (el) {
-    el.classList.add(whf_name);
-    el.setAttribute("style", "position: absolute;top: 0;left: 0;margin-left: 100%;");
-});
\ No newline at end of file
+function hideHoneypotField(name) {
+    document.querySelectorAll("[data-" + name + "]").forEach(function (el) {
+        el.classList.add(whf_name);
+        el.setAttribute("style", "position: absolute;top: 0;left: 0;margin-left: 100%;");
+    });
+}
+
+hideHoneypotField(whf_name);
+
+// the name of the honeypot field is given by the time field when it has been changed
+document.querySelectorAll("[data-honeypot-name]").forEach(function (el) {
+    var name = el.getAttribute("data-honeypot-name");
+    if (name !== whf_name) {
+        hideHoneypotField(name);
+    }
+});
+
+document.querySelectorAll("[data-honeypot-token-url]").forEach(function (el) {
+    fetch(el.getAttribute("data-honeypot-token-url"), { credentials: "omit" })
+        .then(function (response) {
+            return response.json();
+        })
+        .then(function (data) {
+            el.value = data.token;
+            var pow = el.form && el.form.querySelector("[data-honeypot-pow]");
+            if (pow && data.challenge) {
+                startProofOfWork(pow, data.challenge);
+            }
+        });
+});
+
+// proof of work: find n so the SHA-256 hash of "challenge:n" starts with
+// difficulty zero bits, the function is self contained so it can run in a worker
+function honeypotSolve(prefix, difficulty, start, end) {
+    var K = [
+        0x428a2f98, 0x71374491, 0xb5c0fbcf, 0xe9b5dba5, 0x3956c25b, 0x59f111f1, 0x923f82a4, 0xab1c5ed5,
+        0xd807aa98, 0x12835b01, 0x243185be, 0x550c7dc3, 0x72be5d74, 0x80deb1fe, 0x9bdc06a7, 0xc19bf174,
+        0xe49b69c1, 0xefbe4786, 0x0fc19dc6, 0x240ca1cc, 0x2de92c6f, 0x4a7484aa, 0x5cb0a9dc, 0x76f988da,
+        0x983e5152, 0xa831c66d, 0xb00327c8, 0xbf597fc7, 0xc6e00bf3, 0xd5a79147, 0x06ca6351, 0x14292967,
+        0x27b70a85, 0x2e1b2138, 0x4d2c6dfc, 0x53380d13, 0x650a7354, 0x766a0abb, 0x81c2c92e, 0x92722c85,
+        0xa2bfe8a1, 0xa81a664b, 0xc24b8b70, 0xc76c51a3, 0xd192e819, 0xd6990624, 0xf40e3585, 0x106aa070,
+        0x19a4c116, 0x1e376c08, 0x2748774c, 0x34b0bcb5, 0x391c0cb3, 0x4ed8aa4a, 0x5b9cca4f, 0x682e6ff3,
+        0x748f82ee, 0x78a5636f, 0x84c87814, 0x8cc70208, 0x90befffa, 0xa4506ceb, 0xbef9a3f7, 0xc67178f2,
+    ];
+    var W = new Array(64);
+
+    // the challenge is ASCII so each character is one byte
+    function sha256(message) {
+        var length = message.length;
+        var words = new Array((((length + 8) >> 6) + 1) * 16).fill(0);
+        for (var i = 0; i < length; i++) {
+            words[i >> 2] |= message.charCodeAt(i) << (24 - (i % 4) * 8);
+        }
+        words[length >> 2] |= 0x80 << (24 - (length % 4) * 8);
+        words[words.length - 1] = length * 8;
+
+        var h = [0x6a09e667, 0xbb67ae85, 0x3c6ef372, 0xa54ff53a, 0x510e527f, 0x9b05688c, 0x1f83d9ab, 0x5be0cd19];
+        for (var block = 0; block < words.length; block += 16) {
+            for (var t = 0; t < 64; t++) {
+                if (t < 16) {
+                    W[t] = words[block + t];
+                } else {
+                    var w15 = W[t - 15];
+                    var w2 = W[t - 2];
+                    var s0 = ((w15 >>> 7) | (w15 << 25)) ^ ((w15 >>> 18) | (w15 << 14)) ^ (w15 >>> 3);
+                    var s1 = ((w2 >>> 17) | (w2 << 15)) ^ ((w2 >>> 19) | (w2 << 13)) ^ (w2 >>> 10);
+                    W[t] = (W[t - 16] + s0 + W[t - 7] + s1) | 0;
+                }
+            }
+            var a = h[0], b = h[1], c = h[2], d = h[3], e = h[4], f = h[5], g = h[6], k = h[7];
+            for (t = 0; t < 64; t++) {
+                var S1 = ((e >>> 6) | (e << 26)) ^ ((e >>> 11) | (e << 21)) ^ ((e >>> 25) | (e << 7));
+                var t1 = (k + S1 + ((e & f) ^ (~e & g)) + K[t] + W[t]) | 0;
+                var S0 = ((a >>> 2) | (a << 30)) ^ ((a >>> 13) | (a << 19)) ^ ((a >>> 22) | (a << 10));
+                var t2 = (S0 + ((a & b) ^ (a & c) ^ (b & c))) | 0;
+                k = g;
+                g = f;
+                f = e;
+                e = (d + t1) | 0;
+                d = c;
+                c = b;
+                b = a;
+                a = (t1 + t2) | 0;
+            }
+            h[0] = (h[0] + a) | 0;
+            h[1] = (h[1] + b) | 0;
+            h[2] = (h[2] + c) | 0;
+            h[3] = (h[3] + d) | 0;
+            h[4] = (h[4] + e) | 0;
+            h[5] = (h[5] + f) | 0;
+            h[6] = (h[6] + g) | 0;
+            h[7] = (h[7] + k) | 0;
+        }
+        return h;
+    }
+
+    function hasLeadingZeroBits(hash, bits) {
+        for (var i = 0; bits > 0; i++, bits -= 32) {
+            if (bits >= 32 ? hash[i] !== 0 : hash[i] >>> (32 - bits) !== 0) {
+                return false;
+            }
+        }
+        return true;
+    }
+
+    for (var n = start; n < end; n++) {
+        if (hasLeadingZeroBits(sha256(prefix + n), difficulty)) {
+            return n;
+        }
+    }
+    return -1;
+}
+
+function solveChallenge(challenge, callback) {
+    // the challenge is signed "page.difficulty.expires.nonce:signature"
+    var difficulty = parseInt(challenge.split(":")[0].split(".")[1], 10);
+    var prefix = challenge + ":";
+    try {
+        var source = "var solve = " + honeypotSolve.toString() + ";\n" +
+            "onmessage = function (e) { postMessage(solve(e.data[0], e.data[1], 0, Infinity)); };";
+        var url = URL.createObjectURL(new Blob([source], { type: "text/javascript" }));
+        var worker = new Worker(url);
+        worker.onmessage = function (e) {
+            worker.terminate();
+            URL.revokeObjectURL(url);
+            callback(prefix + e.data);
+        };
+        worker.postMessage([prefix, difficulty]);
+    } catch (e) {
+        // no workers, solve in chunks so the page stays responsive
+        var chunk = 5000;
+        (function next(start) {
+            var n = honeypotSolve(prefix, difficulty, start, start + chunk);
+            if (n < 0) {
+                setTimeout(next, 0, start + chunk);
+            } else {
+                callback(prefix + n);
+            }
+        })(0);
+    }
+}
+
+function startProofOfWork(el, challenge) {
+    var form = el.form;
+    el.value = "";
+    el.setAttribute("data-honeypot-pow", challenge);
+    solveChallenge(challenge, function (value) {
+        if (el.getAttribute("data-honeypot-pow") !== challenge) {
+            // replaced by a newer challenge
+            return;
+        }
+        el.value = value;
+        if (el.honeypotPending && form) {
+            el.honeypotPending = false;
+            form.requestSubmit ? form.requestSubmit() : form.submit();
+        }
+    });
+    if (form && !el.honeypotHoldsSubmit) {
+        // hold the submission until the challenge is solved
+        el.honeypotHoldsSubmit = true;
+        form.addEventListener("submit", function (event) {
+            if (!el.value) {
+                event.preventDefault();
+                el.honeypotPending = true;
+            }
+        });
+    }
+}
+
+document.querySelectorAll("[data-honeypot-pow]").forEach(function (el) {
+    var challenge = el.getAttribute("data-honeypot-pow");
+    if (challenge) {
+        startProofOfWork(el, challenge);
+    }
+});
@@ -0,0 +1,50 @@
+import asyncio
+
+from .conf import get_config
+from .ratelimit import get_client_ip
+
+# only changed on the event loop, so no lock is needed
+_active = 0
+_clients = {}
+
+
+def is_enabled():
+    return get_config().tarpit_delay > 0
+
+
+def get_active():
+    """
+    Return the number of responses being delayed in this process
+    """
+    return _active
+
+
+async def tarpit(request):
+    """
+    Delay the response to a rejected request without holding a thread
+
+    At most HONEYPOT_TARPIT_MAX_CONNECTIONS responses are delayed at once,
+    and at most HONEYPOT_TARPIT_MAX_PER_CLIENT for one client, other
+    responses are sent straight away. Returns True when delayed.
+    """
+    global _active
+
+    config = get_config()
+    client = get_client_ip(request)
+    if (
+        _active >= config.tarpit_max_connections
+        or _clients.get(client, 0) >= config.tarpit_max_per_client
+    ):
+        return False
+
+    _active += 1
+    _clients[client] = _clients.get(client, 0) + 1
+    try:
+        await asyncio.sleep(config.tarpit_delay)
+    finally:
+        _active -= 1
+        if _clients[client] > 1:
+            _clients[client] -= 1
+        else:
+            del _clients[client]
+    return True
@@ -1,21 +1,133 @@
-import time
+import os
+from functools import lru_cache
 
 from django import template
-from django.conf import settings
-from django.utils.text import slugify
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.template.loader import get_template, render_to_string
+from django.urls import reverse
+from django.utils.html import escape
+from django.utils.http import urlencode
+from django.utils.safestring import mark_safe
+
+from ..challenges import make_challenge
+from ..conf import get_config
+from ..fields import get_field_names
+from ..utils import get_time_value
 
 register = template.Library()
 
+TEMPLATE = "tags/honeypot_fields.html"
+DEFAULT_TEMPLATE = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "templates", TEMPLATE
+)
+
+_uses_default_template = None
 
-@register.inclusion_tag("tags/honeypot_fields.html")
-def honeypot_fields(enabled):
+
+def honeypot_fields(enabled, page=None):
+    """
+    Return the context used to render the honeypot fields
+    """
+    config = get_config()
+    page_id = getattr(page, "pk", None)
+    if page_id is None and enabled and (config.signed_tokens or config.pow):
+        # a token or challenge without a page id fails the page's check
+        raise ImproperlyConfigured(
+            "Pass the form page to honeypot_fields when HONEYPOT_SIGNED_TOKENS "
+            "or HONEYPOT_POW is enabled, {% honeypot_fields page.honeypot page %}"
+        )
+    if config.fetch_token:
+        # the values are fetched by honeypot.js so the page can be cached
+        value = challenge = ""
+        token_url = reverse("wagtail_honeypot:token")
+        if page_id is not None:
+            token_url += "?" + urlencode({"page": page_id})
+    else:
+        value = get_time_value(page_id)
+        challenge = make_challenge(page_id) if config.pow and enabled else ""
+        token_url = None
+    if config.rotate_fields:
+        name_field, time_field = get_field_names()
+    else:
+        name_field, time_field = config.name_field_slug, config.time_field_slug
     return {
-        "honeypot_name_field": slugify(
-            getattr(settings, "HONEYPOT_NAME_FIELD", "whf_name")
-        ),
-        "honeypot_time_field": slugify(
-            getattr(settings, "HONEYPOT_TIME_FIELD", "whf_time")
-        ),
-        "time": str(time.time()).split(".")[0],
+        "honeypot_name_field": name_field,
+        "honeypot_time_field": time_field,
+        "time": value,
+        "token_url": token_url,
+        "pow": config.pow,
+        "honeypot_pow_field": config.pow_field,
+        "challenge": challenge,
         "enabled": enabled,
     }
+
+
+@register.simple_tag(name="honeypot_fields")
+def honeypot_fields_tag(enabled, page=None):
+    """
+    Render the honeypot fields
+
+    The markup is built without the template engine unless the
+    tags/honeypot_fields.html template has been overridden
+    """
+    context = honeypot_fields(enabled, page)
+    if uses_default_template():
+        return render_fields(context)
+    return render_to_string(TEMPLATE, context)
+
+
+def uses_default_template():
+    global _uses_default_template
+
+    if _uses_default_template is None:
+        origin = get_template(TEMPLATE).origin
+        _uses_default_template = getattr(origin, "name", None) == DEFAULT_TEMPLATE
+    return _uses_default_template
+
+
+@receiver(setting_changed)
+def reset_default_template(setting, **kwargs):
+    global _uses_default_template
+
+    if setting in ("TEMPLATES", "INSTALLED_APPS"):
+        _uses_default_template = None
+
+
+@lru_cache(maxsize=16)
+def get_fragments(name_field, time_field):
+    """
+    Return the escaped markup before and after the time field value
+    """
+    name_field = escape(name_field)
+    time_field = escape(time_field)
+    return (
+        f'\n<input type="text" name="{name_field}" id="{name_field}" '
+        f'data-{name_field} tabindex="-1" autocomplete="off">\n'
+        f'<input type="hidden" name="{time_field}" id="{time_field}" '
+        f'data-{time_field} data-honeypot-name="{name_field}" tabindex="-1" '
+        'autocomplete="off" value="',
+        ">\n\n",
+    )
+
+
+def render_fields(context):
+    """
+    Return the same markup as the tags/honeypot_fields.html template
+    """
+    if not context["enabled"]:
+        return mark_safe("\n")
+    start, end = get_fragments(
+        context["honeypot_name_field"], context["honeypot_time_field"]
+    )
+    value = escape(context["time"]) + '"'
+    if context["token_url"]:
+        value += f' data-honeypot-token-url="{escape(context["token_url"])}"'
+    if context["pow"]:
+        value += (
+            f'>\n<input type="hidden" name="{escape(context["honeypot_pow_field"])}" '
+            f'data-honeypot-pow="{escape(context["challenge"])}" tabindex="-1" '
+            'autocomplete="off" value=""'
+        )
+    return mark_safe(start + value + end)
@@ -0,0 +1,66 @@
+import secrets
+import time
+from collections import namedtuple
+
+from django.core import signing
+
+SALT = "wagtail_honeypot.tokens"
+SEPARATOR = "."
+
+Token = namedtuple("Token", ["timestamp", "expires", "page_id", "nonce"])
+
+
+def get_signer():
+    return signing.Signer(salt=SALT)
+
+
+def make_token(page_id=None, max_age=86400, timestamp=None):
+    """
+    Return a signed time token for the honeypot time field
+
+    The token carries the time it was issued, the time it expires, optionally
+    the id of the page the form belongs to and a random nonce
+    """
+    if timestamp is None:
+        timestamp = int(time.time())
+    expires = timestamp + max_age
+    page = "" if page_id is None else str(page_id)
+    nonce = secrets.token_hex(8)
+    return get_signer().sign(
+        SEPARATOR.join((str(timestamp), str(expires), page, nonce))
+    )
+
+
+def read_token(token):
+    """
+    Return the Token held in a signed token string
+
+    The signature is checked in constant time, None is returned if the
+    token has been tampered with or can't be read
+    """
+    try:
+        value = get_signer().unsign(token)
+        timestamp, expires, page, nonce = value.split(SEPARATOR)
+        return Token(int(timestamp), int(expires), int(page) if page else None, nonce)
+    except (signing.BadSignature, TypeError, ValueError):
+        return None
+
+
+def check_token(token, interval, page_id=None):
+    """
+    Check a Token is old enough and not expired
+
+    When a page_id is given the token must have been issued for that page
+    """
+    if page_id is not None and token.page_id != page_id:
+        return False
+    now = int(time.time())
+    return token.timestamp + interval < now <= token.expires
+
+
+def verify_token(token, interval, page_id=None):
+    """
+    Check a signed time token is genuine, old enough and not expired
+    """
+    data = read_token(token)
+    return data is not None and check_token(data, interval, page_id)
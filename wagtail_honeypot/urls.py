@@ -0,0 +1,10 @@
+from django.urls import path
+
+from . import views
+
+app_name = "wagtail_honeypot"
+
+urlpatterns = [
+    path("token/", views.token, name="token"),
+    path("metrics/", views.metrics, name="metrics"),
+]
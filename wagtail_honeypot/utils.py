@@ -0,0 +1,126 @@
+import time
+
+from .conf import get_config
+from .fields import get_accepted_field_names
+from .nonces import get_nonce_store
+from .scoring import (  # noqa: F401
+    REASON_FIELD,
+    REASON_KEYWORD,
+    REASON_LINKS,
+    REASON_POW,
+    REASON_TIME,
+    Submission,
+    get_pipeline,
+    time_diff,
+)
+from .tokens import make_token
+
+REASON_MISSING = "missing"
+REASON_REPLAY = "replay"
+REASON_RATE = "rate"
+
+
+def get_time_value(page_id=None):
+    """
+    Return the value for the honeypot time field
+    """
+    config = get_config()
+    if config.signed_tokens:
+        return make_token(page_id, config.token_max_age)
+    return str(time.time()).split(".")[0]
+
+
+def get_rejection_reason(data, page_id=None, redeem=False, interval=None):
+    """
+    Check the honeypot values in the submitted data
+
+    Returns None when the submission passes, otherwise the reason it failed.
+    With signed tokens enabled the page_id is checked against the token.
+    With single use tokens enabled a used token fails, redeem marks the
+    token as used when the submission passes. An interval replaces
+    HONEYPOT_TIME_INTERVAL.
+    """
+    reason, tokens = check_fields(data, page_id, interval)
+    if reason is None:
+        return check_nonces(tokens, redeem)
+    return reason
+
+
+async def aget_rejection_reason(data, page_id=None, redeem=False, interval=None):
+    """
+    Async version of get_rejection_reason using the async cache API
+    """
+    reason, tokens = check_fields(data, page_id, interval)
+    if reason is None:
+        for token in tokens:
+            reason = await acheck_nonce(token, redeem)
+            if reason is not None:
+                return reason
+    return reason
+
+
+def check_fields(data, page_id=None, interval=None):
+    """
+    Run the honeypot scorers, none of which need a lookup
+
+    Returns the reason the submission failed and the single use token and
+    proof of work challenge whose nonces still have to be checked
+    """
+    config = get_config()
+
+    for honeypot_name_field, honeypot_time_field in get_accepted_field_names():
+        if honeypot_name_field in data and honeypot_time_field in data:
+            break
+    else:
+        return REASON_MISSING, ()
+    submission = Submission(
+        data,
+        honeypot_name_field,
+        honeypot_time_field,
+        page_id,
+        config.time_interval if interval is None else interval,
+    )
+    reason = get_pipeline().run(submission)
+    if reason is not None:
+        return reason, ()
+    tokens = ()
+    if config.single_use_tokens and submission.token is not None:
+        tokens += (submission.token,)
+    if submission.challenge is not None:
+        tokens += (submission.challenge,)
+    return None, tokens
+
+
+def check_nonces(tokens, redeem=False):
+    """
+    Check the nonces of the tokens, returns the reason of the first used one
+    """
+    for token in tokens:
+        reason = check_nonce(token, redeem)
+        if reason is not None:
+            return reason
+    return None
+
+
+def check_nonce(token, redeem=False):
+    """
+    Check the nonce of a single use token hasn't been used already
+
+    Redeemed nonces are kept until the token expires
+    """
+    store = get_nonce_store()
+    if redeem:
+        ttl = max(token.expires - int(time.time()), 1)
+        return None if store.add(token.nonce, ttl) else REASON_REPLAY
+    return REASON_REPLAY if store.contains(token.nonce) else None
+
+
+async def acheck_nonce(token, redeem=False):
+    """
+    Async version of check_nonce
+    """
+    store = get_nonce_store()
+    if redeem:
+        ttl = max(token.expires - int(time.time()), 1)
+        return None if await store.aadd(token.nonce, ttl) else REASON_REPLAY
+    return REASON_REPLAY if await store.acontains(token.nonce) else None
@@ -0,0 +1,79 @@
+import time
+
+from django.core.exceptions import ValidationError
+
+from .nonces import get_nonce_store
+from .utils import REASON_REPLAY, check_fields, check_nonces
+
+
+class HoneypotValidator:
+    """
+    Checks the honeypot values of a submission made outside a Wagtail form page
+
+    Works with any mapping of submitted values, such as request.POST or the
+    data of a JSON request, so it can be used from any view or serializer.
+    Calling the validator raises a ValidationError with the reason as its
+    code. Nothing is logged or counted, only single use tokens are redeemed.
+
+    page_id is checked against signed tokens, an interval replaces
+    HONEYPOT_TIME_INTERVAL and redeem marks single use tokens as used.
+    """
+
+    message = "The submission was rejected."
+
+    def __init__(self, page_id=None, interval=None, redeem=True):
+        self.page_id = page_id
+        self.interval = interval
+        self.redeem = redeem
+
+    def __call__(self, data):
+        reason = self.validate(data)
+        if reason is not None:
+            raise ValidationError(self.message, code=reason)
+
+    def validate(self, data):
+        """
+        Return None when the data passes, otherwise the reason it failed
+        """
+        reason, tokens = check_fields(data, self.page_id, self.interval)
+        if reason is None:
+            return check_nonces(tokens, self.redeem)
+        return reason
+
+    def validate_many(self, payloads):
+        """
+        Return the result of validate for each of the payloads
+
+        Without redeem the single use tokens are looked up with a single
+        cache lookup. A token used by more than one payload only passes once.
+        """
+        results = []
+        payload_tokens = {}
+        for index, data in enumerate(payloads):
+            reason, tokens = check_fields(data, self.page_id, self.interval)
+            results.append(reason)
+            if tokens:
+                payload_tokens[index] = tokens
+        if not payload_tokens:
+            return results
+
+        store = get_nonce_store()
+        if self.redeem:
+            now = int(time.time())
+            for index, tokens in payload_tokens.items():
+                for token in tokens:
+                    ttl = max(token.expires - now, 1)
+                    if not store.add(token.nonce, ttl):
+                        results[index] = REASON_REPLAY
+                        break
+        else:
+            used = store.contains_many(
+                {token.nonce for tokens in payload_tokens.values() for token in tokens}
+            )
+            seen = set()
+            for index, tokens in payload_tokens.items():
+                nonces = {token.nonce for token in tokens}
+                if nonces & (used | seen):
+                    results[index] = REASON_REPLAY
+                seen |= nonces
+        return results
@@ -0,0 +1,78 @@
+import secrets
+
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, HttpResponse, JsonResponse
+from django.utils.cache import add_never_cache_headers
+from django.views.decorators.cache import never_cache
+
+from .challenges import aget_difficulty, make_challenge
+from .conf import get_config
+from .metrics import is_enabled
+from .metrics import metrics as honeypot_metrics
+from .utils import get_time_value
+
+
+@never_cache
+def token(request):
+    """
+    Return a fresh honeypot time value for forms rendered from a cache
+
+    The session and user are never touched so no session is loaded or saved
+    """
+    page_id = get_page_id(request)
+    data = {"token": get_time_value(page_id)}
+    if get_config().pow:
+        data["challenge"] = make_challenge(page_id)
+    return JsonResponse(data)
+
+
+async def atoken(request):
+    """
+    Async version of the token view, the challenge difficulty is read with
+    the async cache API so the event loop isn't blocked
+    """
+    page_id = get_page_id(request)
+    data = {"token": get_time_value(page_id)}
+    if get_config().pow:
+        difficulty = await aget_difficulty(page_id)
+        data["challenge"] = make_challenge(page_id, difficulty)
+    response = JsonResponse(data)
+    add_never_cache_headers(response)
+    return response
+
+
+def get_page_id(request):
+    try:
+        return int(request.GET["page"])
+    except (KeyError, ValueError):
+        return None
+
+
+@never_cache
+def metrics(request):
+    """
+    Return the honeypot metrics of this process in the Prometheus text format
+
+    Only staff users and requests with the HONEYPOT_METRICS_TOKEN as a
+    bearer token can read them
+    """
+    if not is_enabled():
+        raise Http404
+    if not has_metrics_access(request):
+        raise PermissionDenied
+    return HttpResponse(
+        honeypot_metrics.render_prometheus(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+def has_metrics_access(request):
+    metrics_token = get_config().metrics_token
+    if metrics_token is not None:
+        authorization = request.META.get("HTTP_AUTHORIZATION", "")
+        if secrets.compare_digest(
+            authorization.encode(), f"Bearer {metrics_token}".encode()
+        ):
+            return True
+    user = getattr(request, "user", None)
+    return user is not None and user.is_active and user.is_staff
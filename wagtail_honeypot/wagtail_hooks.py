@@ -0,0 +1,92 @@
+from datetime import timedelta
+
+from django.apps import apps
+from django.contrib.auth.models import Permission
+from django.db.models import Sum
+from django.urls import include, path, reverse
+from wagtail import hooks
+from wagtail.admin.menu import MenuItem
+from wagtail.admin.site_summary import SummaryItem
+
+from . import admin_urls
+from .admin_views import REPORT_PERMISSION, VIEW_PERMISSION
+from .metrics import BLOCKED
+from .models import HoneypotRollup, HoneypotSettings
+from .rollups import get_today
+from .rollups import is_enabled as rollups_enabled
+
+if apps.is_installed("wagtail.contrib.settings"):
+    from wagtail.contrib.settings.registry import register_setting
+
+    register_setting(HoneypotSettings, icon="form")
+
+
+@hooks.register("register_admin_urls")
+def register_admin_urls():
+    return [
+        path("honeypot/", include(admin_urls, namespace="wagtail_honeypot_admin")),
+    ]
+
+
+class QuarantineMenuItem(MenuItem):
+    def is_shown(self, request):
+        return request.user.has_perm(VIEW_PERMISSION)
+
+
+@hooks.register("register_reports_menu_item")
+def register_quarantine_menu_item():
+    return QuarantineMenuItem(
+        "Quarantined submissions",
+        reverse("wagtail_honeypot_admin:quarantine"),
+        name="quarantined-submissions",
+        icon_name="warning",
+        order=1000,
+    )
+
+
+class ReportMenuItem(MenuItem):
+    def is_shown(self, request):
+        return request.user.has_perm(REPORT_PERMISSION)
+
+
+@hooks.register("register_reports_menu_item")
+def register_report_menu_item():
+    return ReportMenuItem(
+        "Honeypot",
+        reverse("wagtail_honeypot_admin:report"),
+        name="honeypot-report",
+        icon_name="form",
+        order=1001,
+    )
+
+
+class RollupSummaryItem(SummaryItem):
+    order = 1000
+    days = 7
+    template_name = "wagtail_honeypot/homepage/site_summary_rollups.html"
+
+    def get_context_data(self, parent_context):
+        total = HoneypotRollup.objects.filter(
+            day__gt=get_today() - timedelta(days=self.days), outcome=BLOCKED
+        ).aggregate(total=Sum("count"))["total"]
+        return {"total_blocked": total or 0, "days": self.days}
+
+    def is_shown(self):
+        return rollups_enabled() and self.request.user.has_perm(REPORT_PERMISSION)
+
+
+@hooks.register("construct_homepage_summary_items")
+def add_rollup_summary_item(request, items):
+    items.append(RollupSummaryItem(request))
+
+
+@hooks.register("register_permissions")
+def register_permissions():
+    return Permission.objects.filter(
+        content_type__app_label="wagtail_honeypot",
+        codename__in=[
+            "view_quarantinedsubmission",
+            "delete_quarantinedsubmission",
+            "view_honeypotrollup",
+        ],
+    )